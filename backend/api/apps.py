@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class StoAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.api'
-    verbose_name = 'СТО Застосунок' 
\ No newline at end of file
+    verbose_name = 'СТО Застосунок'
+
+    def ready(self):
+        from . import signals  # noqa: F401 pylint: disable=import-outside-toplevel,unused-import
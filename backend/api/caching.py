@@ -0,0 +1,59 @@
+"""Версійований кеш поверх django.core.cache.
+
+Кожен набір даних має ключ версії. Записи кешу містять версію у своєму
+ключі, тому інвалідація зводиться до збільшення версії, а старі записи
+просто перестають читатися і витісняються за таймаутом. Працює з будь-яким
+бекендом із settings.CACHES (locmem за замовчуванням, Redis, Memcached).
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+
+
+def _initial_version():
+    """Початкове значення версії
+
+    Береться з часу, щоб після витіснення ключа версії нове значення
+    не збіглося зі старими записами кешу.
+    """
+    return time.time_ns()
+
+
+def get_version(key):
+    """Поточна версія для ключа"""
+    return get_versions([key])[key]
+
+
+def get_versions(keys):
+    """Поточні версії для кількох ключів за одне звернення до кешу"""
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return versions
+
+
+def bump_version(key):
+    """Збільшення версії (інвалідація всіх записів, що від неї залежать)"""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Ключ версії ще не існує або був витіснений
+        cache.set(key, _initial_version(), timeout=None)
+        return cache.get(key)
+
+
+def make_key(prefix, *parts):
+    """Побудова ключа кешу з частин
+
+    Довгі ключі замінюються хешем, щоб не перевищити обмеження
+    бекендів на довжину ключа.
+    """
+    key = ':'.join([prefix] + [str(part) for part in parts])
+    if len(key) > 200:
+        digest = hashlib.md5(key.encode('utf-8')).hexdigest()
+        key = f'{prefix}:{digest}'
+    return key
@@ -0,0 +1,99 @@
+"""Умовні GET-запити (ETag/Last-Modified) для DRF views.
+
+Валідатор відповіді будується з дешевих агрегатів Max('updated_at') та
+Count('pk') по querysets, від яких залежать дані. Якщо клієнт надсилає
+If-None-Match або If-Modified-Since, що збігаються, view не
+виконується і повертається 304 без серіалізації.
+"""
+
+import calendar
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers)
+from django.utils.http import http_date
+
+
+def compute_validators(querysets, *extra):
+    """ETag та час останньої зміни для набору querysets
+
+    По одному агрегатному запиту на queryset; елементи, що не є
+    querysets (наприклад межі періоду), просто додаються до ETag.
+    Кількість рядків входить в ETag, тому видалення теж змінює
+    валідатор; Last-Modified видалень не бачить, тож головним
+    валідатором є ETag.
+    """
+    parts = [str(part) for part in extra]
+    last_modified = None
+    for queryset in querysets:
+        if not hasattr(queryset, 'aggregate'):
+            parts.append(str(queryset))
+            continue
+        aggregates = queryset.order_by().aggregate(
+            last=Max('updated_at'), count=Count('pk'))
+        parts.append(
+            f"{queryset.model._meta.label}:{aggregates['count']}:"
+            f"{aggregates['last'].isoformat() if aggregates['last'] else '-'}")
+        if aggregates['last'] and (
+                last_modified is None or aggregates['last'] > last_modified):
+            last_modified = aggregates['last']
+
+    digest = hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+    return f'"{digest}"', last_modified
+
+
+def respond_conditionally(request, etag, last_modified, get_response,
+                          private=False):
+    """Відповідь 304 для актуального кешу клієнта або get_response()
+
+    Додає ETag, Last-Modified та заголовки, за якими браузер перевіряє
+    актуальність при кожному запиті.
+    """
+    timestamp = (
+        calendar.timegm(last_modified.utctimetuple())
+        if last_modified else None)
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = get_response()
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+
+    # Браузер має перевіряти актуальність при кожному запиті
+    if private:
+        patch_cache_control(response, no_cache=True, private=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ('Accept-Language',))
+    return response
+
+
+def conditional_get(get_querysets, private=False):
+    """Декоратор методу ViewSet з підтримкою умовних GET-запитів
+
+    get_querysets(view, request) повертає querysets, від яких залежить
+    відповідь, або None, якщо умовний запит не застосовується (наприклад
+    при неправильних параметрах). Валідатор враховує повний шлях запиту
+    та мову з Accept-Language.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            querysets = get_querysets(self, request)
+            if querysets is None:
+                return method(self, request, *args, **kwargs)
+
+            etag, last_modified = compute_validators(
+                querysets, request.get_full_path(),
+                request.META.get('HTTP_ACCEPT_LANGUAGE', ''))
+            return respond_conditionally(
+                request, etag, last_modified,
+                lambda: method(self, request, *args, **kwargs),
+                private=private)
+        return wrapper
+    return decorator
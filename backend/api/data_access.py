@@ -1,5 +1,9 @@
 from django.contrib.auth.models import User
-from .models import Customer, Service, Appointment, ServiceHistory, LoyaltyTransaction, STOInfo
+from django.db.models import Sum
+from .models import (
+    Customer, Service, Appointment, ServiceHistory, LoyaltyTransaction,
+    STOInfo, DailyStats
+)
 
 
 class DataAccessLayer:
@@ -136,25 +140,12 @@ class DataAccessLayer:
     # Методи для роботи з інформацією про СТО
     @staticmethod
     def get_sto_info():
-        """Отримання інформації про СТО"""
+        """Отримання активної інформації про СТО (None, якщо її немає)
+
+        Запис за замовчуванням створює команда ensure_sto_info.
+        """
         try:
-            sto_info = STOInfo.objects.filter(is_active=True).first()
-            if not sto_info:
-                # Створюємо запис за замовчуванням
-                sto_info = STOInfo.objects.create(
-                    name='СТО "Автосервіс"',
-                    description='Професійне обслуговування автомобілів',
-                    motto='Якість та надійність',
-                    welcome_text='Ласкаво просимо до нашого автосервісу!',
-                    what_you_can_title='У нас ви можете:',
-                    what_you_can_items=['Ознайомитися з переліком послуг та цінами', 'Записатися на обслуговування онлайн'],
-                    address='м. Київ, вул. Автосервісна, 1',
-                    phone='+380441234567',
-                    email='info@autoservice.ua',
-                    working_hours='Пн-Пт: 8:00-18:00, Сб: 9:00-15:00',
-                    is_active=True
-                )
-            return sto_info
+            return STOInfo.objects.filter(is_active=True).first()
         except Exception as e:
             print(f"Error in get_sto_info: {str(e)}")
             return None
@@ -212,6 +203,6 @@ class DataAccessLayer:
     
     @staticmethod
     def get_total_revenue():
-        """Отримання загального доходу"""
-        completed_appointments = Appointment.objects.filter(status='completed')
-        return sum(appointment.total_price for appointment in completed_appointments) 
\ No newline at end of file
+        """Отримання загального доходу (з денної статистики)"""
+        return DailyStats.objects.aggregate(
+            total=Sum('revenue'))['total'] or 0 
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""Потокове вивантаження записів і клієнтів у CSV та NDJSON.
+
+Рядки читаються з БД через values() та iterator(chunk_size), тож у
+пам'яті одночасно перебуває не більше однієї порції словників, і
+відразу передаються клієнту через StreamingHttpResponse. Використання
+пам'яті не залежить від кількості рядків.
+"""
+
+import csv
+import json
+from datetime import date, datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+
+from .localization import localized
+
+EXPORT_CSV = 'csv'
+EXPORT_NDJSON = 'ndjson'
+EXPORT_FORMATS = (EXPORT_CSV, EXPORT_NDJSON)
+EXPORT_CHUNK_SIZE = 2000
+
+# Поля запису без перетворень
+APPOINTMENT_FIELDS = (
+    'id', 'appointment_date', 'appointment_time', 'status', 'guest_name',
+    'guest_phone', 'guest_email', 'total_price', 'notes', 'created_at',
+)
+CUSTOMER_FIELDS = (
+    'id', 'address', 'loyalty_points', 'is_blocked', 'created_at',
+)
+
+
+class CSVRenderer(BaseRenderer):
+    """CSV для відповідей DRF (помилки); дані експорту йдуть потоком"""
+    media_type = 'text/csv'
+    format = EXPORT_CSV
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(csv_lines(rows)).encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """NDJSON для відповідей DRF (помилки); дані експорту йдуть потоком"""
+    media_type = 'application/x-ndjson'
+    format = EXPORT_NDJSON
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(ndjson_lines(rows)).encode(self.charset)
+
+
+class _Echo:
+    """Псевдо-файл для csv.writer: повертає записаний рядок"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    """Значення комірки CSV: дати в ISO 8601, None - порожньо"""
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat() if timezone.is_aware(
+            value) else value.isoformat()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return '' if value is None else value
+
+
+def csv_lines(rows, fieldnames=None):
+    """Рядки CSV: заголовок (fieldnames або ключі першого словника),
+    далі значення"""
+    writer = csv.writer(_Echo())
+    if fieldnames is not None:
+        yield writer.writerow(fieldnames)
+    for row in rows:
+        if fieldnames is None:
+            fieldnames = list(row)
+            yield writer.writerow(fieldnames)
+        yield writer.writerow([_csv_value(row[name]) for name in fieldnames])
+
+
+def ndjson_lines(rows):
+    """Рядки NDJSON: один JSON-об'єкт на рядок"""
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def get_export_format(request):
+    """Формат експорту з параметра format (csv за замовчуванням)"""
+    export_format = request.query_params.get('format', EXPORT_CSV)
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"format має бути одним з: {', '.join(EXPORT_FORMATS)}")
+    return export_format
+
+
+def appointment_rows(queryset, language):
+    """Проєкція записів для експорту"""
+    return queryset.values(
+        *APPOINTMENT_FIELDS,
+        customer_first_name=F('customer__user__first_name'),
+        customer_last_name=F('customer__user__last_name'),
+        customer_email=F('customer__user__email'),
+        service_name=localized('service__name', language),
+        box_name=localized('box__name', language),
+    )
+
+
+def customer_rows(queryset):
+    """Проєкція клієнтів для експорту"""
+    return queryset.values(
+        *CUSTOMER_FIELDS,
+        username=F('user__username'),
+        first_name=F('user__first_name'),
+        last_name=F('user__last_name'),
+        email=F('user__email'),
+        date_joined=F('user__date_joined'),
+    )
+
+
+def streaming_export(rows, export_format, filename):
+    """StreamingHttpResponse з рядками values()-queryset у заданому форматі"""
+    # Порядок колонок як у словниках values(): поля, потім анотації
+    fieldnames = [*rows.query.values_select, *rows.query.annotation_select]
+    iterator = rows.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if export_format == EXPORT_NDJSON:
+        content = ndjson_lines(iterator)
+        content_type = f'{NDJSONRenderer.media_type}; charset=utf-8'
+    else:
+        # BOM, щоб Excel коректно відкривав кирилицю
+        content = _with_prefix('\ufeff', csv_lines(iterator, fieldnames))
+        content_type = f'{CSVRenderer.media_type}; charset=utf-8'
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{export_format}"')
+    return response
+
+
+def _with_prefix(prefix, lines):
+    """Генератор рядків з префіксом перед першим рядком"""
+    yield prefix
+    yield from lines
@@ -0,0 +1,39 @@
+"""Вибір мови перекладених полів на боці БД.
+
+Перекладені поля зберігаються парами (name та name_en). Замість вибору
+в Python (get_name(language)) для кожного рядка queryset отримує
+анотацію localized_<поле> зі значенням потрібною мовою, обчисленим у БД.
+"""
+
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Coalesce, NullIf
+
+# Префікс анотацій зі значенням потрібною мовою
+LOCALIZED_PREFIX = 'localized_'
+
+
+def localized(field, language):
+    """Назва потрібною мовою з запасною на іншу (як get_name моделей)"""
+    primary, fallback = (
+        (f'{field}_en', field) if language == 'en' else (field, f'{field}_en'))
+    # Колонки мов можуть мати різні типи (TextField і CharField)
+    return Coalesce(
+        NullIf(F(primary), Value('')), F(fallback), output_field=TextField())
+
+
+def with_language(queryset, language, fields=('name', 'description')):
+    """queryset з полями fields мовою language, обчисленими в БД
+
+    Додає анотації localized_<поле>, які серіалізатор з
+    LocalizedFieldsMixin використовує замість get_<поле>(language).
+    Колонки обох мов лишаються, бо поля *_en входять у відповідь API.
+    """
+    return queryset.annotate(**{
+        f'{LOCALIZED_PREFIX}{field}': localized(field, language)
+        for field in fields
+    })
+
+
+def is_localized(instance, field):
+    """Чи завантажено значення field мовою запиту анотацією"""
+    return hasattr(instance, f'{LOCALIZED_PREFIX}{field}')
@@ -0,0 +1,106 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.services.availability_service import vectorized
+from backend.services.availability_service.availability_service import (
+    AvailabilityService)
+
+
+def build_synthetic_schedule(boxes, days, seed):
+    """Синтетичні графіки та записи без звернення до БД
+
+    Бокси працюють з 08:00 до 18:00 з понеділка по суботу, на кожен
+    день боксу припадає від 0 до 6 записів тривалістю 30-120 хвилин.
+    """
+    rng = random.Random(seed)
+    start_date = date(2030, 1, 7)
+    dates = [start_date + timedelta(days=i) for i in range(days)]
+    windows = {
+        weekday: {
+            box_id: (8 * 60, 18 * 60) for box_id in range(1, boxes + 1)
+        } if weekday < 6 else {}
+        for weekday in range(7)
+    }
+
+    busy = {}
+    for check_date in dates:
+        for box_id in windows[check_date.weekday()]:
+            intervals = []
+            for _ in range(rng.randint(0, 6)):
+                start = rng.randrange(8 * 60, 18 * 60, 15)
+                intervals.append(
+                    (start, start + rng.choice((30, 45, 60, 90, 120))))
+            if intervals:
+                busy[(box_id, check_date)] = (
+                    AvailabilityService.merge_intervals(intervals))
+    return dates, windows, busy
+
+
+class Command(BaseCommand):
+    help = ('Порівнює швидкість розрахунку доступності на чистому Python '
+            'та на NumPy')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--boxes', type=int, nargs='+', default=[5, 20, 50],
+            help='Кількість боксів (можна кілька значень)')
+        parser.add_argument(
+            '--days', type=int, default=90, help='Довжина періоду (дні)')
+        parser.add_argument(
+            '--duration', type=int, default=60,
+            help='Тривалість послуги (хвилини)')
+        parser.add_argument(
+            '--step', type=int, default=30, help='Крок слотів (хвилини)')
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Кількість повторів (береться найкращий час)')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def _measure(self, repeat, func):
+        """Найкращий час виконання та результат"""
+        best = None
+        result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        if not vectorized.is_available():
+            raise CommandError(
+                'NumPy не встановлено: pip install numpy')
+
+        self.stdout.write(
+            f"Період: {options['days']} днів, тривалість "
+            f"{options['duration']} хв, крок {options['step']} хв")
+        self.stdout.write(
+            f"{'Бокси':>6} {'Python, мс':>12} {'NumPy, мс':>12} "
+            f"{'Прискорення':>12}")
+
+        for boxes in options['boxes']:
+            dates, windows, busy = build_synthetic_schedule(
+                boxes, options['days'], options['seed'])
+
+            def run(engine):
+                return AvailabilityService.assign_free_starts(
+                    dates, windows, busy, False, options['duration'],
+                    options['step'], engine=engine)
+
+            python_time, python_result = self._measure(
+                options['repeat'], lambda: run(vectorized.ENGINE_PYTHON))
+            numpy_time, numpy_result = self._measure(
+                options['repeat'], lambda: run(vectorized.ENGINE_NUMPY))
+
+            if python_result != numpy_result:
+                raise CommandError(
+                    f'Результати движків різняться для {boxes} боксів')
+
+            self.stdout.write(
+                f'{boxes:>6} {python_time * 1000:>12.1f} '
+                f'{numpy_time * 1000:>12.1f} '
+                f'{python_time / numpy_time:>11.1f}x')
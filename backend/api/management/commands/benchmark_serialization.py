@@ -0,0 +1,123 @@
+import time as timer
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.api.models import (
+    Appointment, Box, Customer, Service, ServiceCategory)
+from backend.api.serializers import (
+    AppointmentSerializer, BoxSerializer, ServiceSerializer)
+
+
+class UncachedAppointmentSerializer(AppointmentSerializer):
+    """Серіалізація без кешу: послуга, категорія та бокс для кожного рядка"""
+
+    def get_service(self, obj):
+        return ServiceSerializer(
+            obj.service,
+            context={'language': self.context.get('language', 'uk')}).data
+
+    def get_box(self, obj):
+        if not obj.box_id:
+            return None
+        return BoxSerializer(
+            obj.box,
+            context={'language': self.context.get('language', 'uk')}).data
+
+
+def build_synthetic_appointments(count, services, boxes, customers):
+    """Незбережені записи зі зв'язками в пам'яті (без звернень до БД)"""
+    categories = [
+        ServiceCategory(id=i, name=f'Категорія {i}', name_en=f'Category {i}',
+                        order=i)
+        for i in range(1, 4)
+    ]
+    service_objects = [
+        Service(id=i, name=f'Послуга {i}', name_en=f'Service {i}',
+                price=Decimal('500.00') + i, duration_minutes=30 + i % 4 * 30,
+                category=categories[i % len(categories)])
+        for i in range(1, services + 1)
+    ]
+    working_hours = {'monday': {'start': '08:00', 'end': '18:00'}}
+    box_objects = [
+        Box(id=i, name=f'Бокс {i}', name_en=f'Box {i}',
+            working_hours=working_hours)
+        for i in range(1, boxes + 1)
+    ]
+    customer_objects = [
+        Customer(id=i, user=User(
+            id=i, username=f'user{i}', first_name='Ім\'я',
+            last_name=f'Прізвище {i}'))
+        for i in range(1, customers + 1)
+    ]
+
+    start_date = date(2030, 1, 7)
+    return [
+        Appointment(
+            id=i + 1,
+            customer=customer_objects[i % customers],
+            service=service_objects[i % services],
+            box=box_objects[i % boxes] if i % 10 else None,
+            appointment_date=start_date + timedelta(days=i // 40),
+            appointment_time=time(8 + i % 10, 0),
+            status='confirmed',
+            total_price=Decimal('500.00'))
+        for i in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Порівнює час серіалізації списку записів з кешем пов\'язаних '
+            'об\'єктів і без нього')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--appointments', type=int, default=5000,
+            help='Кількість записів у списку')
+        parser.add_argument('--services', type=int, default=12)
+        parser.add_argument('--boxes', type=int, default=5)
+        parser.add_argument('--customers', type=int, default=500)
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Кількість повторів (береться найкращий час)')
+
+    def _measure(self, repeat, serializer_class, appointments):
+        """Найкращий час серіалізації та результат"""
+        best = None
+        data = None
+        for _ in range(repeat):
+            started = timer.perf_counter()
+            data = serializer_class(
+                appointments, many=True, context={'language': 'uk'}).data
+            elapsed = timer.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, data
+
+    def handle(self, *args, **options):
+        appointments = build_synthetic_appointments(
+            options['appointments'], options['services'], options['boxes'],
+            options['customers'])
+        per_thousand = 1000 / len(appointments)
+
+        uncached_time, uncached = self._measure(
+            options['repeat'], UncachedAppointmentSerializer, appointments)
+        cached_time, cached = self._measure(
+            options['repeat'], AppointmentSerializer, appointments)
+
+        if uncached != cached:
+            raise CommandError('Результати серіалізації різняться')
+
+        self.stdout.write(
+            f"Записів: {len(appointments)}, послуг: {options['services']}, "
+            f"боксів: {options['boxes']}")
+        self.stdout.write(
+            f'Без кешу: {uncached_time * per_thousand * 1000:.1f} мс '
+            f'на 1000 записів')
+        self.stdout.write(
+            f'З кешем:  {cached_time * per_thousand * 1000:.1f} мс '
+            f'на 1000 записів')
+        self.stdout.write(
+            self.style.SUCCESS(  # pylint: disable=no-member
+                f'Прискорення: {uncached_time / cached_time:.1f}x'))
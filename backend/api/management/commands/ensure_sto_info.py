@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from backend.api.models import STOInfo
+
+# Інформація про СТО, якщо активного запису ще немає
+DEFAULT_STO_INFO = {
+    'name': 'СТО "Автосервіс"',
+    'description': 'Професійне обслуговування автомобілів',
+    'motto': 'Якість та надійність',
+    'welcome_text': 'Ласкаво просимо до нашого автосервісу!',
+    'what_you_can_title': 'У нас ви можете:',
+    'what_you_can_items': [
+        'Ознайомитися з переліком послуг та цінами',
+        'Записатися на обслуговування онлайн',
+    ],
+    'address': 'м. Київ, вул. Автосервісна, 1',
+    'phone': '+380441234567',
+    'email': 'info@autoservice.ua',
+    'working_hours': 'Пн-Пт: 8:00-18:00, Сб: 9:00-15:00',
+}
+
+
+class Command(BaseCommand):
+    help = 'Створює інформацію про СТО за замовчуванням, якщо її немає'
+
+    def handle(self, *args, **options):
+        sto_info = STOInfo.objects.filter(  # pylint: disable=no-member
+            is_active=True).first()
+        if sto_info:
+            self.stdout.write(f'Інформація про СТО вже є: {sto_info.name}')
+            return
+
+        sto_info = STOInfo.objects.create(  # pylint: disable=no-member
+            is_active=True, **DEFAULT_STO_INFO)
+        self.stdout.write(
+            self.style.SUCCESS(  # pylint: disable=no-member
+                f'✅ Створено інформацію про СТО: {sto_info.name}'))
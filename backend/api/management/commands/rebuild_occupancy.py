@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.services.availability_service.occupancy import OccupancyService
+
+
+def parse_date_option(value, name):
+    """Дата з параметра команди у форматі YYYY-MM-DD"""
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError as exc:
+        raise CommandError(
+            f'Неправильний формат {name}, очікується YYYY-MM-DD') from exc
+
+
+class Command(BaseCommand):
+    help = 'Перебудовує бітові карти зайнятості боксів та звіряє їх із записами'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from', dest='date_from',
+            help='Перша дата діапазону (YYYY-MM-DD)')
+        parser.add_argument(
+            '--to', dest='date_to',
+            help='Остання дата діапазону (YYYY-MM-DD)')
+        parser.add_argument(
+            '--verify-only', action='store_true',
+            help='Лише перевірити відповідність карт записам')
+
+    def handle(self, *args, **options):
+        date_from = parse_date_option(options['date_from'], '--from')
+        date_to = parse_date_option(options['date_to'], '--to')
+        if date_from and date_to and date_from > date_to:
+            raise CommandError('--from не може бути пізніше за --to')
+
+        if not options['verify_only']:
+            created = OccupancyService.rebuild(date_from, date_to)
+            self.stdout.write(
+                self.style.SUCCESS(  # pylint: disable=no-member
+                    f'✅ Збережено карт зайнятості: {created}'))
+
+        mismatches = OccupancyService.verify(date_from, date_to)
+        if mismatches:
+            for box_id, day, stored, expected in mismatches[:20]:
+                self.stdout.write(
+                    f'❌ Бокс {box_id}, {day}: '
+                    f'збережено {stored:#x}, очікується {expected:#x}')
+            raise CommandError(
+                f'Розбіжностей у картах зайнятості: {len(mismatches)}')
+
+        self.stdout.write(
+            self.style.SUCCESS(  # pylint: disable=no-member
+                '✅ Карти зайнятості відповідають записам'))
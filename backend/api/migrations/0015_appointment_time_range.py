@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_time_range(apps, schema_editor):
+    """Обчислення start_at/end_at для наявних записів"""
+    Appointment = apps.get_model('api', 'Appointment')
+    appointments = Appointment.objects.select_related('service').only(
+        'id', 'appointment_date', 'appointment_time',
+        'service__duration_minutes')
+    batch = []
+    for appointment in appointments.iterator(chunk_size=1000):
+        start_at = datetime.combine(
+            appointment.appointment_date, appointment.appointment_time)
+        if settings.USE_TZ:
+            start_at = timezone.make_aware(start_at)
+        duration = appointment.service.duration_minutes or 60
+        appointment.start_at = start_at
+        appointment.end_at = start_at + timedelta(minutes=duration)
+        batch.append(appointment)
+        if len(batch) >= 1000:
+            Appointment.objects.bulk_update(batch, ['start_at', 'end_at'])
+            batch = []
+    if batch:
+        Appointment.objects.bulk_update(batch, ['start_at', 'end_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_add_service_is_featured'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='start_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Початок'),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='end_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Кінець'),
+        ),
+        migrations.RunPython(fill_time_range, migrations.RunPython.noop),
+    ]
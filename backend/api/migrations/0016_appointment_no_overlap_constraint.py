@@ -0,0 +1,78 @@
+from django.db import migrations
+
+ACTIVE_STATUSES = ('pending', 'confirmed', 'in_progress')
+CONSTRAINT_NAME = 'appointment_box_no_overlap'
+
+
+# Записи без інтервалу не беруть участі в обмеженні: tstzrange(NULL,
+# NULL) - необмежений діапазон, що перекривав би всі записи боксу
+CONSTRAINT_PREDICATE = (
+    'box_id IS NOT NULL AND start_at IS NOT NULL AND end_at IS NOT NULL '
+    'AND status IN ({statuses})'
+)
+OVERLAP_REPORT_LIMIT = 20
+
+
+def find_overlaps(schema_editor, table, statuses):
+    """Пари активних записів одного боксу з перекриттям інтервалів"""
+    predicate = CONSTRAINT_PREDICATE.format(statuses=statuses)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT a.id, b.id, a.box_id FROM '
+            f'(SELECT * FROM {table} WHERE {predicate}) a '
+            f'JOIN (SELECT * FROM {table} WHERE {predicate}) b '
+            f'ON a.box_id = b.box_id AND a.id < b.id '
+            f'AND a.start_at < b.end_at AND b.start_at < a.end_at '
+            f'ORDER BY a.id, b.id LIMIT {OVERLAP_REPORT_LIMIT}'
+        )
+        return cursor.fetchall()
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    """Обмеження виключення: активні записи одного боксу не перекриваються
+
+    Доступне тільки в PostgreSQL (розширення btree_gist). На інших СУБД
+    перевірка лишається на рівні застосунку. Якщо в даних уже є
+    перекриття, міграція зупиняється зі списком таких записів: їх
+    потрібно перенести або скасувати вручну і повторити migrate.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = apps.get_model('api', 'Appointment')._meta.db_table
+    statuses = ', '.join(f"'{status}'" for status in ACTIVE_STATUSES)
+    overlaps = find_overlaps(schema_editor, table, statuses)
+    if overlaps:
+        pairs = ', '.join(
+            f'#{first} і #{second} (бокс {box_id})'
+            for first, second, box_id in overlaps)
+        raise RuntimeError(
+            f'Неможливо додати {CONSTRAINT_NAME}: активні записи '
+            f'перекриваються: {pairs}. Перенесіть або скасуйте їх і '
+            f'повторіть migrate.')
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        f'ALTER TABLE {table} ADD CONSTRAINT {CONSTRAINT_NAME} '
+        f'EXCLUDE USING gist ('
+        f"box_id WITH =, tstzrange(start_at, end_at, '[)') WITH &&"
+        f') WHERE ({CONSTRAINT_PREDICATE.format(statuses=statuses)})'
+    )
+
+
+def remove_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = apps.get_model('api', 'Appointment')._meta.db_table
+    schema_editor.execute(
+        f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {CONSTRAINT_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_appointment_time_range'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            add_exclusion_constraint, remove_exclusion_constraint),
+    ]
@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+ACTIVE_STATUSES = ('pending', 'confirmed', 'in_progress')
+
+
+def fill_occupancy(apps, schema_editor):
+    """Побудова карт зайнятості для наявних записів"""
+    Appointment = apps.get_model('api', 'Appointment')
+    BoxOccupancy = apps.get_model('api', 'BoxOccupancy')
+
+    masks = defaultdict(int)
+    appointments = Appointment.objects.filter(
+        status__in=ACTIVE_STATUSES, box__isnull=False
+    ).values_list(
+        'box_id', 'appointment_date', 'appointment_time',
+        'service__duration_minutes')
+    for box_id, appointment_date, start_time, duration in (
+            appointments.iterator(chunk_size=1000)):
+        start = start_time.hour * 60 + start_time.minute
+        end = start + (duration or 60)
+        first = start // SLOT_MINUTES
+        last = min(-(-end // SLOT_MINUTES), SLOTS_PER_DAY)
+        if first < last:
+            masks[(box_id, appointment_date)] |= (
+                ((1 << (last - first)) - 1) << first)
+
+    BoxOccupancy.objects.bulk_create([
+        BoxOccupancy(
+            box_id=box_id, date=day,
+            bitmap=mask.to_bytes(SLOTS_PER_DAY // 8, 'little'))
+        for (box_id, day), mask in masks.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_appointment_no_overlap_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoxOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('bitmap', models.BinaryField(verbose_name='Карта зайнятості')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('box', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='api.box', verbose_name='Бокс')),
+            ],
+            options={
+                'verbose_name': 'Зайнятість боксу',
+                'verbose_name_plural': 'Зайнятість боксів',
+                'unique_together': {('box', 'date')},
+            },
+        ),
+        migrations.RunPython(fill_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:53
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+import django.db.models.deletion
+
+STATUSES = (
+    'pending', 'confirmed', 'in_progress', 'completed', 'cancelled',
+    'cancelled_by_admin',
+)
+
+
+def fill_daily_stats(apps, schema_editor):
+    """Побудова денної статистики для наявних записів"""
+    Appointment = apps.get_model('api', 'Appointment')
+    DailyStats = apps.get_model('api', 'DailyStats')
+
+    counts = {
+        f'{status}_count': Count('id', filter=Q(status=status))
+        for status in STATUSES
+    }
+    grouped = Appointment.objects.order_by().values(
+        'appointment_date', 'box_id', 'service_id'
+    ).annotate(
+        revenue=Sum('total_price', filter=Q(status='completed')), **counts)
+
+    DailyStats.objects.bulk_create([
+        DailyStats(
+            date=row['appointment_date'],
+            box_id=row['box_id'],
+            service_id=row['service_id'],
+            revenue=row['revenue'] or 0,
+            **{field: row[field] for field in counts})
+        for row in grouped.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_boxoccupancy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('pending_count', models.IntegerField(default=0, verbose_name='Очікують')),
+                ('confirmed_count', models.IntegerField(default=0, verbose_name='Підтверджено')),
+                ('in_progress_count', models.IntegerField(default=0, verbose_name='В роботі')),
+                ('completed_count', models.IntegerField(default=0, verbose_name='Завершено')),
+                ('cancelled_count', models.IntegerField(default=0, verbose_name='Скасовано клієнтом')),
+                ('cancelled_by_admin_count', models.IntegerField(default=0, verbose_name='Скасовано адміністратором')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Дохід (завершені записи)')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('box', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='api.box', verbose_name='Бокс')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='api.service', verbose_name='Послуга')),
+            ],
+            options={
+                'verbose_name': 'Денна статистика',
+                'verbose_name_plural': 'Денна статистика',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailystats',
+            constraint=models.UniqueConstraint(condition=models.Q(('box__isnull', False)), fields=('date', 'box', 'service'), name='daily_stats_unique_box'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailystats',
+            constraint=models.UniqueConstraint(condition=models.Q(('box__isnull', True)), fields=('date', 'service'), name='daily_stats_unique_unassigned'),
+        ),
+        migrations.RunPython(fill_daily_stats, migrations.RunPython.noop),
+    ]
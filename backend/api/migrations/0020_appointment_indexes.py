@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_stoinfo_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('status__in', ('pending', 'confirmed', 'in_progress'))), fields=['box', 'appointment_date', 'appointment_time'], name='appt_box_date_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('status__in', ('pending', 'confirmed', 'in_progress'))), fields=['box', 'start_at', 'end_at'], name='appt_box_start_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['customer', 'status'], name='appt_customer_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['-appointment_date', '-appointment_time', '-id'], name='appt_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', '-appointment_date', '-appointment_time'], name='appt_status_date_idx'),
+        ),
+    ]
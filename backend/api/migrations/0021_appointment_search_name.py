@@ -0,0 +1,72 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:10
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+INDEX_NAME = 'appt_search_name_trgm_idx'
+APOSTROPHES = re.compile("[’ʼ`´]")
+
+
+def normalize_search_text(*parts):
+    text = ' '.join(part for part in parts if part)
+    text = APOSTROPHES.sub("'", unicodedata.normalize('NFKC', text))
+    return ' '.join(text.casefold().split())
+
+
+def fill_search_name(apps, schema_editor):
+    """Заповнення search_name для наявних записів"""
+    Appointment = apps.get_model('api', 'Appointment')
+    batch = []
+    for appointment in Appointment.objects.select_related(
+            'customer__user').iterator(chunk_size=2000):
+        user = appointment.customer.user if appointment.customer_id else None
+        appointment.search_name = normalize_search_text(
+            user.first_name if user else '', user.last_name if user else '',
+            appointment.guest_name)
+        batch.append(appointment)
+        if len(batch) >= 2000:
+            Appointment.objects.bulk_update(batch, ['search_name'])
+            batch = []
+    if batch:
+        Appointment.objects.bulk_update(batch, ['search_name'])
+
+
+def add_trigram_index(apps, schema_editor):
+    """Триграмний GIN-індекс для пошуку за підрядком та схожістю
+
+    Доступний тільки в PostgreSQL (розширення pg_trgm). На інших СУБД
+    пошук працює без індексу.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = apps.get_model('api', 'Appointment')._meta.db_table
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON {table} '
+        f'USING gin (search_name gin_trgm_ops)'
+    )
+
+
+def remove_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_appointment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='search_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=400, verbose_name="Ім'я для пошуку"),
+        ),
+        migrations.RunPython(fill_search_name, migrations.RunPython.noop),
+        migrations.RunPython(add_trigram_index, remove_trigram_index),
+    ]
@@ -1,8 +1,100 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
+from datetime import datetime, timedelta
 from decimal import Decimal
 import json
+import re
+import unicodedata
+
+# Назви днів тижня за індексом date.weekday()
+WEEKDAY_NAMES = (
+    'monday', 'tuesday', 'wednesday', 'thursday',
+    'friday', 'saturday', 'sunday'
+)
+
+# Статуси записів, що займають бокс
+ACTIVE_APPOINTMENT_STATUSES = ('pending', 'confirmed', 'in_progress')
+
+# Варіанти апострофа в іменах (Ім'я, Ім’я, Імʼя) зводяться до одного
+_APOSTROPHES = re.compile("[\u2019\u02bc\u0060\u00b4]")
+
+
+def normalize_search_text(*parts):
+    """Текст для пошуку: NFKC, нижній регістр, один вид апострофа та
+    одинарні пробіли між непорожніми частинами"""
+    text = ' '.join(part for part in parts if part)
+    text = _APOSTROPHES.sub("'", unicodedata.normalize('NFKC', text))
+    return ' '.join(text.casefold().split())
+
+
+def _compile_working_day(working_hours):
+    """Перетворення графіку дня {'start': 'HH:MM', 'end': 'HH:MM'}
+    в інтервал хвилин або None для вихідного"""
+    if not working_hours or not isinstance(working_hours, dict):
+        return None
+
+    start_time = working_hours.get('start', '09:00')
+    end_time = working_hours.get('end', '18:00')
+
+    # 00:00-00:00 означає вихідний день
+    if start_time == '00:00' or end_time == '00:00':
+        return None
+
+    try:
+        start_hours, start_mins = str(start_time).split(':')[:2]
+        end_hours, end_mins = str(end_time).split(':')[:2]
+        start_minutes = int(start_hours) * 60 + int(start_mins)
+        end_minutes = int(end_hours) * 60 + int(end_mins)
+    except ValueError:
+        return None
+
+    if start_minutes >= end_minutes:
+        return None
+    return start_minutes, end_minutes
+
+
+class LoadedValuesMixin:
+    """Запам'ятовує значення полів, з якими екземпляр завантажено з БД.
+
+    Дозволяє обробникам сигналів побачити попередні значення
+    (наприклад стару дату запису при перенесенні).
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_loaded_value(self, field_name, default=None):
+        """Значення поля на момент завантаження або останнього збереження"""
+        return getattr(self, '_loaded_values', {}).get(field_name, default)
+
+    def has_field_changed(self, field_name):
+        """Чи змінилося поле з моменту завантаження (нові об'єкти - так)"""
+        loaded_values = getattr(self, '_loaded_values', None)
+        if loaded_values is None or field_name not in loaded_values:
+            return True
+        return loaded_values[field_name] != getattr(self, field_name)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.remember_loaded_values()
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_loaded_values()
+
+    def remember_loaded_values(self):
+        """Фіксація поточних значень як збережених"""
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+        }
 
 
 class ServiceCategory(models.Model):
@@ -38,7 +130,7 @@ class ServiceCategory(models.Model):
             return self.description if self.description else self.description_en
 
 
-class Box(models.Model):
+class Box(LoadedValuesMixin, models.Model):
     """Модель боксу (парковочного місця)"""
     name = models.CharField(max_length=100, verbose_name='Назва боксу')
     name_en = models.CharField(max_length=100, verbose_name='Назва боксу (англ.)', blank=True)
@@ -75,6 +167,15 @@ class Box(models.Model):
         else:
             return self.description if self.description else self.description_en
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Графік міг змінитися - скидаємо скомпільований розклад
+        self._compiled_schedule = None
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._compiled_schedule = None
+
     def get_working_hours_for_day(self, day_name):
         """Отримання графіку роботи для конкретного дня"""
         if isinstance(self.working_hours, str):
@@ -87,31 +188,43 @@ class Box(models.Model):
         
         return working_hours.get(day_name.lower())
 
-    def is_available_at_time(self, date, time):
-        """Перевірка чи бокс вільний в заданий час"""
-        from datetime import datetime
-        import calendar
-        
-        # Отримуємо день тижня
-        day_name = calendar.day_name[date.weekday()].lower()
-        working_hours = self.get_working_hours_for_day(day_name)
-        
-        if not working_hours:
+    def get_weekly_schedule(self):
+        """Скомпільований тижневий графік роботи
+
+        Кортеж із 7 елементів за індексом date.weekday(): інтервал
+        (початок, кінець) у хвилинах від початку доби або None для
+        вихідного. Будується один раз на екземпляр і скидається при
+        збереженні.
+        """
+        schedule = getattr(self, '_compiled_schedule', None)
+        if schedule is None:
+            schedule = tuple(
+                _compile_working_day(self.get_working_hours_for_day(day))
+                for day in WEEKDAY_NAMES
+            )
+            self._compiled_schedule = schedule
+        return schedule
+
+    def get_working_window(self, weekday):
+        """Робочий інтервал у хвилинах для дня тижня (0 - понеділок)"""
+        return self.get_weekly_schedule()[weekday]
+
+    def is_available_at_time(self, date, time, duration_minutes=None):
+        """Перевірка чи бокс працює в заданий час
+
+        Якщо вказано duration_minutes, перевіряється що вся послуга
+        вміщується до кінця робочого дня.
+        """
+        window = self.get_working_window(date.weekday())
+        if not window:
             return False
-        
-        # Перевіряємо чи бокс працює в цей день (не 00:00-00:00)
-        start_time = working_hours.get('start', '00:00')
-        end_time = working_hours.get('end', '23:59')
-        
-        if start_time == '00:00' and end_time == '00:00':
-            return False
-        
-        # Перевіряємо чи час в межах робочого графіку
-        time_str = time.strftime('%H:%M')
-        return start_time <= time_str <= end_time
 
+        start_minutes = time.hour * 60 + time.minute
+        end_minutes = start_minutes + (duration_minutes or 0)
+        return window[0] <= start_minutes and end_minutes <= window[1]
 
-class Service(models.Model):
+
+class Service(LoadedValuesMixin, models.Model):
     """Модель послуги СТО"""
     name = models.CharField(max_length=200)
     name_en = models.CharField(max_length=200, verbose_name='Назва послуги (англ.)', blank=True)
@@ -190,7 +303,7 @@ class Customer(models.Model):
         return final_price
 
 
-class Appointment(models.Model):
+class Appointment(LoadedValuesMixin, models.Model):
     """Модель запису на обслуговування"""
     STATUS_CHOICES = [
         ('pending', 'Очікує підтвердження'),
@@ -200,6 +313,10 @@ class Appointment(models.Model):
         ('cancelled', 'Скасовано клієнтом'),
         ('cancelled_by_admin', 'Скасовано адміністратором'),
     ]
+    # Статуси, в яких запис займає бокс
+    ACTIVE_STATUSES = ACTIVE_APPOINTMENT_STATUSES
+    # Тривалість за замовчуванням, якщо у послуги її не вказано
+    DEFAULT_DURATION_MINUTES = 60
 
     customer = models.ForeignKey(
         Customer,
@@ -238,6 +355,18 @@ class Appointment(models.Model):
         decimal_places=2,
         verbose_name='Загальна вартість'
     )
+    # Часовий інтервал запису, обчислюється при збереженні з дати, часу
+    # та тривалості послуги. У PostgreSQL на нього накладено обмеження
+    # виключення, що забороняє перекриття записів в одному боксі.
+    start_at = models.DateTimeField(
+        null=True, blank=True, editable=False, verbose_name='Початок')
+    end_at = models.DateTimeField(
+        null=True, blank=True, editable=False, verbose_name='Кінець')
+    # Нормалізоване ім'я клієнта або гостя для пошуку адміністратором.
+    # У PostgreSQL має триграмний GIN-індекс (pg_trgm).
+    search_name = models.CharField(
+        max_length=400, blank=True, default='', editable=False,
+        verbose_name="Ім'я для пошуку")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -245,6 +374,33 @@ class Appointment(models.Model):
         verbose_name = 'Запис'
         verbose_name_plural = 'Записи'
         ordering = ['-appointment_date', '-appointment_time']
+        indexes = [
+            # Зайнятість боксів за діапазон дат (доступність, карти
+            # зайнятості) - тільки активні записи
+            models.Index(
+                fields=['box', 'appointment_date', 'appointment_time'],
+                condition=models.Q(
+                    status__in=ACTIVE_APPOINTMENT_STATUSES),
+                name='appt_box_date_active_idx'),
+            # Перекриття інтервалів при виборі вільного боксу
+            models.Index(
+                fields=['box', 'start_at', 'end_at'],
+                condition=models.Q(
+                    status__in=ACTIVE_APPOINTMENT_STATUSES),
+                name='appt_box_start_active_idx'),
+            # Записи клієнта з фільтром по статусу
+            models.Index(
+                fields=['customer', 'status'],
+                name='appt_customer_status_idx'),
+            # Діапазони дат у порядку розкладу та keyset-пагінація
+            models.Index(
+                fields=['-appointment_date', '-appointment_time', '-id'],
+                name='appt_date_time_idx'),
+            # Фільтр адміністратора по статусу з сортуванням за датою
+            models.Index(
+                fields=['status', '-appointment_date', '-appointment_time'],
+                name='appt_status_date_idx'),
+        ]
 
     def __str__(self):
         if self.customer:
@@ -256,11 +412,175 @@ class Appointment(models.Model):
             f"({self.appointment_date})"
         )
 
+    @staticmethod
+    def compute_time_range(appointment_date, appointment_time,
+                           duration_minutes=None):
+        """Інтервал (початок, кінець) запису як datetime"""
+        if isinstance(appointment_date, str):
+            appointment_date = parse_date(appointment_date)
+        if isinstance(appointment_time, str):
+            appointment_time = parse_time(appointment_time)
+
+        start_at = datetime.combine(appointment_date, appointment_time)
+        if settings.USE_TZ:
+            start_at = timezone.make_aware(start_at)
+        duration = duration_minutes or Appointment.DEFAULT_DURATION_MINUTES
+        return start_at, start_at + timedelta(minutes=duration)
+
+    @staticmethod
+    def recompute_time_ranges(service, batch_size=500):
+        """Перерахунок start_at/end_at записів послуги з її тривалістю
+
+        Потрібен після зміни тривалості послуги: інтервали записів
+        обчислюються лише при збереженні запису. Повертає кількість
+        змінених записів. У PostgreSQL перекриття нових інтервалів
+        порушує обмеження виключення (IntegrityError).
+        """
+        changed = []
+        for appointment in Appointment.objects.filter(  # pylint: disable=no-member
+                service=service).only(
+                    'id', 'appointment_date', 'appointment_time',
+                    'start_at', 'end_at').iterator(chunk_size=batch_size):
+            time_range = Appointment.compute_time_range(
+                appointment.appointment_date, appointment.appointment_time,
+                service.duration_minutes)
+            if time_range != (appointment.start_at, appointment.end_at):
+                appointment.start_at, appointment.end_at = time_range
+                changed.append(appointment)
+        Appointment.objects.bulk_update(  # pylint: disable=no-member
+            changed, ['start_at', 'end_at'], batch_size=batch_size)
+        return len(changed)
+
     def save(self, *args, **kwargs):
         if not self.total_price:
             self.total_price = self.service.price
+        self.start_at, self.end_at = self.compute_time_range(
+            self.appointment_date, self.appointment_time,
+            self.service.duration_minutes)
+        if (self.has_field_changed('customer_id') or
+                self.has_field_changed('guest_name')):
+            self.search_name = self.compute_search_name()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {
+                'start_at', 'end_at', 'search_name'}
         super().save(*args, **kwargs)
 
+    def compute_search_name(self):
+        """Нормалізоване ім'я клієнта та гостя для поля search_name"""
+        if self.customer_id:
+            user = self.customer.user
+            return normalize_search_text(
+                user.first_name, user.last_name, self.guest_name)
+        return normalize_search_text(self.guest_name)
+
+
+class BoxOccupancy(models.Model):
+    """Бітова карта зайнятості боксу на дату
+
+    Доба поділена на слоти по SLOT_MINUTES хвилин, біт i встановлено,
+    якщо слот i перекривається хоча б одним активним записом боксу.
+    Рядок існує лише для днів з хоча б одним зайнятим слотом.
+    """
+    SLOT_MINUTES = 5
+    SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+    box = models.ForeignKey(
+        Box,
+        on_delete=models.CASCADE,
+        related_name='occupancy',
+        verbose_name='Бокс'
+    )
+    date = models.DateField(verbose_name='Дата')
+    bitmap = models.BinaryField(verbose_name='Карта зайнятості')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Зайнятість боксу'
+        verbose_name_plural = 'Зайнятість боксів'
+        unique_together = ['box', 'date']
+
+    def __str__(self):
+        return f"{self.box} - {self.date}"
+
+    @classmethod
+    def mask_to_bytes(cls, mask):
+        """Бітова маска у вигляді байтів для збереження"""
+        return mask.to_bytes(cls.SLOTS_PER_DAY // 8, 'little')
+
+    @staticmethod
+    def bytes_to_mask(value):
+        """Бітова маска зі збережених байтів"""
+        return int.from_bytes(bytes(value), 'little')
+
+    @property
+    def mask(self):
+        """Бітова маска зайнятих слотів як ціле число"""
+        return self.bytes_to_mask(self.bitmap)
+
+
+class DailyStats(models.Model):
+    """Денна зведена статистика записів по боксу та послузі
+
+    Рядок містить кількість записів у кожному статусі та дохід
+    завершених записів за дату для пари (бокс, послуга). Підсумки за
+    дату, бокс чи послугу отримуються сумуванням рядків.
+    """
+    # Поле лічильника для кожного статусу запису
+    STATUS_COUNT_FIELDS = {
+        status: f'{status}_count' for status, _ in Appointment.STATUS_CHOICES
+    }
+
+    date = models.DateField(verbose_name='Дата')
+    box = models.ForeignKey(
+        Box,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='daily_stats',
+        verbose_name='Бокс'
+    )
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        verbose_name='Послуга'
+    )
+    pending_count = models.IntegerField(default=0, verbose_name='Очікують')
+    confirmed_count = models.IntegerField(
+        default=0, verbose_name='Підтверджено')
+    in_progress_count = models.IntegerField(default=0, verbose_name='В роботі')
+    completed_count = models.IntegerField(default=0, verbose_name='Завершено')
+    cancelled_count = models.IntegerField(
+        default=0, verbose_name='Скасовано клієнтом')
+    cancelled_by_admin_count = models.IntegerField(
+        default=0, verbose_name='Скасовано адміністратором')
+    revenue = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name='Дохід (завершені записи)'
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Денна статистика'
+        verbose_name_plural = 'Денна статистика'
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'box', 'service'],
+                condition=models.Q(box__isnull=False),
+                name='daily_stats_unique_box'),
+            models.UniqueConstraint(
+                fields=['date', 'service'],
+                condition=models.Q(box__isnull=True),
+                name='daily_stats_unique_unassigned'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.box} - {self.service}"
+
 
 class ServiceHistory(models.Model):
     """Модель історії обслуговування"""
@@ -360,6 +680,7 @@ class STOInfo(models.Model):
     working_hours_en = models.CharField(
         max_length=100, verbose_name='Робочі години (англ.)', blank=True)
     is_active = models.BooleanField(default=True, verbose_name='Активна')
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Інформація про СТО'
@@ -0,0 +1,172 @@
+"""Keyset (cursor) пагінація списків записів.
+
+Сторінка вибирається умовою на ключ сортування (дата, час, id) замість
+OFFSET, тому вартість запиту не залежить від номера сторінки, а записи,
+додані між запитами, не зсувають сторінки. Курсор - непрозорий токен
+з ключем останнього рядка попередньої сторінки. Результати пошуку за
+ім'ям (анотація search_rank) сортуються спочатку за рангом, і ранг
+входить до ключа курсора.
+"""
+
+import base64
+import json
+from datetime import date, time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATE = 'estimate'
+COUNT_NONE = 'none'
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+
+
+# Ключ сортування за рангом пошуку за ім'ям
+SEARCH_RANK = 'search_rank'
+
+# Перетворення значень ключа з JSON курсора
+KEY_PARSERS = {
+    SEARCH_RANK: float,
+    'appointment_date': date.fromisoformat,
+    'appointment_time': time.fromisoformat,
+    'id': int,
+}
+
+
+class AppointmentKeysetPagination:
+    """Пагінація записів за спаданням (appointment_date, appointment_time, id)
+
+    Якщо queryset має анотацію search_rank, ключем є
+    (search_rank, appointment_date, appointment_time, id), тож порядок
+    релевантності пошуку зберігається на всіх сторінках.
+
+    Пам'ять на запит обмежена розміром сторінки: з БД читається не більше
+    page_size + 1 рядків. Загальна кількість рахується точно (COUNT(*)),
+    оцінюється (COUNT з обмеженням, а на PostgreSQL - оцінка планувальника
+    для великих вибірок) або не рахується зовсім.
+    """
+
+    key_fields = ('appointment_date', 'appointment_time', 'id')
+
+    @staticmethod
+    def default_page_size():
+        """Розмір сторінки за замовчуванням"""
+        return getattr(settings, 'ADMIN_APPOINTMENTS_PAGE_SIZE', 50)
+
+    @staticmethod
+    def max_page_size():
+        """Максимальний розмір сторінки"""
+        return getattr(settings, 'ADMIN_APPOINTMENTS_MAX_PAGE_SIZE', 500)
+
+    @staticmethod
+    def count_limit():
+        """Поріг, до якого оцінка кількості є точною"""
+        return getattr(settings, 'ADMIN_APPOINTMENTS_COUNT_LIMIT', 1000)
+
+    def get_key_fields(self, queryset):
+        """Поля ключа сортування для queryset"""
+        if SEARCH_RANK in queryset.query.annotations:
+            return (SEARCH_RANK, *self.key_fields)
+        return self.key_fields
+
+    @staticmethod
+    def encode_cursor(appointment, fields):
+        """Токен курсора для рядка, після якого починається наступна сторінка"""
+        key = []
+        for field in fields:
+            value = getattr(appointment, field)
+            key.append(value.isoformat()
+                       if isinstance(value, (date, time)) else value)
+        raw = json.dumps(key, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(token, fields):
+        """Ключ з токена для полів fields; ValueError для пошкодженого токена"""
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            values = json.loads(raw.decode('utf-8'))
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError('Неправильна довжина ключа')
+            return tuple(KEY_PARSERS[field](value)
+                         for field, value in zip(fields, values))
+        except (TypeError, ValueError, UnicodeDecodeError) as exc:
+            raise ValueError('Неправильний курсор') from exc
+
+    @staticmethod
+    def after(queryset, fields, key):
+        """Рядки, що йдуть після ключа у спадному порядку полів fields"""
+        condition = Q()
+        for position, field in enumerate(fields):
+            equal = dict(zip(fields[:position], key[:position]))
+            condition |= Q(**equal, **{f'{field}__lt': key[position]})
+        return queryset.filter(condition)
+
+    def parse_page_size(self, request):
+        """Розмір сторінки з параметра page_size"""
+        value = request.query_params.get('page_size')
+        if value in (None, ''):
+            return self.default_page_size()
+        try:
+            page_size = int(value)
+        except ValueError as exc:
+            raise ValueError('page_size має бути цілим числом') from exc
+        if page_size < 1:
+            raise ValueError('page_size має бути додатним')
+        return min(page_size, self.max_page_size())
+
+    def count(self, queryset, mode):
+        """Загальна кількість рядків: (total, is_exact)"""
+        if mode == COUNT_NONE:
+            return None, False
+        if mode == COUNT_EXACT:
+            return queryset.count(), True
+
+        # COUNT по підзапиту з LIMIT не сканує більше limit + 1 рядків
+        limit = self.count_limit()
+        capped = queryset.values('pk')[:limit + 1].count()
+        if capped <= limit:
+            return capped, True
+        return max(self.planner_estimate(queryset), capped), False
+
+    @staticmethod
+    def planner_estimate(queryset):
+        """Оцінка кількості рядків планувальником PostgreSQL (0 для інших БД)"""
+        if connection.vendor != 'postgresql':
+            return 0
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def paginate(self, queryset, request):
+        """Сторінка записів та метадані для відповіді
+
+        Повертає (page, meta), де page - список моделей не довший за
+        page_size, а meta містить next_cursor, page_size, total та
+        total_is_exact. ValueError для неправильних параметрів.
+        """
+        page_size = self.parse_page_size(request)
+        count_mode = request.query_params.get('count', COUNT_ESTIMATE)
+        if count_mode not in COUNT_MODES:
+            raise ValueError(
+                f"count має бути одним з: {', '.join(COUNT_MODES)}")
+
+        total, total_is_exact = self.count(queryset, count_mode)
+
+        fields = self.get_key_fields(queryset)
+        queryset = queryset.order_by(*(f'-{field}' for field in fields))
+        token = request.query_params.get('cursor')
+        if token:
+            queryset = self.after(
+                queryset, fields, self.decode_cursor(token, fields))
+
+        page = list(queryset[:page_size + 1])
+        has_next = len(page) > page_size
+        page = page[:page_size]
+        return page, {
+            'next_cursor': (
+                self.encode_cursor(page[-1], fields) if has_next else None),
+            'page_size': page_size,
+            'total': total,
+            'total_is_exact': total_is_exact,
+        }
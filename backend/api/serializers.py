@@ -1,12 +1,68 @@
+
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from .localization import LOCALIZED_PREFIX, is_localized
 from .models import (
     ServiceCategory, Service, Customer, Appointment,
     ServiceHistory, LoyaltyTransaction, STOInfo, Box
 )
 
+# Ключ контексту, яким кеш представлень передається вкладеним серіалізаторам
+REPRESENTATION_CACHE_KEY = 'representation_cache'
+
+
+def cached_representation(parent, serializer_class, instance, **context):
+    """Представлення пов'язаного об'єкта, обчислене один раз на відповідь
+
+    Кеш належить кореневому серіалізатору (живе, доки формується одна
+    відповідь) і передається у вкладені серіалізатори через контекст.
+    Ключ - клас серіалізатора, id об'єкта та контекст (мова, admin_panel),
+    тож у списку тисяч записів кожна послуга, бокс чи категорія
+    серіалізується лише раз.
+    """
+    root = parent.root
+    cache = getattr(root, '_representation_cache', None)
+    if cache is None:
+        cache = parent.context.get(REPRESENTATION_CACHE_KEY)
+        if cache is None:
+            cache = {}
+        root._representation_cache = cache  # pylint: disable=protected-access
+
+    key = (serializer_class, instance.pk, tuple(sorted(context.items())))
+    if key not in cache:
+        cache[key] = serializer_class(
+            instance, context={**context, REPRESENTATION_CACHE_KEY: cache}
+        ).data
+    return cache[key]
+
+
+class LocalizedFieldsMixin:
+    """Перекладені поля (localized_fields) мовою з контексту
+
+    Для об'єктів з queryset після with_language значення беруться з
+    анотацій localized_<поле>, обчислених у БД. Для інших об'єктів мова
+    обирається в Python через get_<поле>(language), а з admin_panel
+    повертаються оригінальні значення. Поля *_en лишаються у відповіді.
+    """
+    localized_fields = ('name', 'description')
+
+    def to_representation(self, instance):
+        """Перетворює модель в JSON з полями мовою контексту"""
+        data = super().to_representation(instance)
+        if is_localized(instance, self.localized_fields[0]):
+            for field in self.localized_fields:
+                if field in data:
+                    data[field] = getattr(
+                        instance, f'{LOCALIZED_PREFIX}{field}')
+        elif not self.context.get('admin_panel', False):
+            language = self.context.get('language', 'uk')
+            for field in self.localized_fields:
+                if field in data:
+                    data[field] = getattr(instance, f'get_{field}')(language)
+        return data
+
 
-class BoxSerializer(serializers.ModelSerializer):
+class BoxSerializer(LocalizedFieldsMixin, serializers.ModelSerializer):
     working_hours = serializers.DictField(
         child=serializers.DictField(
             child=serializers.CharField(max_length=5)
@@ -26,14 +82,6 @@ class BoxSerializer(serializers.ModelSerializer):
         """Перетворює модель в JSON для відповіді"""
         data = super().to_representation(instance)
 
-        # Отримуємо мову з контексту
-        language = self.context.get('language', 'uk')
-
-        # Встановлюємо назву та опис за мовою
-        translated_name = instance.get_name(language)
-        data['name'] = translated_name
-        data['description'] = instance.get_description(language)
-
         # Переконуємося, що working_hours є словником
         if isinstance(data['working_hours'], str):
             try:
@@ -44,7 +92,8 @@ class BoxSerializer(serializers.ModelSerializer):
         return data
 
 
-class ServiceCategorySerializer(serializers.ModelSerializer):
+class ServiceCategorySerializer(
+        LocalizedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ServiceCategory
         fields = [
@@ -52,28 +101,9 @@ class ServiceCategorySerializer(serializers.ModelSerializer):
             'description_en', 'order'
         ]
 
-    def to_representation(self, instance):
-        """Перетворює модель в JSON для відповіді"""
-        data = super().to_representation(instance)
-
-        # Отримуємо мову з контексту
-        language = self.context.get('language', 'uk')
 
-        # Для адмін панелі завжди повертаємо оригінальні поля
-        if self.context.get('admin_panel', False):
-            # Залишаємо оригінальні поля name_en та description_en
-            data['name'] = instance.name
-            data['description'] = instance.description
-        else:
-            # Для звичайного використання повертаємо перекладені версії
-            data['name'] = instance.get_name(language)
-            data['description'] = instance.get_description(language)
-
-        return data
-
-
-class ServiceSerializer(serializers.ModelSerializer):
-    category = ServiceCategorySerializer(read_only=True)
+class ServiceSerializer(LocalizedFieldsMixin, serializers.ModelSerializer):
+    category = serializers.SerializerMethodField()
     category_id = serializers.IntegerField(write_only=True)
 
     class Meta:
@@ -84,39 +114,20 @@ class ServiceSerializer(serializers.ModelSerializer):
             'is_active', 'is_featured', 'created_at'
         ]
 
-    def to_representation(self, instance):
-        """Перетворює модель в JSON для відповіді"""
-        data = super().to_representation(instance)
+    def get_category(self, obj):
+        """Категорія мовою контексту (з кешем на відповідь)"""
+        if not obj.category_id:
+            return None
+        return cached_representation(
+            self, ServiceCategorySerializer, obj.category,
+            language=self.context.get('language', 'uk'),
+            admin_panel=self.context.get('admin_panel', False))
 
-        # Отримуємо мову з контексту
-        language = self.context.get('language', 'uk')
-
-        # Для адмін панелі завжди повертаємо оригінальні поля для редагування
-        if self.context.get('admin_panel', False):
-            # Залишаємо оригінальні поля name_en та description_en
-            data['name'] = instance.name
-            data['name_en'] = instance.name_en
-            data['description'] = instance.description
-            data['description_en'] = instance.description_en
-        else:
-            # Для звичайного використання повертаємо перекладені версії
-            data['name'] = instance.get_name(language)
-            data['description'] = instance.get_description(language)
-
-        # Якщо є категорія, також оновлюємо її дані
-        if instance.category:
-            admin_panel = self.context.get('admin_panel', False)
-            data['category'] = ServiceCategorySerializer(
-                instance.category,
-                context={'language': language, 'admin_panel': admin_panel}
-            ).data
 
-        return data
-
-
-class ServiceListSerializer(serializers.ModelSerializer):
+class ServiceListSerializer(
+        LocalizedFieldsMixin, serializers.ModelSerializer):
     """Серіалізатор для списку послуг в адмін панелі з перекладеними назвами"""
-    category = ServiceCategorySerializer(read_only=True)
+    category = serializers.SerializerMethodField()
 
     class Meta:
         model = Service
@@ -125,25 +136,44 @@ class ServiceListSerializer(serializers.ModelSerializer):
             'duration_minutes', 'is_active', 'is_featured', 'created_at'
         ]
 
-    def to_representation(self, instance):
-        """Перетворює модель в JSON для відповіді з перекладеними назвами"""
-        data = super().to_representation(instance)
+    def get_category(self, obj):
+        """Категорія мовою контексту (з кешем на відповідь)"""
+        if not obj.category_id:
+            return None
+        return cached_representation(
+            self, ServiceCategorySerializer, obj.category,
+            language=self.context.get('language', 'uk'))
 
-        # Отримуємо мову з контексту
-        language = self.context.get('language', 'uk')
 
-        # Завжди повертаємо перекладені версії для відображення в таблиці
-        data['name'] = instance.get_name(language)
-        data['description'] = instance.get_description(language)
+class CatalogServiceSerializer(ServiceSerializer):
+    """Послуга всередині категорії дерева каталогу (без вкладеної категорії)"""
+    category = None
+    category_id = None
 
-        # Якщо є категорія, також оновлюємо її дані
-        if instance.category:
-            data['category'] = ServiceCategorySerializer(
-                instance.category,
-                context={'language': language}
-            ).data
+    class Meta(ServiceSerializer.Meta):
+        fields = [
+            'id', 'name', 'name_en', 'description', 'description_en',
+            'price', 'duration_minutes', 'is_active', 'is_featured',
+            'created_at'
+        ]
 
-        return data
+
+class CatalogTreeSerializer(ServiceCategorySerializer):
+    """Категорія з вкладеними активними послугами
+
+    Послуги беруться з services.all(), тож queryset категорій має
+    містити prefetch_related лише активних послуг.
+    """
+    services = serializers.SerializerMethodField()
+
+    class Meta(ServiceCategorySerializer.Meta):
+        fields = ServiceCategorySerializer.Meta.fields + ['services']
+
+    def get_services(self, obj):
+        """Активні послуги категорії мовою контексту"""
+        return CatalogServiceSerializer(
+            obj.services.all(), many=True,
+            context={'language': self.context.get('language', 'uk')}).data
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -166,9 +196,9 @@ class CustomerSerializer(serializers.ModelSerializer):
 
 
 class AppointmentSerializer(serializers.ModelSerializer):
-    service = ServiceSerializer(read_only=True)
+    service = serializers.SerializerMethodField()
     service_id = serializers.IntegerField(write_only=True)
-    box = BoxSerializer(read_only=True)
+    box = serializers.SerializerMethodField()
     box_id = serializers.IntegerField(
         write_only=True, required=False, allow_null=True)
     customer = CustomerSerializer(read_only=True)
@@ -192,36 +222,21 @@ class AppointmentSerializer(serializers.ModelSerializer):
             return obj.customer.user.get_full_name()
         return obj.guest_name
 
-    def to_representation(self, instance):
-        """Перетворює модель в JSON для відповіді з урахуванням мови"""
-        try:
-            data = super().to_representation(instance)
-
-            # Отримуємо мову з контексту
-            language = self.context.get('language', 'uk')
+    def get_service(self, obj):
+        """Послуга мовою контексту (з кешем на відповідь)"""
+        if not obj.service_id:
+            return None
+        return cached_representation(
+            self, ServiceSerializer, obj.service,
+            language=self.context.get('language', 'uk'))
 
-            # Якщо є сервіс, оновлюємо його дані за мовою
-            if instance.service:
-                data['service'] = ServiceSerializer(
-                    instance.service,
-                    context={'language': language}
-                ).data
-
-            # Якщо є бокс, оновлюємо його дані за мовою
-            if instance.box:
-                data['box'] = BoxSerializer(
-                    instance.box,
-                    context={'language': language}
-                ).data
-
-            return data
-        except Exception as e:
-            import traceback
-            error_msg = f"Error in AppointmentSerializer.to_representation: {str(e)}"
-            print(error_msg)
-            print(f"Traceback: {traceback.format_exc()}")
-            # Fallback to basic representation
-            return super().to_representation(instance)
+    def get_box(self, obj):
+        """Бокс мовою контексту (з кешем на відповідь)"""
+        if not obj.box_id:
+            return None
+        return cached_representation(
+            self, BoxSerializer, obj.box,
+            language=self.context.get('language', 'uk'))
 
 
 class ServiceHistorySerializer(serializers.ModelSerializer):
@@ -247,7 +262,7 @@ class LoyaltyTransactionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class STOInfoSerializer(serializers.ModelSerializer):
+class STOInfoSerializer(LocalizedFieldsMixin, serializers.ModelSerializer):
     what_you_can_items = serializers.ListField(
         child=serializers.CharField(max_length=300),
         required=False,
@@ -266,6 +281,9 @@ class STOInfoSerializer(serializers.ModelSerializer):
             'is_active'
         ]
 
+    localized_fields = (
+        'name', 'description', 'motto', 'welcome_text', 'what_you_can_title')
+
     def to_representation(self, instance):
         """Перетворює модель в JSON для відповіді"""
         data = super().to_representation(instance)
@@ -273,13 +291,7 @@ class STOInfoSerializer(serializers.ModelSerializer):
         # Отримуємо мову з контексту
         language = self.context.get('language', 'uk')
 
-        # Встановлюємо всі поля за мовою
-        data['name'] = instance.get_name(language)
-        data['description'] = instance.get_description(language)
-        data['motto'] = instance.get_motto(language)
-        data['welcome_text'] = instance.get_welcome_text(language)
-        data['what_you_can_title'] = instance.get_what_you_can_title(
-            language)
+        # Решта полів за мовою
         data['what_you_can_items'] = instance.get_what_you_can_items_list(
             language)
 
@@ -0,0 +1,201 @@
+"""Обробники сигналів моделей для інвалідації кешів та карт зайнятості."""
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import (
+    Appointment, Box, Customer, Service, ServiceCategory, STOInfo,
+    normalize_search_text)
+from ..services.availability_service.availability_cache import (
+    AvailabilityCache)
+from ..services.availability_service.occupancy import OccupancyService
+from ..services.service_catalog.catalog_cache import CatalogCache
+from ..services.service_catalog.sto_info_cache import STOInfoCache
+from ..services.statistics_service.daily_stats import (
+    STATS_FIELDS, DailyStatsService)
+from ..services.statistics_service.statistics_service import (
+    StatisticsService)
+
+# Поля запису, від яких залежить карта зайнятості
+OCCUPANCY_FIELDS = (
+    'box_id', 'appointment_date', 'appointment_time', 'status', 'service_id')
+
+
+def _invalidate(func, *args):
+    """Інвалідація одразу та повторно після коміту транзакції
+
+    Повторна інвалідація прибирає результати, які паралельний запит
+    міг закешувати між змінами та комітом.
+    """
+    func(*args)
+    transaction.on_commit(lambda: func(*args))
+
+
+def _deleted_with(origin, *models):
+    """Чи видаляється об'єкт каскадно разом з об'єктом однієї з моделей
+
+    Рядки, що посилаються на такий об'єкт, будуть видалені тим самим
+    каскадом, тож перераховувати їх не потрібно (і не можна створювати
+    нові посилання на об'єкт, що видаляється).
+    """
+    model = getattr(origin, 'model', type(origin))
+    return isinstance(model, type) and issubclass(model, models)
+
+
+@receiver(post_save, sender=Appointment)
+def appointment_saved(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Зміна запису інвалідує доступність на стару та нову дати"""
+    dates = {
+        instance.appointment_date,
+        instance.get_loaded_value('appointment_date'),
+    }
+    for appointment_date in dates - {None}:
+        _invalidate(AvailabilityCache.bump_bookings_version, appointment_date)
+
+    if any(instance.has_field_changed(field) for field in OCCUPANCY_FIELDS):
+        box_days = {
+            (instance.box_id, instance.appointment_date),
+            (instance.get_loaded_value('box_id'),
+             instance.get_loaded_value('appointment_date')),
+        }
+        for box_id, appointment_date in box_days:
+            OccupancyService.recompute(box_id, appointment_date)
+
+
+@receiver(post_delete, sender=Appointment)
+def appointment_deleted(sender, instance, origin=None, **kwargs):  # pylint: disable=unused-argument
+    """Видалення запису звільняє час на його дату"""
+    _invalidate(
+        AvailabilityCache.bump_bookings_version, instance.appointment_date)
+    if not _deleted_with(origin, Box):
+        OccupancyService.recompute(instance.box_id, instance.appointment_date)
+
+
+def _invalidate_closed_stats(*dates):
+    """Зміна записів у минулих датах інвалідує закриті інтервали"""
+    today = timezone.now().date()
+    if any(value is not None and value < today for value in dates):
+        _invalidate(StatisticsService.bump_closed_version)
+
+
+@receiver(post_save, sender=Appointment)
+def appointment_stats_saved(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    """Перенесення внеску запису в денній статистиці"""
+    new_values = {field: getattr(instance, field) for field in STATS_FIELDS}
+    if created:
+        DailyStatsService.apply_change(None, new_values)
+        _invalidate_closed_stats(instance.appointment_date)
+        return
+    if not any(instance.has_field_changed(field) for field in STATS_FIELDS):
+        return
+
+    loaded_values = getattr(instance, '_loaded_values', {})
+    if not all(field in loaded_values for field in STATS_FIELDS):
+        # Попередні значення невідомі (відкладені поля) - перераховуємо день
+        DailyStatsService.rebuild(
+            instance.appointment_date, instance.appointment_date)
+        _invalidate_closed_stats(instance.appointment_date)
+        return
+    DailyStatsService.apply_change(
+        {field: loaded_values[field] for field in STATS_FIELDS}, new_values)
+    _invalidate_closed_stats(
+        instance.appointment_date, loaded_values['appointment_date'])
+
+
+@receiver(post_delete, sender=Appointment)
+def appointment_stats_deleted(sender, instance, origin=None, **kwargs):  # pylint: disable=unused-argument
+    """Видалення запису прибирає його внесок зі статистики"""
+    if _deleted_with(origin, Box, Service, ServiceCategory):
+        _invalidate_closed_stats(instance.appointment_date)
+        return
+    DailyStatsService.apply_change({
+        field: instance.get_loaded_value(field, getattr(instance, field))
+        for field in STATS_FIELDS
+    }, None)
+    _invalidate_closed_stats(instance.appointment_date)
+
+
+@receiver(post_save, sender=Box)
+def box_saved(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    """Зміна активності, графіку або назви боксу впливає на всі дати
+
+    Назва визначає порядок боксів (Box.Meta.ordering), а отже і бокс,
+    що призначається для вільного часу.
+    """
+    if (created or instance.has_field_changed('is_active') or
+            instance.has_field_changed('working_hours') or
+            instance.has_field_changed('name')):
+        _invalidate(AvailabilityCache.bump_schedule_version)
+
+
+@receiver(post_delete, sender=Box)
+def box_deleted(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Видалення боксу впливає на всі дати"""
+    _invalidate(AvailabilityCache.bump_schedule_version)
+
+
+@receiver(post_save, sender=Service)
+def service_saved(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    """Зміна тривалості послуги змінює інтервали зайнятості записів
+
+    Спершу перераховуються start_at/end_at записів послуги, щоб
+    перевірка конфліктів і обмеження виключення використовували ту саму
+    тривалість, що й розрахунок доступності, потім карти зайнятості.
+    """
+    if not created and instance.has_field_changed('duration_minutes'):
+        Appointment.recompute_time_ranges(instance)
+        _invalidate(AvailabilityCache.bump_schedule_version)
+        OccupancyService.recompute_for_service(instance.id)
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def statistics_changed(sender, **kwargs):  # pylint: disable=unused-argument
+    """Зміна записів, клієнтів або послуг інвалідує знімок статистики"""
+    _invalidate(StatisticsService.bump_version)
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_delete, sender=ServiceCategory)
+def catalog_changed(sender, **kwargs):  # pylint: disable=unused-argument
+    """Зміна каталогу: скидання одразу, перебудова після коміту
+
+    Перебудова лише після коміту, щоб у кеш не потрапили незакомічені
+    дані; до неї читачі перебудовують каталог з БД самі.
+    """
+    CatalogCache.invalidate()
+    transaction.on_commit(CatalogCache.rebuild)
+
+
+@receiver(post_save, sender=STOInfo)
+@receiver(post_delete, sender=STOInfo)
+def sto_info_changed(sender, **kwargs):  # pylint: disable=unused-argument
+    """Зміна інформації про СТО скидає її копії в процесах"""
+    _invalidate(STOInfoCache.invalidate)
+
+
+@receiver(post_save, sender=User)
+def user_name_saved(sender, instance, created, update_fields=None, **kwargs):  # pylint: disable=unused-argument
+    """Зміна імені користувача оновлює search_name його записів"""
+    if created or (update_fields is not None and
+                   not {'first_name', 'last_name'} & set(update_fields)):
+        return
+    changed = []
+    for appointment in Appointment.objects.filter(  # pylint: disable=no-member
+            customer__user=instance).only('id', 'guest_name', 'search_name'):
+        search_name = normalize_search_text(
+            instance.first_name, instance.last_name, appointment.guest_name)
+        if search_name != appointment.search_name:
+            appointment.search_name = search_name
+            changed.append(appointment)
+    Appointment.objects.bulk_update(  # pylint: disable=no-member
+        changed, ['search_name'], batch_size=500)
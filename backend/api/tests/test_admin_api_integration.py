@@ -5,7 +5,12 @@
 
 from decimal import Decimal
 from datetime import date, time, timedelta
-from django.test import TestCase
+import json
+from urllib.parse import urlencode
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -20,6 +25,7 @@ class AdminStatisticsAPITest(TestCase):
 
     def setUp(self):
         """Налаштування тестових даних"""
+        cache.clear()
         self.client = APIClient()
         self.admin = User.objects.create_user(
             username='admin',
@@ -81,6 +87,59 @@ class AdminStatisticsAPITest(TestCase):
         self.assertEqual(response.data['pending_appointments'], 1)
         self.assertEqual(response.data['completed_appointments'], 1)
 
+    def test_get_statistics_fresh(self):
+        """Перевірка обходу кешованого знімку статистики"""
+        self.client.force_authenticate(user=self.admin)
+        url = '/api/admin/statistics/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('generated_at', response.data)
+
+        # Масове оновлення не інвалідує знімок
+        Service.objects.update(is_active=False)
+        response = self.client.get(url)
+        self.assertEqual(response.data['services_count'], 1)
+
+        response = self.client.get(url + '?fresh=1')
+        self.assertEqual(response.data['services_count'], 0)
+
+    def test_get_timeseries(self):
+        """Перевірка часового ряду доходу"""
+        Appointment.objects.create(
+            customer=self.customer,
+            service=self.service,
+            box=self.box,
+            appointment_date=date(2030, 1, 7),
+            appointment_time=time(10, 0),
+            status='completed',
+            total_price=Decimal('1000.00')
+        )
+        self.client.force_authenticate(user=self.admin)
+
+        url = (
+            '/api/admin/timeseries/?metric=revenue&granularity=day'
+            '&from=2030-01-06&to=2030-01-08'
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [bucket['value'] for bucket in response.data['buckets']],
+            [0, 1000.0, 0])
+
+    def test_get_timeseries_invalid_params(self):
+        """Перевірка валідації параметрів часового ряду"""
+        self.client.force_authenticate(user=self.admin)
+        for query in (
+                'metric=profit',
+                'granularity=year',
+                'from=2030-13-01',
+                'from=2030-02-01&to=2030-01-01',
+                'from=2000-01-01&to=2030-01-01'):
+            response = self.client.get(f'/api/admin/timeseries/?{query}')
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_get_statistics_non_admin(self):
         """Перевірка що не-адмін не може отримати статистику"""
         self.client.force_authenticate(user=self.user)
@@ -357,8 +416,253 @@ class AdminAppointmentsManagementTest(TestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['status'], 'pending')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['status'], 'pending')
+
+    def test_get_appointments_customer_name_search(self):
+        """Перевірка пошуку за ім'ям клієнта та гостя без урахування регістру"""
+        self.customer.user.first_name = 'Богдан'
+        self.customer.user.last_name = 'Хмельницький'
+        self.customer.user.save()
+        for customer, guest_name, hour in ((self.customer, '', 10),
+                                           (None, 'Богдана Гість', 11),
+                                           (None, 'Інший Гість', 12)):
+            Appointment.objects.create(
+                customer=customer,
+                guest_name=guest_name,
+                service=self.service,
+                appointment_date=date.today(),
+                appointment_time=time(hour, 0),
+                status='pending',
+                total_price=Decimal('1000.00')
+            )
+
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get(
+            '/api/admin/appointments/?customer_name=БОГДАН')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+
+        response = self.client.get(
+            '/api/admin/appointments/?customer_name=хмельн')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNotNone(response.data['results'][0]['customer'])
+
+    def test_get_appointments_search_pages_keep_rank_order(self):
+        """Перевірка, що сторінки пошуку за ім'ям сортуються за рангом"""
+        # Збіг з початку імені (вищий ранг) має найранішу дату
+        for guest_name, day in (('Олена Петренко', 0),
+                                ('Марія Олена', 1),
+                                ('Іван Оленович', 2),
+                                ('Олена Коваль', 3)):
+            Appointment.objects.create(
+                guest_name=guest_name,
+                service=self.service,
+                appointment_date=date(2030, 2, 1) + timedelta(days=day),
+                appointment_time=time(10, 0),
+                status='pending',
+                total_price=Decimal('1000.00')
+            )
+        self.client.force_authenticate(user=self.admin)
+
+        names = []
+        url = '/api/admin/appointments/?' + urlencode(
+            {'customer_name': 'олен', 'page_size': 1})
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            names.extend(
+                item['guest_name'] for item in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(names, ['Олена Коваль', 'Олена Петренко',
+                                 'Іван Оленович', 'Марія Олена'])
+
+    def test_get_appointments_search_pages_with_tied_rank(self):
+        """Перевірка, що записи з однаковим рангом не губляться між сторінками"""
+        self.customer.user.first_name = 'Тарас'
+        self.customer.user.save()
+        appointments = self._create_appointments_for_paging()
+        self.client.force_authenticate(user=self.admin)
+
+        seen = []
+        url = '/api/admin/appointments/?' + urlencode(
+            {'customer_name': 'тарас', 'page_size': 2})
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+
+        expected = sorted(
+            appointments,
+            key=lambda a: (a.appointment_date, a.appointment_time, a.id),
+            reverse=True)
+        self.assertEqual(seen, [a.id for a in expected])
+
+    @override_settings(ADMIN_APPOINTMENTS_PAGE_SIZE=4)
+    def test_get_appointments_paginated_by_default(self):
+        """Перевірка сторінки розміру за замовчуванням без параметрів"""
+        self._create_appointments_for_paging()
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get('/api/admin/appointments/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['page_size'], 4)
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertIsNotNone(response.data['next'])
+
+    def _create_appointments_for_paging(self):
+        """Записи з однаковими датою та часом для перевірки курсора"""
+        appointments = []
+        for day in range(3):
+            for _ in range(3):
+                appointments.append(Appointment.objects.create(
+                    customer=self.customer,
+                    service=self.service,
+                    appointment_date=date(2030, 1, 7) + timedelta(days=day),
+                    appointment_time=time(10, 0),
+                    status='confirmed',
+                    total_price=Decimal('1000.00')
+                ))
+        return appointments
+
+    def test_get_appointments_cursor_pagination(self):
+        """Перевірка проходу по всіх сторінках без пропусків і повторів"""
+        appointments = self._create_appointments_for_paging()
+        self.client.force_authenticate(user=self.admin)
+
+        seen = []
+        url = '/api/admin/appointments/?page_size=4&count=exact'
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 4)
+            self.assertEqual(response.data['total'], 9)
+            self.assertTrue(response.data['total_is_exact'])
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+            pages += 1
+
+        self.assertEqual(pages, 3)
+        expected = sorted(
+            appointments,
+            key=lambda a: (a.appointment_date, a.appointment_time, a.id),
+            reverse=True)
+        self.assertEqual(seen, [a.id for a in expected])
+
+    def test_get_appointments_pagination_keeps_filters(self):
+        """Перевірка, що курсор працює разом з фільтрами"""
+        self._create_appointments_for_paging()
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get(
+            '/api/admin/appointments/?date_from=2030-01-08&page_size=2')
+        self.assertEqual(response.data['total'], 6)
+        self.assertIn('date_from=2030-01-08', response.data['next'])
+
+        response = self.client.get(
+            '/api/admin/appointments/?date_from=2030-01-08&page_size=2'
+            f"&cursor={response.data['next_cursor']}")
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertTrue(all(
+            item['appointment_date'] >= '2030-01-08'
+            for item in response.data['results']))
+
+    @override_settings(ADMIN_APPOINTMENTS_COUNT_LIMIT=5)
+    def test_get_appointments_estimated_count(self):
+        """Перевірка оцінки кількості понад поріг та режиму без підрахунку"""
+        self._create_appointments_for_paging()
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get('/api/admin/appointments/?page_size=2')
+        self.assertFalse(response.data['total_is_exact'])
+        self.assertGreaterEqual(response.data['total'], 6)
+
+        response = self.client.get(
+            '/api/admin/appointments/?page_size=2&status=confirmed'
+            '&date_from=2030-01-09')
+        self.assertEqual(response.data['total'], 3)
+        self.assertTrue(response.data['total_is_exact'])
+
+        response = self.client.get(
+            '/api/admin/appointments/?page_size=2&count=none')
+        self.assertIsNone(response.data['total'])
+
+    def test_get_appointments_pagination_invalid_params(self):
+        """Перевірка помилок для неправильного курсора та розміру сторінки"""
+        self.client.force_authenticate(user=self.admin)
+
+        for query in ('cursor=broken', 'page_size=0', 'page_size=abc',
+                      'page_size=5&count=maybe'):
+            response = self.client.get(f'/api/admin/appointments/?{query}')
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST, query)
+            self.assertIn('error', response.data)
+
+    def test_export_appointments_csv(self):
+        """Перевірка потокового CSV-експорту записів з фільтрами"""
+        self._create_appointments_for_paging()
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get(
+            '/api/admin/appointments/export/?date_from=2030-01-09')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertIn('attachment', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        lines = content.strip().splitlines()
+        header = lines[0].split(',')
+        self.assertIn('appointment_date', header)
+        self.assertIn('service_name', header)
+        self.assertEqual(len(lines), 1 + 3)
+        self.assertIn('2030-01-09', lines[1])
+
+    def test_export_appointments_ndjson(self):
+        """Перевірка NDJSON-експорту записів"""
+        self._create_appointments_for_paging()
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get(
+            '/api/admin/appointments/export/?format=ndjson&language=en')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [
+            json.loads(line) for line in
+            b''.join(response.streaming_content).decode('utf-8').splitlines()
+        ]
+        self.assertEqual(len(rows), 9)
+        self.assertEqual(rows[0]['status'], 'confirmed')
+        self.assertEqual(rows[0]['total_price'], '1000.00')
+        self.assertEqual(rows[0]['service_name'], self.service.name)
+
+    def test_export_customers(self):
+        """Перевірка експорту клієнтів та неправильного формату"""
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get(
+            '/api/admin/customer_management/export/?format=ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [
+            json.loads(line) for line in
+            b''.join(response.streaming_content).decode('utf-8').splitlines()
+        ]
+        self.assertEqual(
+            [row['username'] for row in rows],
+            [self.customer.user.username])
+
+        response = self.client.get(
+            '/api/admin/customer_management/export/?format=json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.customer.user)
+        response = self.client.get('/api/admin/customer_management/export/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
     def test_confirm_appointment(self):
         """Перевірка підтвердження запису"""
@@ -457,6 +761,132 @@ class AdminAppointmentsManagementTest(TestCase):
         self.assertIn('schedule', response.data)
         self.assertIn('week_start', response.data)
 
+    def test_get_weekly_schedule_ranges(self):
+        """Перевірка перегляду інших тижнів та довільних періодів"""
+        today = date.today()
+        next_week = today - timedelta(days=today.weekday()) + timedelta(weeks=1)
+        Appointment.objects.create(
+            customer=self.customer,
+            service=self.service,
+            box=self.box,
+            appointment_date=next_week,
+            appointment_time=time(10, 0),
+            status='confirmed',
+            total_price=Decimal('1000.00')
+        )
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get('/api/admin/weekly_schedule/?week_offset=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['week_start'], next_week.isoformat())
+        day = response.data['schedule'][next_week.isoformat()]
+        self.assertEqual(
+            len(day['boxes_schedule'][self.box.id]['appointments']), 1)
+
+        url = (
+            '/api/admin/weekly_schedule/'
+            f'?start={next_week}&end={next_week + timedelta(days=20)}'
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['schedule']), 21)
+
+        for query in ('week_offset=abc', 'start=2030-02-01&end=2030-01-01',
+                      'start=2030-01-01&end=2030-12-31'):
+            response = self.client.get(f'/api/admin/weekly_schedule/?{query}')
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_weekly_schedule_query_count(self):
+        """Перевірка, що кількість запитів не залежить від періоду"""
+        monday = date(2030, 1, 7)
+        for i in range(3):
+            box = Box.objects.create(
+                name=f'Бокс {i + 2}',
+                working_hours={'monday': {'start': '08:00', 'end': '18:00'}},
+                is_active=True
+            )
+            for week in range(4):
+                Appointment.objects.create(
+                    customer=self.customer,
+                    service=self.service,
+                    box=box if week % 2 else None,
+                    appointment_date=monday + timedelta(weeks=week),
+                    appointment_time=time(10 + i, 0),
+                    status='confirmed',
+                    total_price=Decimal('1000.00')
+                )
+        self.client.force_authenticate(user=self.admin)
+
+        with CaptureQueriesContext(connection) as one_week:
+            self.client.get(f'/api/admin/weekly_schedule/?start={monday}')
+        url = (
+            '/api/admin/weekly_schedule/'
+            f'?start={monday}&end={monday + timedelta(weeks=4, days=-1)}'
+        )
+        with CaptureQueriesContext(connection) as four_weeks:
+            response = self.client.get(url)
+
+        self.assertEqual(len(one_week), len(four_weeks))
+        unassigned = response.data['schedule'][monday.isoformat()][
+            'boxes_schedule']['unassigned']
+        self.assertEqual(len(unassigned['appointments']), 3)
+
+    def test_weekly_schedule_conditional_get(self):
+        """Перевірка ETag розкладу: 304 без змін, 200 після нового запису"""
+        monday = date(2030, 1, 7)
+        self.client.force_authenticate(user=self.admin)
+        url = f'/api/admin/weekly_schedule/?start={monday}'
+
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('private', response['Cache-Control'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Запис поза періодом не впливає на валідатор
+        Appointment.objects.create(
+            customer=self.customer,
+            service=self.service,
+            appointment_date=monday + timedelta(weeks=2),
+            appointment_time=time(10, 0),
+            status='confirmed',
+            total_price=Decimal('1000.00')
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Appointment.objects.create(
+            customer=self.customer,
+            service=self.service,
+            appointment_date=monday,
+            appointment_time=time(10, 0),
+            status='confirmed',
+            total_price=Decimal('1000.00')
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        # Перейменування клієнта змінює customer_name у розкладі
+        user = self.customer.user
+        user.first_name = 'Перейменований'
+        user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        appointments = [
+            appointment
+            for box in response.data['schedule'][monday.isoformat()][
+                'boxes_schedule'].values()
+            for appointment in box['appointments']
+        ]
+        self.assertIn('Перейменований', appointments[0]['customer_name'])
+
+        response = self.client.get(
+            '/api/admin/weekly_schedule/?start=bad', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_get_categories_management(self):
         """Перевірка отримання списку категорій для управління"""
         ServiceCategory.objects.create(
@@ -5,7 +5,8 @@
 
 from decimal import Decimal
 from datetime import date, time, timedelta
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from django.urls import reverse
 from rest_framework.test import APIClient
@@ -13,7 +14,8 @@ from rest_framework import status
 from django.utils import timezone
 
 from backend.api.models import (
-    ServiceCategory, Service, Customer, Appointment, Box, STOInfo
+    ServiceCategory, Service, Customer, Appointment, Box, BoxOccupancy,
+    STOInfo
 )
 
 
@@ -179,6 +181,111 @@ class ServicesAPIIntegrationTest(TestCase):
         self.assertGreater(len(response.data), 0)
         self.assertEqual(response.data[0]['name'], 'Технічне обслуговування')
 
+    def test_services_conditional_get(self):
+        """Перевірка ETag: 304 без змін і 200 після зміни каталогу"""
+        url = '/api/services/?language=uk'
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        # Інша мова - інший валідатор
+        response = self.client.get(
+            '/api/services/?language=en', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.category.name = 'Нова назва'
+        self.category.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_catalog_served_from_cache(self):
+        """Перевірка, що повторні читання каталогу не звертаються до БД"""
+        cache.clear()
+        self.client.get('/api/services/?language=uk')
+
+        for url in ('/api/services/?language=uk',
+                    '/api/services/featured/?language=en',
+                    '/api/service-categories/?language=en',
+                    '/api/catalog/tree/?language=uk'):
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['Content-Type'], 'application/json')
+
+        # Зміна через адмін-панель одразу видна в каталозі
+        admin = User.objects.create_user(
+            username='catalog_admin', password='adminpass123', is_staff=True)
+        self.client.force_authenticate(user=admin)
+        self.client.post(
+            f'/api/admin/{self.service.id}/toggle_featured_service/')
+        self.client.force_authenticate(user=None)
+        response = self.client.get('/api/services/featured/?language=uk')
+        self.assertEqual(
+            [item['id'] for item in response.data], [self.service.id])
+
+    def test_catalog_tree(self):
+        """Перевірка дерева каталогу з вкладеними активними послугами"""
+        cache.clear()
+        ServiceCategory.objects.create(name='Порожня', order=2)
+        Service.objects.create(
+            name='Неактивна', price=Decimal('100.00'),
+            category=self.category, is_active=False)
+
+        response = self.client.get('/api/catalog/tree/?language=en')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        category = response.data[0]
+        self.assertEqual(category['name'], 'Technical Maintenance')
+        self.assertEqual(
+            [service['name'] for service in category['services']],
+            ['Full Technical Maintenance'])
+        self.assertNotIn('category', category['services'][0])
+
+        etag = response['ETag']
+        response = self.client.get(
+            '/api/catalog/tree/?language=en', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.service.price = Decimal('1700.00')
+        self.service.save()
+        response = self.client.get(
+            '/api/catalog/tree/?language=en', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data[0]['services'][0]['price'], '1700.00')
+
+    def test_search_services(self):
+        """Перевірка пошуку послуг для підказок"""
+        cache.clear()
+        response = self.client.get('/api/services/search/?q=full tech&language=en')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['name'] for item in response.data],
+            ['Full Technical Maintenance'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/services/search/?q=повне')
+        self.assertEqual(response.data[0]['id'], self.service.id)
+
+        response = self.client.get('/api/services/search/?q=то&limit=abc')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_service_categories_conditional_get_after_delete(self):
+        """Перевірка, що видалення категорії змінює ETag"""
+        extra = ServiceCategory.objects.create(name='Додаткова', order=2)
+        url = '/api/service-categories/'
+        etag = self.client.get(url)['ETag']
+
+        extra.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
 
 class AppointmentsAPIIntegrationTest(TestCase):
     """Інтеграційні тести для API записів"""
@@ -407,6 +514,18 @@ class BoxesAPIIntegrationTest(TestCase):
             duration_minutes=60
         )
 
+    def test_list_boxes_in_requested_language(self):
+        """Перевірка списку боксів мовою запиту"""
+        user = User.objects.create_user(
+            username='boxuser', password='testpass123')
+        self.client.force_authenticate(user=user)
+
+        response = self.client.get('/api/boxes/?language=en')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        box = response.data['results'][0]
+        self.assertEqual(box['name'], 'Box 1')
+        self.assertEqual(box['name_en'], 'Box 1')
+
     def test_get_available_dates(self):
         """Перевірка отримання доступних дат"""
         url = f'/api/boxes/available_dates/?service_id={self.service.id}'
@@ -416,6 +535,169 @@ class BoxesAPIIntegrationTest(TestCase):
         self.assertIn('available_dates', response.data)
         self.assertIsInstance(response.data['available_dates'], list)
 
+    def test_get_available_dates_custom_window(self):
+        """Перевірка довжини вікна доступних дат"""
+        url = (
+            f'/api/boxes/available_dates/?service_id={self.service.id}'
+            '&days=60'
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Бокс працює лише по понеділках та вівторках
+        self.assertGreaterEqual(len(response.data['available_dates']), 16)
+
+    def test_get_available_dates_invalid_window(self):
+        """Перевірка некоректної довжини вікна"""
+        for days in ('abc', '0', '1000'):
+            url = (
+                f'/api/boxes/available_dates/?service_id={self.service.id}'
+                f'&days={days}'
+            )
+            response = self.client.get(url)
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_availability_matrix(self):
+        """Перевірка матриці доступності за діапазон дат"""
+        # 2030-01-07 - понеділок, 2030-01-09 - середа (вихідний боксу)
+        url = (
+            f'/api/boxes/availability_matrix/?service_id={self.service.id}'
+            '&from=2030-01-07&to=2030-01-09&step=60&include_boxes=1'
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['step_minutes'], 60)
+        dates = response.data['dates']
+        self.assertEqual(
+            [day['date'] for day in dates],
+            ['2030-01-07', '2030-01-08', '2030-01-09'])
+        self.assertEqual(dates[0]['available_times'][0], '08:00')
+        self.assertEqual(dates[0]['available_times'][-1], '17:00')
+        self.assertEqual(len(dates[0]['available_times']), 10)
+        self.assertEqual(dates[0]['boxes']['08:00'], self.box.id)
+        self.assertEqual(dates[2]['available_times'], [])
+
+    def test_get_availability_matrix_invalid_params(self):
+        """Перевірка валідації параметрів матриці доступності"""
+        base = f'/api/boxes/availability_matrix/?service_id={self.service.id}'
+        for query in ('&from=bad', '&from=2030-01-09&to=2030-01-07',
+                      '&from=2030-01-01&to=2030-12-31', '&step=1'):
+            response = self.client.get(base + query)
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get('/api/boxes/availability_matrix/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_available_boxes_overlap(self):
+        """Перевірка, що бокс зайнятий на весь час запису"""
+        user = User.objects.create_user(
+            username='boxes@example.com',
+            email='boxes@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=user)
+        monday = date(2030, 1, 7)
+        Appointment.objects.create(
+            service=self.service,
+            box=self.box,
+            appointment_date=monday,
+            appointment_time=time(10, 0),
+            status='confirmed',
+            total_price=Decimal('1000.00')
+        )
+
+        for appointment_time, expected in (
+                ('09:00', [self.box.id]),
+                ('09:30', []),
+                ('10:30', []),
+                ('11:00', [self.box.id])):
+            response = self.client.get(
+                '/api/boxes/available_boxes/'
+                f'?date={monday}&time={appointment_time}')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [box['id'] for box in response.data], expected)
+
+    def test_get_available_boxes_service_duration(self):
+        """Перевірка, що послуга має вміститися до кінця робочого дня"""
+        user = User.objects.create_user(
+            username='duration@example.com', password='testpass123')
+        self.client.force_authenticate(user=user)
+        self.service.duration_minutes = 90
+        self.service.save()
+        monday = date(2030, 1, 7)
+
+        for appointment_time, expected in (('16:30', [self.box.id]),
+                                           ('17:00', [])):
+            response = self.client.get(
+                '/api/boxes/available_boxes/'
+                f'?date={monday}&time={appointment_time}'
+                f'&service_id={self.service.id}')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [box['id'] for box in response.data], expected)
+
+    @override_settings(AVAILABILITY_USE_OCCUPANCY=False)
+    def test_get_available_boxes_without_occupancy(self):
+        """Перевірка, що без карт зайнятості читаються самі записи"""
+        user = User.objects.create_user(
+            username='nomasks@example.com', password='testpass123')
+        self.client.force_authenticate(user=user)
+        monday = date(2030, 1, 7)
+        Appointment.objects.create(
+            service=self.service,
+            box=self.box,
+            appointment_date=monday,
+            appointment_time=time(10, 0),
+            status='confirmed',
+            total_price=Decimal('1000.00')
+        )
+        # Карти зайнятості не використовуються, тож їх відсутність не
+        # впливає на результат
+        BoxOccupancy.objects.all().delete()
+
+        for appointment_time, expected in (('09:10', []),
+                                           ('11:00', [self.box.id])):
+            response = self.client.get(
+                '/api/boxes/available_boxes/'
+                f'?date={monday}&time={appointment_time}')
+            self.assertEqual(
+                [box['id'] for box in response.data], expected)
+
+    def test_get_next_available(self):
+        """Перевірка пошуку найближчих вільних слотів"""
+        url = (
+            f'/api/boxes/next_available/?service_id={self.service.id}'
+            '&count=3'
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        slots = response.data['slots']
+        self.assertEqual(len(slots), 3)
+        for slot in slots:
+            slot_date = date.fromisoformat(slot['date'])
+            # Бокс працює лише по понеділках та вівторках
+            self.assertIn(slot_date.weekday(), (0, 1))
+            self.assertEqual(slot['box_id'], self.box.id)
+        self.assertEqual(
+            [(s['date'], s['time']) for s in slots],
+            sorted((s['date'], s['time']) for s in slots))
+
+    def test_get_next_available_invalid_count(self):
+        """Перевірка валідації кількості слотів"""
+        for count in ('abc', '0', '1000'):
+            url = (
+                f'/api/boxes/next_available/?service_id={self.service.id}'
+                f'&count={count}'
+            )
+            response = self.client.get(url)
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_get_available_times(self):
         """Перевірка отримання доступних часів"""
         tomorrow = date.today() + timedelta(days=1)
@@ -525,6 +807,38 @@ class STOInfoAPIIntegrationTest(TestCase):
         self.assertEqual(response.data['name'], 'STO Test')
         self.assertEqual(response.data['motto'], 'Motto')
 
+    def test_sto_info_conditional_get(self):
+        """Перевірка 304 для незмінної інформації про СТО"""
+        url = '/api/sto-info/?language=uk'
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.sto_info.phone = '+380509999999'
+        self.sto_info.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['phone'], '+380509999999')
+
+    def test_sto_info_served_from_memory(self):
+        """Повторне читання інформації про СТО без запитів до БД"""
+        url = '/api/sto-info/?language=uk'
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'СТО Test')
+
+    def test_sto_info_not_found(self):
+        """Перевірка 404 без активної інформації про СТО"""
+        self.sto_info.is_active = False
+        self.sto_info.save()
+
+        response = self.client.get('/api/sto-info/?language=uk')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class FullAppointmentFlowTest(TestCase):
     """Інтеграційні тести для повного flow створення та обробки запису"""
@@ -5,6 +5,8 @@
 
 from decimal import Decimal
 from datetime import date, time
+from io import StringIO
+from django.core.management import call_command
 from django.test import TestCase
 from django.contrib.auth.models import User
 
@@ -345,13 +347,23 @@ class DataAccessLayerTest(TestCase):
         self.assertEqual(sto_info.name, 'СТО Test')
 
     def test_get_sto_info_not_exists(self):
-        """Перевірка отримання інформації про СТО (якщо не існує - створюється)"""
+        """Перевірка отримання інформації про СТО (якщо не існує - None)"""
         # Видаляємо всі STOInfo
         STOInfo.objects.all().delete()
 
+        self.assertIsNone(DataAccessLayer.get_sto_info())
+        self.assertFalse(STOInfo.objects.exists())
+
+    def test_ensure_sto_info_command(self):
+        """Перевірка створення інформації про СТО за замовчуванням командою"""
+        STOInfo.objects.all().delete()
+
+        call_command('ensure_sto_info', stdout=StringIO())
+        call_command('ensure_sto_info', stdout=StringIO())
+        self.assertEqual(STOInfo.objects.count(), 1)
         sto_info = DataAccessLayer.get_sto_info()
         self.assertIsNotNone(sto_info)
-        self.assertIsNotNone(sto_info.name)
+        self.assertTrue(sto_info.name)
 
     def test_create_or_update_sto_info_create(self):
         """Перевірка створення інформації про СТО"""
@@ -204,6 +204,14 @@ class GuestE2ETest(TestCase):
             },
             is_active=True
         )
+        STOInfo.objects.create(
+            name='СТО AutoServis',
+            address='Вул. Тестова, 1',
+            phone='+380501234567',
+            email='info@sto.com',
+            working_hours='Пн-Пт: 8:00-18:00',
+            is_active=True
+        )
 
     def test_full_guest_journey(self):
         """
@@ -7,12 +7,13 @@ from decimal import Decimal
 from django.test import TestCase
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from datetime import date, time
 import json
 
 from backend.api.models import (
     ServiceCategory, Service, Customer, Appointment,
-    Box, STOInfo, ServiceHistory, LoyaltyTransaction
+    Box, STOInfo, ServiceHistory, LoyaltyTransaction, normalize_search_text
 )
 
 
@@ -208,6 +209,31 @@ class BoxModelTest(TestCase):
         self.assertEqual(self.box.get_name('uk'), 'Бокс 1')
         self.assertEqual(self.box.get_name('en'), 'Box 1')
 
+    def test_get_weekly_schedule(self):
+        """Перевірка скомпільованого тижневого графіку"""
+        schedule = self.box.get_weekly_schedule()
+        self.assertEqual(len(schedule), 7)
+        self.assertEqual(schedule[0], (480, 1080))  # Понеділок 08:00-18:00
+        self.assertEqual(schedule[5], (540, 900))  # Субота 09:00-15:00
+        self.assertIsNone(schedule[6])  # Неділя - вихідний
+
+    def test_weekly_schedule_invalidated_on_save(self):
+        """Перевірка що графік перекомпільовується після збереження"""
+        self.assertIsNone(self.box.get_working_window(6))
+
+        self.box.working_hours['sunday'] = {'start': '10:00', 'end': '14:00'}
+        self.box.save()
+
+        self.assertEqual(self.box.get_working_window(6), (600, 840))
+
+    def test_is_available_at_time_duration_fits(self):
+        """Перевірка що вся послуга вміщується до кінця робочого дня"""
+        test_date = date(2024, 1, 15)  # Понеділок
+        self.assertTrue(
+            self.box.is_available_at_time(test_date, time(17, 0), 60))
+        self.assertFalse(
+            self.box.is_available_at_time(test_date, time(17, 30), 60))
+
 
 class CustomerModelTest(TestCase):
     """Тести для моделі Customer"""
@@ -359,6 +385,30 @@ class AppointmentModelTest(TestCase):
         self.assertEqual(appointment.status, 'pending')
         self.assertEqual(appointment.total_price, Decimal('1000.00'))
 
+    def test_appointment_time_range(self):
+        """Перевірка обчислення часового інтервалу запису"""
+        appointment = Appointment.objects.create(
+            customer=self.customer,
+            service=self.service,
+            box=self.box,
+            appointment_date=date(2024, 1, 15),
+            appointment_time=time(10, 0),
+            total_price=Decimal('1000.00')
+        )
+        local_start = timezone.localtime(appointment.start_at)
+        self.assertEqual(local_start.date(), date(2024, 1, 15))
+        self.assertEqual(local_start.time(), time(10, 0))
+        self.assertEqual(
+            (appointment.end_at - appointment.start_at).total_seconds(),
+            self.service.duration_minutes * 60)
+
+        # Інтервал перераховується при перенесенні
+        appointment.appointment_time = time(14, 30)
+        appointment.save(update_fields=['appointment_time'])
+        appointment.refresh_from_db()
+        self.assertEqual(
+            timezone.localtime(appointment.start_at).time(), time(14, 30))
+
     def test_appointment_auto_total_price(self):
         """Перевірка автоматичного встановлення ціни"""
         appointment = Appointment(
@@ -422,6 +472,59 @@ class AppointmentModelTest(TestCase):
             )
             self.assertEqual(appointment.status, status)
 
+    def test_normalize_search_text(self):
+        """Перевірка нормалізації тексту для пошуку"""
+        self.assertEqual(
+            normalize_search_text('  Олександр ', '', 'ЛУК’ЯНЕНКО'),
+            "олександр лук'яненко")
+        self.assertEqual(normalize_search_text('Імʼя'), "ім'я")
+        self.assertEqual(normalize_search_text(), '')
+
+    def test_appointment_search_name(self):
+        """Перевірка заповнення search_name для клієнта та гостя"""
+        self.user.first_name = 'Тарас'
+        self.user.last_name = 'Шевченко'
+        self.user.save()
+        appointment = Appointment.objects.create(
+            customer=self.customer,
+            service=self.service,
+            appointment_date=date(2024, 1, 15),
+            appointment_time=time(10, 0),
+            total_price=Decimal('1000.00')
+        )
+        self.assertEqual(appointment.search_name, 'тарас шевченко')
+
+        guest = Appointment.objects.create(
+            guest_name='Guest  User',
+            service=self.service,
+            appointment_date=date(2024, 1, 15),
+            appointment_time=time(11, 0),
+            total_price=Decimal('1000.00')
+        )
+        self.assertEqual(guest.search_name, 'guest user')
+
+        guest.guest_name = 'Інший Гість'
+        guest.save(update_fields=['guest_name'])
+        guest.refresh_from_db()
+        self.assertEqual(guest.search_name, 'інший гість')
+
+    def test_search_name_follows_user_rename(self):
+        """Перевірка оновлення search_name при зміні імені користувача"""
+        appointment = Appointment.objects.create(
+            customer=self.customer,
+            service=self.service,
+            appointment_date=date(2024, 1, 15),
+            appointment_time=time(10, 0),
+            total_price=Decimal('1000.00')
+        )
+        self.assertEqual(appointment.search_name, '')
+
+        self.user.first_name = 'Леся'
+        self.user.last_name = 'Українка'
+        self.user.save()
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.search_name, 'леся українка')
+
 
 class STOInfoModelTest(TestCase):
     """Тести для моделі STOInfo"""
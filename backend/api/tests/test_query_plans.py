@@ -0,0 +1,190 @@
+"""
+Тести планів запитів до таблиці записів.
+Виконують EXPLAIN для запитів гарячих endpoints на заповненій таблиці та
+перевіряють, що записи не читаються повним послідовним скануванням.
+"""
+
+from decimal import Decimal
+from datetime import date, time, timedelta
+import random
+import re
+import unittest
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from backend.api.models import (
+    ServiceCategory, Service, Customer, Appointment, Box
+)
+from backend.services.appointment_service.appointment_service import (
+    AppointmentService
+)
+
+APPOINTMENT_TABLE = Appointment._meta.db_table  # pylint: disable=no-member
+
+
+def explain(sql):
+    """Рядки плану запиту для поточної СУБД"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute(f'EXPLAIN {sql}')
+        return [row[0] for row in cursor.fetchall()]
+
+
+def has_sequential_scan(plan):
+    """Чи читає план таблицю записів повним скануванням"""
+    if connection.vendor == 'sqlite':
+        pattern = re.compile(rf'^SCAN {APPOINTMENT_TABLE}\b(?!.*INDEX)')
+    else:
+        pattern = re.compile(rf'Seq Scan on {APPOINTMENT_TABLE}\b')
+    return any(pattern.search(line.strip()) for line in plan)
+
+
+@unittest.skipUnless(
+    connection.vendor in ('sqlite', 'postgresql'),
+    'Плани запитів перевіряються тільки для SQLite та PostgreSQL')
+class AppointmentQueryPlanTest(TestCase):
+    """Запити доступності, записів клієнта та адмін-списку йдуть по індексах"""
+
+    DAYS = 180
+    APPOINTMENTS_PER_DAY = 20
+
+    @classmethod
+    def setUpTestData(cls):
+        """Заповнення таблиці записів за півроку"""
+        rng = random.Random(7)
+        category = ServiceCategory.objects.create(name='Категорія', order=1)
+        cls.service = Service.objects.create(
+            name='Послуга', price=Decimal('500.00'), category=category,
+            duration_minutes=60, is_active=True)
+        working_hours = {
+            day: {'start': '08:00', 'end': '18:00'}
+            for day in ('monday', 'tuesday', 'wednesday', 'thursday',
+                        'friday', 'saturday', 'sunday')
+        }
+        cls.boxes = [
+            Box.objects.create(
+                name=f'Бокс {i}', working_hours=working_hours, is_active=True)
+            for i in range(1, 4)
+        ]
+        cls.user = User.objects.create_user(
+            username='planner', password='testpass123')
+        customers = [Customer.objects.create(user=cls.user)] + [
+            Customer.objects.create(user=User.objects.create_user(
+                username=f'customer{i}', password='testpass123'))
+            for i in range(30)
+        ]
+        cls.admin = User.objects.create_user(
+            username='admin', password='adminpass123', is_staff=True)
+
+        cls.start_date = date(2030, 1, 7)
+        statuses = ('pending', 'confirmed', 'completed', 'cancelled')
+        appointments = []
+        for day in range(cls.DAYS):
+            appointment_date = cls.start_date + timedelta(days=day)
+            for i in range(cls.APPOINTMENTS_PER_DAY):
+                appointment_time = time(8 + i % 10, 0)
+                start_at, end_at = Appointment.compute_time_range(
+                    appointment_date, appointment_time, 60)
+                appointments.append(Appointment(
+                    customer=rng.choice(customers),
+                    service=cls.service,
+                    box=cls.boxes[i % len(cls.boxes)],
+                    appointment_date=appointment_date,
+                    appointment_time=appointment_time,
+                    status=rng.choice(statuses),
+                    total_price=Decimal('500.00'),
+                    start_at=start_at,
+                    end_at=end_at,
+                ))
+        Appointment.objects.bulk_create(appointments, batch_size=1000)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {APPOINTMENT_TABLE}')
+
+    def setUp(self):
+        """Налаштування клієнта та планувальника"""
+        cache.clear()
+        self.client = APIClient()
+        if connection.vendor == 'postgresql':
+            # Без дозволу на Seq Scan планувальник обирає його лише тоді,
+            # коли жоден індекс не підходить до запиту
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+    def tearDown(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('RESET enable_seqscan')
+
+    def assertNoSequentialScans(self, queries):
+        """Усі запити до таблиці записів мають план з індексом"""
+        checked = 0
+        for query in queries:
+            sql = query['sql']
+            if (not sql.lstrip().upper().startswith('SELECT') or
+                    APPOINTMENT_TABLE not in sql):
+                continue
+            checked += 1
+            plan = explain(sql)
+            self.assertFalse(
+                has_sequential_scan(plan),
+                f'Повне сканування {APPOINTMENT_TABLE}:\n{sql}\n' +
+                '\n'.join(plan))
+        self.assertGreater(checked, 0, 'Не перехоплено запитів до записів')
+
+    def test_available_times_uses_indexes(self):
+        """Доступні часи (по інтервалах записів)"""
+        check_date = self.start_date + timedelta(days=30)
+        url = (
+            f'/api/boxes/available_times/?date={check_date}'
+            f'&service_id={self.service.id}'
+        )
+        with override_settings(AVAILABILITY_USE_OCCUPANCY=False):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNoSequentialScans(queries)
+
+    def test_find_available_box_uses_indexes(self):
+        """Пошук вільного боксу на час"""
+        with CaptureQueriesContext(connection) as queries:
+            AppointmentService._find_available_box(  # pylint: disable=protected-access
+                self.start_date + timedelta(days=45), time(12, 30),
+                self.service)
+        self.assertNoSequentialScans(queries)
+
+    def test_my_appointments_uses_indexes(self):
+        """Записи поточного клієнта"""
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/appointments/my_appointments/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNoSequentialScans(queries)
+
+    def test_admin_appointments_uses_indexes(self):
+        """Адмін-список: діапазон дат, статус і keyset-пагінація"""
+        self.client.force_authenticate(user=self.admin)
+        date_from = self.start_date + timedelta(days=60)
+        date_to = date_from + timedelta(days=6)
+        urls = (
+            f'/api/admin/appointments/?date_from={date_from}'
+            f'&date_to={date_to}',
+            '/api/admin/appointments/?status=pending&page_size=50',
+            '/api/admin/appointments/?page_size=50&count=none',
+        )
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            if response.data['next_cursor']:
+                with CaptureQueriesContext(connection) as next_queries:
+                    self.client.get(response.data['next'])
+                self.assertNoSequentialScans(next_queries)
+            self.assertNoSequentialScans(queries)
@@ -5,15 +5,18 @@
 """
 
 from decimal import Decimal
+from datetime import date, time
 from django.test import TestCase
 from django.contrib.auth.models import User
 
+from backend.api.localization import with_language
 from backend.api.models import (
-    ServiceCategory, Service, Customer, Box, STOInfo
+    ServiceCategory, Service, Customer, Box, STOInfo, Appointment
 )
 from backend.api.serializers import (
-    ServiceCategorySerializer, ServiceSerializer,
-    BoxSerializer, STOInfoSerializer, CustomerSerializer
+    ServiceCategorySerializer, ServiceSerializer, ServiceListSerializer,
+    BoxSerializer, STOInfoSerializer, CustomerSerializer,
+    AppointmentSerializer
 )
 
 
@@ -273,3 +276,102 @@ class STOInfoSerializerTest(TestCase):
         self.assertEqual(data['what_you_can_title'], 'What you can')
         self.assertEqual(data['what_you_can_items'], ['Item 1', 'Item 2'])
 
+
+class AppointmentSerializerTest(TestCase):
+    """Тести для AppointmentSerializer"""
+
+    def setUp(self):
+        """Налаштування тестових даних"""
+        self.category = ServiceCategory.objects.create(
+            name='Категорія', name_en='Category', order=1)
+        self.service = Service.objects.create(
+            name='Послуга', name_en='Service', price=Decimal('1000.00'),
+            category=self.category, duration_minutes=60)
+        self.box = Box.objects.create(
+            name='Бокс', name_en='Box',
+            working_hours={'monday': {'start': '08:00', 'end': '18:00'}})
+        for hour in (9, 11):
+            Appointment.objects.create(
+                guest_name='Гість', service=self.service, box=self.box,
+                appointment_date=date(2030, 1, 7),
+                appointment_time=time(hour, 0))
+        Appointment.objects.create(
+            guest_name='Гість', service=self.service,
+            appointment_date=date(2030, 1, 8), appointment_time=time(9, 0))
+
+    def test_related_objects_serialized_once_per_response(self):
+        """Перевірка, що однакові послуга та бокс серіалізуються один раз"""
+        appointments = Appointment.objects.select_related(
+            'service__category', 'box').order_by('id')
+        data = AppointmentSerializer(
+            appointments, many=True, context={'language': 'en'}).data
+
+        self.assertIs(data[0]['service'], data[1]['service'])
+        self.assertIs(data[0]['box'], data[1]['box'])
+        self.assertIsNone(data[2]['box'])
+        self.assertEqual(data[0]['service']['name'], 'Service')
+        self.assertEqual(data[0]['service']['category']['name'], 'Category')
+        self.assertEqual(data[0]['box']['name'], 'Box')
+
+        # Кеш не переживає відповідь: інша мова в новому серіалізаторі
+        data = AppointmentSerializer(
+            appointments, many=True, context={'language': 'uk'}).data
+        self.assertEqual(data[0]['service']['name'], 'Послуга')
+        self.assertEqual(data[0]['box']['name'], 'Бокс')
+
+
+class LocalizedFieldsMixinTest(TestCase):
+    """Тести для серіалізації querysets після with_language"""
+
+    def setUp(self):
+        """Налаштування тестових даних"""
+        self.category = ServiceCategory.objects.create(
+            name='Категорія', name_en='Category', order=1)
+        Service.objects.create(
+            name='Послуга', name_en='Service', description='Опис',
+            description_en='', price=Decimal('1000.00'),
+            category=self.category)
+        Service.objects.create(
+            name='Тільки українською', price=Decimal('500.00'),
+            category=self.category)
+
+    def test_values_resolved_in_database(self):
+        """Перевірка значень мовою запиту з запасною мовою"""
+        services = with_language(
+            Service.objects.select_related('category').order_by('id'), 'en')
+        with self.assertNumQueries(1):
+            data = ServiceSerializer(
+                services, many=True, context={'language': 'en'}).data
+
+        self.assertEqual(
+            [item['name'] for item in data],
+            ['Service', 'Тільки українською'])
+        # Порожній переклад опису замінюється українським
+        self.assertEqual(data[0]['description'], 'Опис')
+        # Поля перекладу лишаються у відповіді без змін
+        self.assertEqual(data[0]['name_en'], 'Service')
+        self.assertEqual(data[0]['description_en'], '')
+        self.assertEqual(data[0]['category']['name'], 'Category')
+
+    def test_same_output_as_python_selection(self):
+        """Перевірка збігу з вибором мови в Python"""
+        for language in ('uk', 'en'):
+            context = {'language': language}
+            services = Service.objects.select_related(
+                'category').order_by('id')
+            expected = ServiceListSerializer(
+                services, many=True, context=context).data
+            projected = ServiceListSerializer(
+                with_language(services, language), many=True,
+                context=context).data
+            self.assertEqual(projected, expected)
+
+    def test_annotation_overrides_only_localized_keys(self):
+        """Перевірка, що з анотацій береться лише значення мовою запиту"""
+        categories = with_language(ServiceCategory.objects.all(), 'en')
+        data = ServiceCategorySerializer(
+            categories, many=True,
+            context={'language': 'en', 'admin_panel': True}).data
+        self.assertEqual(data[0]['name'], 'Category')
+        self.assertEqual(data[0]['name_en'], 'Category')
+        self.assertEqual(data[0]['order'], 1)
@@ -5,18 +5,47 @@
 
 from decimal import Decimal
 from datetime import date, time, datetime, timedelta
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
 from django.contrib.auth.models import User
 from django.utils import timezone
 from unittest.mock import patch, MagicMock
+import json
+import random
+import threading
+import unittest
 
+from backend.api.caching import bump_version
 from backend.api.models import (
-    ServiceCategory, Service, Customer, Appointment, Box
+    ServiceCategory, Service, Customer, Appointment, Box, BoxOccupancy,
+    DailyStats, STOInfo
 )
 from backend.services.appointment_service.appointment_service import (
     AppointmentService
 )
 from backend.services.auth_service.auth_service import AuthorizationService
+from backend.services.availability_service.availability_service import (
+    AvailabilityService, free_run_mask, intervals_to_mask
+)
+from backend.services.availability_service.availability_cache import (
+    AvailabilityCache
+)
+from backend.services.availability_service import vectorized
+from backend.services.availability_service.occupancy import OccupancyService
+from backend.services.service_catalog.catalog_cache import (
+    CATALOG_FEATURED, CATALOG_SERVICES, CATALOG_VERSION_KEY, CatalogCache
+)
+from backend.services.service_catalog.search_index import ServiceSearch
+from backend.services.service_catalog.service_catalog import ServiceCatalog
+from backend.services.service_catalog.sto_info_cache import (
+    STO_INFO_VERSION_KEY, STOInfoCache
+)
+from backend.services.statistics_service.daily_stats import (
+    DailyStatsService
+)
+from backend.services.statistics_service.statistics_service import (
+    StatisticsService
+)
 from backend.services.user_service.user_service import UserService
 
 
@@ -57,6 +86,29 @@ class AppointmentServiceTest(TestCase):
             is_active=True
         )
 
+    def test_search_by_name_ranking(self):
+        """Перевірка пошуку за ім'ям: збіг з початку імені вище за підрядок"""
+        names = ('Марина Іваненко', 'Іван Петренко', 'Петро Іванов')
+        for hour, name in enumerate(names, start=9):
+            Appointment.objects.create(
+                guest_name=name,
+                service=self.service,
+                appointment_date=date(2030, 1, 7),
+                appointment_time=time(hour, 0),
+                total_price=Decimal('1000.00')
+            )
+
+        results = list(AppointmentService.search_by_name(
+            Appointment.objects.all(), '  ІВАН '))
+
+        self.assertEqual(
+            [a.guest_name for a in results],
+            ['Іван Петренко', 'Петро Іванов', 'Марина Іваненко'])
+        self.assertGreater(results[0].search_rank, results[-1].search_rank)
+        self.assertEqual(
+            AppointmentService.search_by_name(
+                Appointment.objects.all(), '').count(), 3)
+
     def test_create_appointment_success(self):
         """Перевірка успішного створення запису"""
         tomorrow = date.today() + timedelta(days=1)
@@ -275,6 +327,72 @@ class AppointmentServiceTest(TestCase):
         # Має знайти той самий бокс, оскільки виключили поточний запис
         self.assertIsNotNone(box)
 
+    def test_find_available_box_skips_overlapping(self):
+        """Перевірка що бокс з перекриттям інтервалу пропускається"""
+        monday = date(2030, 1, 7)
+        second_box = Box.objects.create(
+            name='Бокс 2',
+            working_hours={'monday': {'start': '08:00', 'end': '18:00'}},
+            is_active=True
+        )
+        Appointment.objects.create(
+            customer=self.customer,
+            service=self.service,
+            box=self.box,
+            appointment_date=monday,
+            appointment_time=time(9, 30),
+            status='confirmed',
+            total_price=Decimal('1000.00')
+        )
+
+        box = AppointmentService._find_available_box(
+            monday, time(10, 0), self.service)
+        self.assertEqual(box, second_box)
+
+        # Запис, що закінчується рівно на початку слоту, не заважає
+        box = AppointmentService._find_available_box(
+            monday, time(10, 30), self.service)
+        self.assertEqual(box, self.box)
+
+    def test_create_appointment_falls_through_on_constraint_violation(self):
+        """Перевірка переходу до наступного боксу при порушенні обмеження"""
+        from django.db import IntegrityError
+        from backend.api.data_access import DataAccessLayer
+
+        monday = date(2030, 1, 7)
+        second_box = Box.objects.create(
+            name='Бокс 2',
+            working_hours={'monday': {'start': '08:00', 'end': '18:00'}},
+            is_active=True
+        )
+        real_create = DataAccessLayer.create_appointment
+
+        def create_or_conflict(**kwargs):
+            # Імітуємо паралельний запис, що зайняв перший бокс
+            if kwargs['box'] == self.box:
+                raise IntegrityError('appointment_box_no_overlap')
+            return real_create(**kwargs)
+
+        data = {
+            'service_id': self.service.id,
+            'appointment_date': monday.strftime('%Y-%m-%d'),
+            'appointment_time': '10:00',
+        }
+        with patch.object(
+                DataAccessLayer, 'create_appointment',
+                side_effect=create_or_conflict):
+            result = AppointmentService.create_appointment(data, self.user)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['appointment'].box, second_box)
+
+        # Якщо конфлікт у всіх боксах - запис не створюється
+        with patch.object(
+                DataAccessLayer, 'create_appointment',
+                side_effect=IntegrityError('appointment_box_no_overlap')):
+            result = AppointmentService.create_appointment(data, self.user)
+        self.assertFalse(result['success'])
+
     def test_get_user_appointments(self):
         """Перевірка отримання записів користувача"""
         # Створюємо кілька записів
@@ -294,6 +412,100 @@ class AppointmentServiceTest(TestCase):
         self.assertEqual(appointments.count(), 3)
 
 
+@skipUnlessDBFeature('has_select_for_update')
+class AppointmentConcurrencyTest(TransactionTestCase):
+    """Стрес-тест одночасних записів на один слот
+
+    Потребує СУБД з блокуваннями рядків (PostgreSQL): SQLite не
+    підтримує паралельні транзакції запису.
+    """
+
+    THREADS = 12
+
+    def setUp(self):
+        """Налаштування тестових даних"""
+        self.category = ServiceCategory.objects.create(
+            name='Тестова категорія',
+            order=1
+        )
+        self.service = Service.objects.create(
+            name='Тестова послуга',
+            price=Decimal('1000.00'),
+            category=self.category,
+            duration_minutes=60
+        )
+        self.boxes = [
+            Box.objects.create(
+                name=f'Бокс {i}',
+                working_hours={'monday': {'start': '08:00', 'end': '18:00'}},
+                is_active=True
+            )
+            for i in range(1, 4)
+        ]
+        self.monday = date(2030, 1, 7)
+
+    def _book_concurrently(self, times):
+        """Одночасний запуск записів у THREADS потоках"""
+        from django.db import connection
+
+        barrier = threading.Barrier(len(times))
+        results = []
+        lock = threading.Lock()
+
+        def book(appointment_time):
+            try:
+                barrier.wait()
+                result = AppointmentService.create_appointment({
+                    'service_id': self.service.id,
+                    'appointment_date': self.monday.strftime('%Y-%m-%d'),
+                    'appointment_time': appointment_time,
+                    'guest_name': 'Гість',
+                })
+                with lock:
+                    results.append(result['success'])
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=book, args=(appointment_time,))
+            for appointment_time in times
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _assert_no_overlaps(self):
+        """Перевірка відсутності перекриттів у кожному боксі"""
+        for box in self.boxes:
+            intervals = sorted(
+                Appointment.objects.filter(
+                    box=box,
+                    status__in=Appointment.ACTIVE_STATUSES
+                ).values_list('start_at', 'end_at'))
+            for (_, previous_end), (next_start, _) in zip(
+                    intervals, intervals[1:]):
+                self.assertLessEqual(previous_end, next_start)
+
+    def test_concurrent_same_slot_bookings(self):
+        """Кількість успішних записів не перевищує кількість боксів"""
+        results = self._book_concurrently(['10:00'] * self.THREADS)
+
+        self.assertEqual(results.count(True), len(self.boxes))
+        self.assertEqual(
+            Appointment.objects.filter(appointment_date=self.monday).count(),
+            len(self.boxes))
+        self._assert_no_overlaps()
+
+    def test_concurrent_overlapping_bookings(self):
+        """Записи з перекриттям на різних початках не перетинаються"""
+        times = ['10:00', '10:30', '11:00'] * (self.THREADS // 3)
+        self._book_concurrently(times)
+
+        self._assert_no_overlaps()
+
+
 class AuthorizationServiceTest(TestCase):
     """Тести для AuthorizationService"""
 
@@ -812,3 +1024,1061 @@ class ServiceCatalogTest(TestCase):
         sto_info = STOInfo.objects.first()
         items = sto_info.get_what_you_can_items_list('uk')
         self.assertEqual(len(items), 2)  # Тільки 2 не порожніх
+
+
+class AvailabilityServiceTest(TestCase):
+    """Тести для AvailabilityService"""
+
+    def setUp(self):
+        """Налаштування тестових даних"""
+        self.category = ServiceCategory.objects.create(
+            name='Тестова категорія',
+            order=1
+        )
+        self.service = Service.objects.create(
+            name='Тестова послуга',
+            price=Decimal('1000.00'),
+            category=self.category,
+            duration_minutes=60
+        )
+        self.long_service = Service.objects.create(
+            name='Довга послуга',
+            price=Decimal('2000.00'),
+            category=self.category,
+            duration_minutes=90
+        )
+        self.box = Box.objects.create(
+            name='Бокс 1',
+            working_hours={
+                'monday': {'start': '08:00', 'end': '12:00'},
+                'sunday': {'start': '00:00', 'end': '00:00'}
+            },
+            is_active=True
+        )
+        self.monday = date(2030, 1, 7)
+
+    def test_merge_intervals(self):
+        """Перевірка об'єднання інтервалів, що перекриваються"""
+        merged = AvailabilityService.merge_intervals(
+            [(600, 660), (480, 540), (530, 570), (660, 700)])
+        self.assertEqual(merged, [(480, 570), (600, 700)])
+
+    def test_find_free_starts(self):
+        """Перевірка пошуку вільних початків слотів"""
+        free = AvailabilityService.find_free_starts(
+            480, 720, 60, [(540, 600)])
+        self.assertEqual(free, [480, 600, 630, 660])
+
+    def test_get_available_times_empty_day(self):
+        """Перевірка вільних часів без записів"""
+        times = AvailabilityService.get_available_times(self.monday, 60)
+        self.assertEqual(
+            times,
+            ['08:00', '08:30', '09:00', '09:30', '10:00', '10:30', '11:00'])
+
+    def test_get_available_times_with_booking(self):
+        """Перевірка що зайнятий інтервал враховує тривалість послуги"""
+        Appointment.objects.create(
+            service=self.long_service,
+            box=self.box,
+            appointment_date=self.monday,
+            appointment_time=time(9, 0),
+            status='confirmed',
+            total_price=Decimal('2000.00')
+        )
+
+        times = AvailabilityService.get_available_times(self.monday, 60)
+        self.assertEqual(times, ['08:00', '10:30', '11:00'])
+
+    def test_get_available_times_ignores_cancelled(self):
+        """Перевірка що скасовані записи не займають бокс"""
+        Appointment.objects.create(
+            service=self.service,
+            box=self.box,
+            appointment_date=self.monday,
+            appointment_time=time(9, 0),
+            status='cancelled',
+            total_price=Decimal('1000.00')
+        )
+
+        times = AvailabilityService.get_available_times(self.monday, 60)
+        self.assertIn('09:00', times)
+
+    def test_get_available_times_with_exclusion(self):
+        """Перевірка виключення запису при редагуванні"""
+        appointment = Appointment.objects.create(
+            service=self.service,
+            box=self.box,
+            appointment_date=self.monday,
+            appointment_time=time(9, 0),
+            status='pending',
+            total_price=Decimal('1000.00')
+        )
+
+        times = AvailabilityService.get_available_times(
+            self.monday, 60, appointment.id)
+        self.assertIn('09:00', times)
+
+    def test_get_available_times_day_off(self):
+        """Перевірка вихідного та неописаного дня"""
+        sunday = date(2030, 1, 6)
+        tuesday = date(2030, 1, 8)
+        self.assertEqual(
+            AvailabilityService.get_available_times(sunday, 60), [])
+        self.assertEqual(
+            AvailabilityService.get_available_times(tuesday, 60), [])
+
+    def test_get_available_times_constant_queries(self):
+        """Перевірка що кількість запитів не залежить від кількості записів"""
+        for i in range(3):
+            Box.objects.create(
+                name=f'Бокс {i + 2}',
+                working_hours={'monday': {'start': '08:00', 'end': '18:00'}},
+                is_active=True
+            )
+        for hour in (8, 10, 12, 14):
+            Appointment.objects.create(
+                service=self.service,
+                box=self.box,
+                appointment_date=self.monday,
+                appointment_time=time(hour, 0),
+                status='pending',
+                total_price=Decimal('1000.00')
+            )
+
+        # Один запит на бокси та один на записи
+        with self.assertNumQueries(2):
+            AvailabilityService.get_available_times(self.monday, 60)
+
+    def test_get_available_dates(self):
+        """Перевірка доступних дат з урахуванням повністю зайнятих днів"""
+        # Повністю займаємо понеділок 08:00-12:00
+        for hour in (8, 10):
+            Appointment.objects.create(
+                service=self.long_service,
+                box=self.box,
+                appointment_date=self.monday,
+                appointment_time=time(hour, 0),
+                status='confirmed',
+                total_price=Decimal('2000.00')
+            )
+        next_monday = self.monday + timedelta(days=7)
+
+        dates = AvailabilityService.get_available_dates(
+            self.monday, 14, 60)
+
+        # 08:00-09:30 та 10:00-11:30 лишають лише 30 хвилин вільними
+        self.assertEqual(dates, [next_monday.strftime('%Y-%m-%d')])
+
+    def test_get_available_dates_with_exclusion(self):
+        """Перевірка виключення запису при пошуку дат"""
+        appointment = Appointment.objects.create(
+            service=Service.objects.create(
+                name='Повний день',
+                price=Decimal('5000.00'),
+                category=self.category,
+                duration_minutes=240
+            ),
+            box=self.box,
+            appointment_date=self.monday,
+            appointment_time=time(8, 0),
+            status='pending',
+            total_price=Decimal('5000.00')
+        )
+
+        self.assertEqual(
+            AvailabilityService.get_available_dates(self.monday, 1, 60), [])
+        self.assertEqual(
+            AvailabilityService.get_available_dates(
+                self.monday, 1, 60, appointment.id),
+            [self.monday.strftime('%Y-%m-%d')])
+
+    def test_get_available_dates_constant_queries(self):
+        """Перевірка що кількість запитів не залежить від довжини вікна"""
+        with self.assertNumQueries(2):
+            AvailabilityService.get_available_dates(self.monday, 90, 60)
+
+
+    def test_get_availability_matrix_assigns_first_free_box(self):
+        """Перевірка призначення першого вільного боксу в матриці"""
+        second_box = Box.objects.create(
+            name='Бокс 2',
+            working_hours={'monday': {'start': '08:00', 'end': '12:00'}},
+            is_active=True
+        )
+        Appointment.objects.create(
+            service=self.service,
+            box=self.box,
+            appointment_date=self.monday,
+            appointment_time=time(8, 0),
+            status='confirmed',
+            total_price=Decimal('1000.00')
+        )
+
+        with self.assertNumQueries(2):
+            matrix = AvailabilityService.get_availability_matrix(
+                self.monday, self.monday + timedelta(days=1), 60,
+                include_boxes=True)
+
+        monday, tuesday = matrix
+        self.assertEqual(monday['boxes']['08:00'], second_box.id)
+        self.assertEqual(monday['boxes']['09:00'], self.box.id)
+        self.assertEqual(
+            AppointmentService._find_available_box(
+                self.monday, time(8, 0), self.service),
+            second_box)
+        self.assertEqual(tuesday['available_times'], [])
+
+    def test_get_free_capacity(self):
+        """Перевірка найдовшого вільного проміжку дня"""
+        self.assertEqual(
+            AvailabilityService.get_free_capacity(480, 720, []), 240)
+        self.assertEqual(
+            AvailabilityService.get_free_capacity(
+                480, 720, [(500, 560), (600, 700)]),
+            40)
+        self.assertEqual(
+            AvailabilityService.get_free_capacity(
+                480, 720, [(400, 720)]),
+            0)
+
+    def test_find_next_available(self):
+        """Перевірка пошуку найближчих вільних слотів"""
+        # Неділя ввечері - найближчий слот у понеділок о 08:00
+        start = datetime(2030, 1, 6, 20, 0)
+        slots = AvailabilityService.find_next_available(start, 60, count=2)
+        self.assertEqual(slots, [
+            {'date': '2030-01-07', 'time': '08:00', 'box_id': self.box.id},
+            {'date': '2030-01-07', 'time': '08:30', 'box_id': self.box.id},
+        ])
+
+        # У понеділок о 09:10 найближчий слот сітки - 09:30
+        start = datetime(2030, 1, 7, 9, 10)
+        slots = AvailabilityService.find_next_available(start, 60)
+        self.assertEqual(slots[0]['time'], '09:30')
+
+    def test_find_next_available_skips_full_days(self):
+        """Перевірка пропуску повністю зайнятих днів"""
+        Appointment.objects.create(
+            service=Service.objects.create(
+                name='Повний день',
+                price=Decimal('5000.00'),
+                category=self.category,
+                duration_minutes=240
+            ),
+            box=self.box,
+            appointment_date=self.monday,
+            appointment_time=time(8, 0),
+            status='confirmed',
+            total_price=Decimal('5000.00')
+        )
+
+        slots = AvailabilityService.find_next_available(
+            datetime(2030, 1, 7, 0, 0), 60)
+        self.assertEqual(slots[0]['date'], '2030-01-14')
+
+        # Пошук у межах горизонту без вільних днів повертає порожній список
+        self.assertEqual(
+            AvailabilityService.find_next_available(
+                datetime(2030, 1, 7, 0, 0), 60, horizon_days=7),
+            [])
+
+
+class OccupancyServiceTest(TestCase):
+    """Тести для бітових карт зайнятості"""
+
+    def setUp(self):
+        """Налаштування тестових даних"""
+        self.category = ServiceCategory.objects.create(
+            name='Тестова категорія',
+            order=1
+        )
+        self.service = Service.objects.create(
+            name='Тестова послуга',
+            price=Decimal('1000.00'),
+            category=self.category,
+            duration_minutes=60
+        )
+        self.box = Box.objects.create(
+            name='Бокс 1',
+            working_hours={'monday': {'start': '08:00', 'end': '12:00'}},
+            is_active=True
+        )
+        self.monday = date(2030, 1, 7)
+
+    def _create_appointment(self, appointment_time, **kwargs):
+        """Створення запису в боксі на понеділок"""
+        return Appointment.objects.create(
+            service=self.service,
+            box=self.box,
+            appointment_date=self.monday,
+            appointment_time=appointment_time,
+            status='confirmed',
+            total_price=Decimal('1000.00'),
+            **kwargs
+        )
+
+    def _stored_mask(self, appointment_date=None):
+        """Збережена маска боксу на дату (0, якщо рядка немає)"""
+        return AvailabilityService.get_occupancy_masks(
+            [self.box.id], appointment_date or self.monday,
+            appointment_date or self.monday
+        ).get((self.box.id, appointment_date or self.monday), 0)
+
+    def test_intervals_to_mask(self):
+        """Перевірка побудови маски з інтервалів"""
+        self.assertEqual(intervals_to_mask([(0, 10)]), 0b11)
+        # Некратні межі займають слоти, яких торкаються
+        self.assertEqual(intervals_to_mask([(7, 11)]), 0b110)
+        self.assertEqual(
+            intervals_to_mask([(480, 540)]), ((1 << 12) - 1) << 96)
+
+    def test_free_run_mask(self):
+        """Перевірка маски початків з достатнім вільним проміжком"""
+        busy = intervals_to_mask([(540, 600)])
+        run = free_run_mask(busy, 480, 720, 60)
+        starts = [i * 5 for i in range(288) if run >> i & 1]
+        self.assertEqual(starts, [480] + list(range(600, 665, 5)))
+
+    def test_mask_matches_interval_scan(self):
+        """Перевірка збігу розрахунку по картах і по інтервалах"""
+        self._create_appointment(time(9, 0))
+        self._create_appointment(time(10, 45))
+
+        busy = AvailabilityService.get_busy_intervals(
+            [self.box.id], self.monday)[self.box.id]
+        mask = self._stored_mask()
+        for duration in (15, 30, 60, 90):
+            for step in (5, 15, 30):
+                self.assertEqual(
+                    AvailabilityService.find_free_starts_in_mask(
+                        480, 720, duration, mask, step),
+                    AvailabilityService.find_free_starts(
+                        480, 720, duration, busy, step))
+
+    def test_mask_maintained_on_changes(self):
+        """Перевірка оновлення карти при створенні, перенесенні та скасуванні"""
+        appointment = self._create_appointment(time(9, 0))
+        self.assertEqual(
+            self._stored_mask(), intervals_to_mask([(540, 600)]))
+
+        # Перенесення на інший час того ж дня
+        appointment.appointment_time = time(10, 0)
+        appointment.save()
+        self.assertEqual(
+            self._stored_mask(), intervals_to_mask([(600, 660)]))
+
+        # Перенесення на іншу дату звільняє попередній день
+        next_monday = self.monday + timedelta(days=7)
+        appointment.appointment_date = next_monday
+        appointment.save()
+        self.assertEqual(self._stored_mask(), 0)
+        self.assertEqual(
+            self._stored_mask(next_monday), intervals_to_mask([(600, 660)]))
+
+        # Скасування та завершення звільняють бокс
+        appointment.status = 'cancelled'
+        appointment.save(update_fields=['status'])
+        self.assertEqual(self._stored_mask(next_monday), 0)
+        self.assertFalse(BoxOccupancy.objects.exists())
+        self.assertEqual(OccupancyService.verify(), [])
+
+    def test_mask_maintained_on_delete_and_duration_change(self):
+        """Перевірка оновлення карти при видаленні запису та зміні тривалості"""
+        appointment = self._create_appointment(time(9, 0))
+
+        self.service.duration_minutes = 90
+        self.service.save()
+        self.assertEqual(
+            self._stored_mask(), intervals_to_mask([(540, 630)]))
+        # Інтервал запису для перевірки конфліктів теж оновлюється
+        appointment.refresh_from_db()
+        self.assertEqual(
+            appointment.end_at - appointment.start_at, timedelta(minutes=90))
+        self.assertIsNone(AppointmentService._find_available_box(  # pylint: disable=protected-access
+            self.monday, time(10, 0), self.service))
+
+        appointment.delete()
+        self.assertEqual(self._stored_mask(), 0)
+
+    def test_available_times_use_occupancy(self):
+        """Перевірка, що доступність читається з бітових карт"""
+        self._create_appointment(time(9, 0))
+        # Карта, яка розходиться з записами, впливає на результат
+        BoxOccupancy.objects.filter(box=self.box).update(
+            bitmap=BoxOccupancy.mask_to_bytes(0))
+        self.assertIn(
+            '09:00',
+            AvailabilityService.get_available_times(self.monday, 60))
+
+        with self.settings(AVAILABILITY_USE_OCCUPANCY=False):
+            self.assertNotIn(
+                '09:00',
+                AvailabilityService.get_available_times(self.monday, 60))
+
+    def test_verify_and_rebuild(self):
+        """Перевірка виявлення розбіжностей та перебудови карт"""
+        self._create_appointment(time(9, 0))
+        expected = intervals_to_mask([(540, 600)])
+        self.assertEqual(OccupancyService.verify(), [])
+
+        BoxOccupancy.objects.all().delete()
+        self.assertEqual(
+            OccupancyService.verify(),
+            [(self.box.id, self.monday, 0, expected)])
+
+        self.assertEqual(OccupancyService.rebuild(), 1)
+        self.assertEqual(OccupancyService.verify(), [])
+        self.assertEqual(self._stored_mask(), expected)
+
+
+@unittest.skipUnless(vectorized.is_available(), 'NumPy не встановлено')
+class VectorizedAvailabilityTest(TestCase):
+    """Тести векторизованого движка доступності"""
+
+    def _random_schedule(self, seed):
+        """Випадкові графіки та записи для порівняння движків"""
+        rng = random.Random(seed)
+        dates = [date(2030, 1, 7) + timedelta(days=i) for i in range(14)]
+        windows = {weekday: {} for weekday in range(7)}
+        for box_id in range(1, 6):
+            for weekday in range(7):
+                if rng.random() < 0.8:
+                    start = rng.choice((420, 480, 485, 540))
+                    windows[weekday][box_id] = (
+                        start, start + rng.choice((240, 480, 600)))
+        busy = {}
+        for check_date in dates:
+            for box_id in windows[check_date.weekday()]:
+                intervals = []
+                for _ in range(rng.randint(0, 5)):
+                    start = rng.randrange(420, 1080, 5)
+                    intervals.append((start, start + rng.choice((20, 45, 60))))
+                busy[(box_id, check_date)] = (
+                    AvailabilityService.merge_intervals(intervals))
+        return dates, windows, busy
+
+    def test_engines_match(self):
+        """Перевірка збігу результатів NumPy та чистого Python"""
+        for seed in range(5):
+            dates, windows, busy = self._random_schedule(seed)
+            for duration, step in ((60, 30), (45, 15), (20, 5)):
+                self.assertEqual(
+                    AvailabilityService.assign_free_starts(
+                        dates, windows, busy, False, duration, step,
+                        engine=vectorized.ENGINE_NUMPY),
+                    AvailabilityService.assign_free_starts(
+                        dates, windows, busy, False, duration, step,
+                        engine=vectorized.ENGINE_PYTHON))
+                self.assertEqual(
+                    vectorized.has_free_starts(
+                        dates, windows, busy, duration, step),
+                    [bool(day) for day in AvailabilityService.assign_free_starts(
+                        dates, windows, busy, False, duration, step,
+                        engine=vectorized.ENGINE_PYTHON)])
+
+    def test_matrix_with_numpy_engine(self):
+        """Перевірка матриці доступності з увімкненим NumPy"""
+        category = ServiceCategory.objects.create(name='Тест', order=1)
+        service = Service.objects.create(
+            name='Тестова послуга',
+            price=Decimal('1000.00'),
+            category=category,
+            duration_minutes=60
+        )
+        box = Box.objects.create(
+            name='Бокс 1',
+            working_hours={'monday': {'start': '08:00', 'end': '12:00'}},
+            is_active=True
+        )
+        monday = date(2030, 1, 7)
+        Appointment.objects.create(
+            service=service,
+            box=box,
+            appointment_date=monday,
+            appointment_time=time(9, 0),
+            status='confirmed',
+            total_price=Decimal('1000.00')
+        )
+
+        expected = AvailabilityService.get_availability_matrix(
+            monday, monday + timedelta(days=6), 60, include_boxes=True)
+        with self.settings(AVAILABILITY_ENGINE=vectorized.ENGINE_NUMPY):
+            self.assertEqual(
+                AvailabilityService.get_availability_matrix(
+                    monday, monday + timedelta(days=6), 60,
+                    include_boxes=True),
+                expected)
+            self.assertEqual(
+                AvailabilityService.get_available_dates(monday, 7, 60),
+                ['2030-01-07'])
+        self.assertEqual(
+            expected[0]['available_times'], ['08:00', '10:00', '10:30', '11:00'])
+
+class AvailabilityCacheTest(TestCase):
+    """Тести для AvailabilityCache"""
+
+    def setUp(self):
+        """Налаштування тестових даних"""
+        cache.clear()
+        self.category = ServiceCategory.objects.create(
+            name='Тестова категорія',
+            order=1
+        )
+        self.service = Service.objects.create(
+            name='Тестова послуга',
+            price=Decimal('1000.00'),
+            category=self.category,
+            duration_minutes=60
+        )
+        self.box = Box.objects.create(
+            name='Бокс 1',
+            working_hours={'monday': {'start': '08:00', 'end': '10:00'}},
+            is_active=True
+        )
+        self.monday = date(2030, 1, 7)
+
+    def test_repeated_read_is_cache_hit(self):
+        """Перевірка що повторне читання не звертається до БД"""
+        first = AvailabilityCache.get_available_times(self.monday, 60)
+
+        with self.assertNumQueries(0):
+            second = AvailabilityCache.get_available_times(self.monday, 60)
+            AvailabilityCache.get_available_times(self.monday, 60)
+
+        self.assertEqual(first, second)
+
+    def test_invalidated_on_appointment_create_and_cancel(self):
+        """Перевірка інвалідації при створенні та скасуванні запису"""
+        self.assertIn(
+            '08:00', AvailabilityCache.get_available_times(self.monday, 60))
+
+        appointment = Appointment.objects.create(
+            service=self.service,
+            box=self.box,
+            appointment_date=self.monday,
+            appointment_time=time(8, 0),
+            status='pending',
+            total_price=Decimal('1000.00')
+        )
+        self.assertNotIn(
+            '08:00', AvailabilityCache.get_available_times(self.monday, 60))
+
+        appointment.status = 'cancelled'
+        appointment.save()
+        self.assertIn(
+            '08:00', AvailabilityCache.get_available_times(self.monday, 60))
+
+    def test_invalidated_on_appointment_move(self):
+        """Перевірка інвалідації старої дати при перенесенні запису"""
+        appointment = Appointment.objects.create(
+            service=self.service,
+            box=self.box,
+            appointment_date=self.monday,
+            appointment_time=time(8, 0),
+            status='pending',
+            total_price=Decimal('1000.00')
+        )
+        self.assertNotIn(
+            '08:00', AvailabilityCache.get_available_times(self.monday, 60))
+
+        # Переносимо запис через свіжий екземпляр з БД
+        appointment = Appointment.objects.get(pk=appointment.pk)
+        appointment.appointment_date = self.monday + timedelta(days=7)
+        appointment.save()
+
+        self.assertIn(
+            '08:00', AvailabilityCache.get_available_times(self.monday, 60))
+
+    def test_invalidated_on_box_changes(self):
+        """Перевірка інвалідації при зміні графіку та активності боксу"""
+        self.assertEqual(
+            AvailabilityCache.get_available_times(self.monday, 60),
+            ['08:00', '08:30', '09:00'])
+
+        self.box.working_hours = {
+            'monday': {'start': '08:00', 'end': '09:00'}}
+        self.box.save()
+        self.assertEqual(
+            AvailabilityCache.get_available_times(self.monday, 60),
+            ['08:00'])
+
+        self.box.is_active = False
+        self.box.save()
+        self.assertEqual(
+            AvailabilityCache.get_available_times(self.monday, 60), [])
+
+    def test_invalidated_on_box_rename(self):
+        """Перевірка інвалідації при зміні назви, що визначає порядок боксів"""
+        second_box = Box.objects.create(
+            name='Бокс 2',
+            working_hours={'monday': {'start': '08:00', 'end': '10:00'}},
+            is_active=True
+        )
+        matrix = AvailabilityCache.get_availability_matrix(
+            self.monday, self.monday, 60, include_boxes=True)
+        self.assertEqual(matrix[0]['boxes']['08:00'], self.box.id)
+
+        second_box.name = 'Бокс 0'
+        second_box.save()
+        matrix = AvailabilityCache.get_availability_matrix(
+            self.monday, self.monday, 60, include_boxes=True)
+        self.assertEqual(matrix[0]['boxes']['08:00'], second_box.id)
+
+    def test_available_dates_invalidated_on_booking(self):
+        """Перевірка інвалідації доступних дат"""
+        self.assertEqual(
+            AvailabilityCache.get_available_dates(self.monday, 1, 120),
+            [self.monday.strftime('%Y-%m-%d')])
+
+        Appointment.objects.create(
+            service=self.service,
+            box=self.box,
+            appointment_date=self.monday,
+            appointment_time=time(9, 0),
+            status='confirmed',
+            total_price=Decimal('1000.00')
+        )
+        self.assertEqual(
+            AvailabilityCache.get_available_dates(self.monday, 1, 120), [])
+
+
+class CatalogCacheTest(TestCase):
+    """Тести для CatalogCache"""
+
+    def setUp(self):
+        """Налаштування тестових даних"""
+        cache.clear()
+        self.category = ServiceCategory.objects.create(
+            name='Категорія', name_en='Category', order=1)
+        self.service = Service.objects.create(
+            name='Послуга', name_en='Service', price=Decimal('1000.00'),
+            category=self.category, is_active=True, is_featured=True)
+        Service.objects.create(
+            name='Неактивна', price=Decimal('500.00'),
+            category=self.category, is_active=False)
+
+    def test_sections_rendered_per_language(self):
+        """Перевірка розділів каталогу для кожної мови"""
+        content, etag, _ = CatalogCache.get_section('en', CATALOG_SERVICES)
+        data = json.loads(content)
+        self.assertEqual([item['name'] for item in data], ['Service'])
+        self.assertEqual(data[0]['category']['name'], 'Category')
+
+        uk_content, uk_etag, _ = CatalogCache.get_section(
+            'uk', CATALOG_SERVICES)
+        self.assertEqual(json.loads(uk_content)[0]['name'], 'Послуга')
+        self.assertNotEqual(etag, uk_etag)
+
+        with self.assertNumQueries(0):
+            featured, _, _ = CatalogCache.get_section('uk', CATALOG_FEATURED)
+        self.assertEqual(len(json.loads(featured)), 1)
+
+    def test_write_invalidates_and_rebuilds_after_commit(self):
+        """Перевірка скидання одразу та перебудови після коміту"""
+        CatalogCache.get_section('uk', CATALOG_SERVICES)
+        self.assertIsNotNone(cache.get(CATALOG_VERSION_KEY))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.name = 'Нова назва'
+            self.service.save()
+            self.assertIsNone(cache.get(CATALOG_VERSION_KEY))
+
+        self.assertIsNotNone(cache.get(CATALOG_VERSION_KEY))
+        with self.assertNumQueries(0):
+            content, _, _ = CatalogCache.get_section('uk', CATALOG_SERVICES)
+        self.assertEqual(json.loads(content)[0]['name'], 'Нова назва')
+
+
+class StatisticsServiceTest(TestCase):
+    """Тести для StatisticsService"""
+
+    def setUp(self):
+        """Налаштування тестових даних"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='stats@example.com',
+            email='stats@example.com',
+            password='testpass123'
+        )
+        self.customer = Customer.objects.create(user=self.user)
+        self.category = ServiceCategory.objects.create(
+            name='Тестова категорія',
+            order=1
+        )
+        self.service = Service.objects.create(
+            name='Тестова послуга',
+            price=Decimal('1000.00'),
+            category=self.category
+        )
+        self.today = timezone.now().date()
+
+    def _create_appointment(self, status, appointment_date=None):
+        """Створення запису клієнта"""
+        return Appointment.objects.create(
+            customer=self.customer,
+            service=self.service,
+            appointment_date=appointment_date or self.today,
+            appointment_time=time(10, 0),
+            status=status,
+            total_price=Decimal('500.00')
+        )
+
+    def test_compute_dashboard(self):
+        """Перевірка статистики умовними агрегатами"""
+        self._create_appointment('pending')
+        self._create_appointment('completed')
+        self._create_appointment(
+            'completed', self.today - timedelta(days=60))
+
+        with self.assertNumQueries(3):
+            stats = StatisticsService.compute_dashboard()
+
+        self.assertEqual(stats['total_appointments'], 3)
+        self.assertEqual(stats['pending_appointments'], 1)
+        self.assertEqual(stats['completed_appointments'], 2)
+        self.assertEqual(stats['monthly_appointments'], 2)
+        self.assertEqual(stats['total_revenue'], Decimal('1000.00'))
+        self.assertEqual(stats['revenue_today'], Decimal('500.00'))
+        self.assertEqual(stats['total_customers'], 1)
+        self.assertEqual(stats['blocked_customers'], 0)
+        self.assertEqual(stats['services_count'], 1)
+
+    def test_compute_dashboard_empty(self):
+        """Перевірка нульового доходу без завершених записів"""
+        stats = StatisticsService.compute_dashboard()
+        self.assertEqual(stats['total_revenue'], 0)
+        self.assertEqual(stats['revenue_today'], 0)
+
+    def test_dashboard_snapshot(self):
+        """Перевірка кешування знімку, інвалідації та обходу кешу"""
+        self._create_appointment('pending')
+        stats = StatisticsService.get_dashboard()
+        self.assertEqual(stats['total_appointments'], 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(StatisticsService.get_dashboard(), stats)
+
+        # Зміна запису інвалідує знімок
+        self._create_appointment('completed')
+        self.assertEqual(
+            StatisticsService.get_dashboard()['total_appointments'], 2)
+
+        # Масове оновлення оминає сигнали - допомагає fresh
+        Service.objects.update(is_active=False)
+        self.assertEqual(
+            StatisticsService.get_dashboard()['services_count'], 1)
+        self.assertEqual(
+            StatisticsService.get_dashboard(fresh=True)['services_count'], 0)
+
+
+class DailyStatsServiceTest(TestCase):
+    """Тести для денної зведеної статистики"""
+
+    def setUp(self):
+        """Налаштування тестових даних"""
+        self.category = ServiceCategory.objects.create(
+            name='Тестова категорія',
+            order=1
+        )
+        self.service = Service.objects.create(
+            name='Тестова послуга',
+            price=Decimal('1000.00'),
+            category=self.category
+        )
+        self.box = Box.objects.create(
+            name='Бокс 1',
+            working_hours={'monday': {'start': '08:00', 'end': '18:00'}},
+            is_active=True
+        )
+        self.monday = date(2030, 1, 7)
+
+    def _create_appointment(self, status='pending', **kwargs):
+        """Створення запису в боксі"""
+        values = {
+            'service': self.service,
+            'box': self.box,
+            'appointment_date': self.monday,
+            'appointment_time': time(10, 0),
+            'status': status,
+            'total_price': Decimal('1000.00'),
+        }
+        values.update(kwargs)
+        return Appointment.objects.create(**values)
+
+    def _assert_matches_rebuild(self):
+        """Інкрементальні рядки збігаються з перерахунком з записів"""
+        fields = ['date', 'box_id', 'service_id', 'revenue'] + list(
+            DailyStats.STATUS_COUNT_FIELDS.values())
+        incremental = sorted(
+            tuple(row) for row in DailyStats.objects.exclude(
+                **{field: 0 for field in fields[3:]}
+            ).values_list(*fields))
+        DailyStatsService.rebuild()
+        rebuilt = sorted(
+            tuple(row) for row in DailyStats.objects.values_list(*fields))
+        self.assertEqual(incremental, rebuilt)
+
+    def test_incremental_updates(self):
+        """Перевірка оновлення статистики при змінах записів"""
+        appointment = self._create_appointment()
+        self.assertEqual(
+            DailyStatsService.totals(self.monday, self.monday)[
+                'pending_count'],
+            1)
+
+        # Завершення додає дохід
+        appointment.status = 'completed'
+        appointment.save()
+        totals = DailyStatsService.totals(self.monday, self.monday)
+        self.assertEqual(totals['pending_count'], 0)
+        self.assertEqual(totals['completed_count'], 1)
+        self.assertEqual(totals['revenue'], Decimal('1000.00'))
+
+        # Зміна ціни та перенесення на іншу дату
+        appointment.total_price = Decimal('800.00')
+        appointment.appointment_date = self.monday + timedelta(days=1)
+        appointment.save()
+        self.assertEqual(
+            DailyStatsService.totals(self.monday, self.monday)['total_count'],
+            0)
+        self.assertEqual(
+            DailyStatsService.totals(box_id=self.box.id)['revenue'],
+            Decimal('800.00'))
+
+        self._create_appointment(status='cancelled', box=None)
+        self._assert_matches_rebuild()
+
+    def test_delete_updates_stats(self):
+        """Перевірка видалення запису та каскадного видалення"""
+        appointment = self._create_appointment(status='completed')
+        self._create_appointment(appointment_time=time(12, 0))
+        appointment.delete()
+        totals = DailyStatsService.totals()
+        self.assertEqual(totals['completed_count'], 0)
+        self.assertEqual(totals['revenue'], 0)
+        self.assertEqual(totals['total_count'], 1)
+
+        # Видалення боксу та послуги видаляє записи і їх статистику
+        self.box.delete()
+        self.assertEqual(DailyStatsService.totals()['total_count'], 0)
+        self._create_appointment(box=None)
+        self.service.delete()
+        self.assertFalse(DailyStats.objects.exists())
+        self.assertFalse(BoxOccupancy.objects.exists())
+
+    def test_rebuild_range(self):
+        """Перевірка перебудови статистики за діапазон"""
+        self._create_appointment(status='completed')
+        self._create_appointment(
+            status='completed', appointment_date=self.monday + timedelta(days=40))
+        DailyStats.objects.all().delete()
+
+        self.assertEqual(
+            DailyStatsService.rebuild(
+                self.monday, self.monday + timedelta(days=60), batch_days=7),
+            2)
+        self.assertEqual(
+            DailyStatsService.totals()['revenue'], Decimal('2000.00'))
+        self._assert_matches_rebuild()
+
+
+class TimeseriesTest(TestCase):
+    """Тести часових рядів статистики"""
+
+    def setUp(self):
+        """Налаштування тестових даних"""
+        cache.clear()
+        self.category = ServiceCategory.objects.create(
+            name='Тестова категорія',
+            order=1
+        )
+        self.service = Service.objects.create(
+            name='Тестова послуга',
+            price=Decimal('1000.00'),
+            category=self.category
+        )
+        self.box = Box.objects.create(
+            name='Бокс 1',
+            working_hours={'monday': {'start': '08:00', 'end': '18:00'}},
+            is_active=True
+        )
+        self.day = date(2020, 3, 2)
+
+    def _create_appointment(self, appointment_date, status='completed',
+                            box=None):
+        """Створення запису на дату"""
+        return Appointment.objects.create(
+            service=self.service,
+            box=box,
+            appointment_date=appointment_date,
+            appointment_time=time(10, 0),
+            status=status,
+            total_price=Decimal('500.00')
+        )
+
+    def test_daily_buckets_filled(self):
+        """Перевірка заповнення порожніх інтервалів"""
+        self._create_appointment(self.day)
+        self._create_appointment(self.day + timedelta(days=2))
+        self._create_appointment(self.day + timedelta(days=2), 'cancelled')
+
+        series = StatisticsService.get_timeseries(
+            'revenue', 'day', self.day, self.day + timedelta(days=3))
+        self.assertEqual(
+            [bucket['value'] for bucket in series],
+            [500.0, 0, 500.0, 0])
+        self.assertEqual(series[1]['start'], '2020-03-03')
+
+        series = StatisticsService.get_timeseries(
+            'appointments', 'day', self.day, self.day + timedelta(days=3))
+        self.assertEqual(
+            [bucket['value'] for bucket in series], [1, 0, 1, 0])
+
+    def test_week_and_month_buckets(self):
+        """Перевірка групування по тижнях та місяцях"""
+        self._create_appointment(self.day)
+        self._create_appointment(self.day + timedelta(days=6))
+        self._create_appointment(self.day + timedelta(days=31))
+
+        weeks = StatisticsService.get_timeseries(
+            'appointments', 'week', self.day, self.day + timedelta(days=13))
+        self.assertEqual(
+            [(bucket['start'], bucket['value']) for bucket in weeks],
+            [('2020-03-02', 2), ('2020-03-09', 0)])
+
+        months = StatisticsService.get_timeseries(
+            'revenue', 'month', self.day, self.day + timedelta(days=40))
+        self.assertEqual(
+            [(bucket['start'], bucket['value']) for bucket in months],
+            [('2020-03-01', 1000.0), ('2020-04-01', 500.0)])
+
+    def test_filters(self):
+        """Перевірка фільтрації за боксом"""
+        self._create_appointment(self.day, box=self.box)
+        self._create_appointment(self.day)
+        series = StatisticsService.get_timeseries(
+            'appointments', 'day', self.day, self.day, box_id=self.box.id)
+        self.assertEqual(series[0]['value'], 1)
+
+    def test_closed_buckets_cached(self):
+        """Перевірка кешування минулих інтервалів та їх інвалідації"""
+        appointment = self._create_appointment(self.day)
+        date_to = self.day + timedelta(days=6)
+        StatisticsService.get_timeseries('revenue', 'day', self.day, date_to)
+
+        with self.assertNumQueries(0):
+            StatisticsService.get_timeseries(
+                'revenue', 'day', self.day, date_to)
+
+        # Зміна запису в минулому інвалідує закриті інтервали
+        appointment.status = 'cancelled'
+        appointment.save()
+        series = StatisticsService.get_timeseries(
+            'revenue', 'day', self.day, date_to)
+        self.assertEqual(series[0]['value'], 0)
+
+
+class STOInfoCacheTest(TestCase):
+    """Тести для STOInfoCache"""
+
+    def setUp(self):
+        """Налаштування тестових даних"""
+        cache.clear()
+        self.sto_info = STOInfo.objects.create(
+            name='СТО Test', address='Адреса', phone='+380501234567',
+            email='info@sto.com', working_hours='Пн-Пт: 8:00-18:00',
+            is_active=True)
+
+    def test_cached_in_process(self):
+        """Перевірка читання без запитів після першого звернення"""
+        self.assertEqual(STOInfoCache.get().name, 'СТО Test')
+        with self.assertNumQueries(0):
+            self.assertEqual(ServiceCatalog.get_sto_info().pk, self.sto_info.pk)
+
+    def test_update_invalidates(self):
+        """Перевірка інвалідації при оновленні через ServiceCatalog"""
+        STOInfoCache.get()
+        result = ServiceCatalog.update_sto_info({'name': 'Оновлене СТО'})
+        self.assertTrue(result['success'])
+        self.assertEqual(STOInfoCache.get().name, 'Оновлене СТО')
+
+    def test_version_bump_from_other_process(self):
+        """Перевірка перечитування після зміни версії іншим процесом"""
+        STOInfoCache.get()
+        # Оновлення без сигналів: копія в процесі лишається старою
+        STOInfo.objects.filter(pk=self.sto_info.pk).update(name='Інше СТО')
+        self.assertEqual(STOInfoCache.get().name, 'СТО Test')
+
+        bump_version(STO_INFO_VERSION_KEY)
+        self.assertEqual(STOInfoCache.get().name, 'Інше СТО')
+
+    def test_missing_sto_info(self):
+        """Перевірка кешування відсутності активного запису"""
+        self.sto_info.delete()
+        self.assertIsNone(STOInfoCache.get())
+        with self.assertNumQueries(0):
+            self.assertIsNone(STOInfoCache.get())
+        self.assertFalse(STOInfo.objects.exists())
+
+
+class ServiceSearchTest(TestCase):
+    """Тести для ServiceSearch"""
+
+    def setUp(self):
+        """Налаштування тестових даних"""
+        cache.clear()
+        self.engine = ServiceCategory.objects.create(
+            name='Двигун', name_en='Engine', order=1)
+        self.diagnostics = ServiceCategory.objects.create(
+            name='Діагностика', name_en='Diagnostics', order=2)
+        self.oil = Service.objects.create(
+            name='Заміна масла', name_en='Oil change',
+            description='Заміна моторної оливи та фільтра',
+            description_en='Engine oil and filter replacement',
+            price=Decimal('600.00'), category=self.engine, is_active=True)
+        self.computer = Service.objects.create(
+            name="Комп'ютерна діагностика", name_en='Computer diagnostics',
+            description='Перевірка двигуна сканером',
+            description_en='Engine scan',
+            price=Decimal('500.00'), category=self.diagnostics,
+            is_active=True)
+        Service.objects.create(
+            name='Заміна свічок', price=Decimal('300.00'),
+            category=self.engine, is_active=False)
+
+    def _ids(self, query, language='uk'):
+        return [item['id'] for item in ServiceSearch.search(query, language)]
+
+    def test_prefix_and_languages(self):
+        """Перевірка пошуку за префіксом обома мовами"""
+        self.assertEqual(self._ids('зам'), [self.oil.id])
+        self.assertEqual(self._ids('oil ch', 'en'), [self.oil.id])
+        self.assertEqual(self._ids('комп’ютерна'), [self.computer.id])
+        self.assertEqual(self._ids('масла діагн'), [])
+        self.assertEqual(self._ids('   '), [])
+
+        results = ServiceSearch.search('oil', 'en')
+        self.assertEqual(results[0]['name'], 'Oil change')
+        self.assertEqual(results[0]['category']['name'], 'Engine')
+
+    def test_relevance_ranking(self):
+        """Перевірка, що збіг у назві вище за збіг у категорії чи описі"""
+        # "Діагностика" - назва послуги, "двигун" - категорія й опис
+        self.assertEqual(
+            self._ids('діагностика'), [self.computer.id])
+        self.assertEqual(
+            self._ids('двигун'), [self.oil.id, self.computer.id])
+        self.assertEqual(
+            self._ids('engine', 'en'), [self.oil.id, self.computer.id])
+
+    def test_index_without_queries_and_rebuild(self):
+        """Перевірка пошуку без БД та перебудови при зміні каталогу"""
+        self._ids('масла')
+        with self.assertNumQueries(0):
+            self.assertEqual(self._ids('масла'), [self.oil.id])
+
+        self.oil.name = 'Заміна оливи'
+        self.oil.save()
+        self.assertEqual(self._ids('масла'), [])
+        self.assertEqual(self._ids('олив'), [self.oil.id])
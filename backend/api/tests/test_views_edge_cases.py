@@ -312,10 +312,21 @@ class ViewsEdgeCasesTest(TestCase):
 
     def test_service_catalog_get_sto_info(self):
         """Перевірка отримання інформації про СТО через ServiceCatalog"""
+        from backend.api.models import STOInfo
         from backend.services.service_catalog.service_catalog import ServiceCatalog
 
+        STOInfo.objects.create(
+            name='СТО Test',
+            address='Адреса',
+            phone='+380501234567',
+            email='info@sto.com',
+            working_hours='Пн-Пт: 8:00-18:00',
+            is_active=True
+        )
+
         sto_info = ServiceCatalog.get_sto_info()
         self.assertIsNotNone(sto_info)
+        self.assertEqual(sto_info.name, 'СТО Test')
 
     def test_service_catalog_update_sto_info(self):
         """Перевірка оновлення інформації про СТО"""
@@ -4,12 +4,13 @@ from .views import (
     ServiceCategoryViewSet, ServiceViewSet, CustomerViewSet,
     AppointmentViewSet, ServiceHistoryViewSet,
     LoyaltyTransactionViewSet, STOInfoViewSet, AdminViewSet,
-    BoxViewSet, AuthViewSet, GuestAppointmentViewSet
+    BoxViewSet, AuthViewSet, GuestAppointmentViewSet, CatalogViewSet
 )
 
 router = DefaultRouter()
 router.register(r'service-categories', ServiceCategoryViewSet)
 router.register(r'services', ServiceViewSet, basename='service')
+router.register(r'catalog', CatalogViewSet, basename='catalog')
 router.register(r'customers', CustomerViewSet, basename='customer')
 router.register(r'appointments', AppointmentViewSet, basename='appointment')
 router.register(
@@ -1,16 +1,20 @@
 """API views для СТО системи."""
 
-from datetime import datetime
+import json
+from datetime import datetime, timedelta
 
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from django.db.models import Max, Q, Sum
+from django.db import IntegrityError, transaction
+from django.db.models import Max
 from django.utils import timezone
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from .models import (
     ServiceCategory,
     Service,
@@ -20,6 +24,13 @@ from .models import (
     LoyaltyTransaction,
     Box,
 )
+from .conditional import (
+    compute_validators, conditional_get, respond_conditionally)
+from .export import (
+    CSVRenderer, NDJSONRenderer, appointment_rows, customer_rows,
+    get_export_format, streaming_export)
+from .localization import with_language
+from .pagination import AppointmentKeysetPagination
 from .serializers import (
     ServiceCategorySerializer,
     ServiceSerializer,
@@ -37,6 +48,19 @@ from ..services.user_service.user_service import UserService
 from ..services.appointment_service.appointment_service import (
     AppointmentService)
 from ..services.service_catalog.service_catalog import ServiceCatalog
+from ..services.service_catalog.search_index import (
+    SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT, ServiceSearch)
+from ..services.service_catalog.sto_info_cache import STOInfoCache
+from ..services.service_catalog.catalog_cache import (
+    CATALOG_CATEGORIES, CATALOG_FEATURED, CATALOG_SERVICES, CATALOG_TREE,
+    CatalogCache)
+from ..services.availability_service.availability_service import (
+    AvailabilityService, DEFAULT_WINDOW_DAYS, MAX_WINDOW_DAYS,
+    MIN_SLOT_STEP_MINUTES, MAX_SLOT_STEP_MINUTES, get_slot_step)
+from ..services.availability_service.availability_cache import (
+    AvailabilityCache)
+from ..services.statistics_service.statistics_service import (
+    StatisticsService, TIMESERIES_GRANULARITIES, TIMESERIES_METRICS)
 
 
 def get_language_from_request(request):
@@ -55,16 +79,90 @@ def get_language_from_request(request):
     return 'uk'
 
 
+# Максимальна кількість слотів у відповіді next_available
+MAX_NEXT_AVAILABLE_COUNT = 20
+# Максимальна довжина періоду розкладу (дні)
+MAX_SCHEDULE_DAYS = 62
+# Період часового ряду за замовчуванням та максимальний (дні)
+DEFAULT_TIMESERIES_DAYS = 30
+MAX_TIMESERIES_DAYS = 3 * 366
+
+
 class NoPagination(PageNumberPagination):
     page_size = None
 
 
+class PrerenderedJSONResponse(Response):
+    """Відповідь DRF з уже відрендереним JSON
+
+    Тіло віддається як є, без повторної серіалізації; data декодується
+    з тіла лише на вимогу (наприклад у тестах).
+    """
+
+    def __init__(self, content, **kwargs):
+        self._content_bytes = content
+        super().__init__(**kwargs)
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = json.loads(self._content_bytes)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        self['Content-Type'] = 'application/json'
+        return self._content_bytes
+
+
+def catalog_response(request, section):
+    """Розділ каталогу готовим JSON з кешу з підтримкою умовних запитів"""
+    content, etag, rendered_at = CatalogCache.get_section(
+        get_language_from_request(request), section)
+    return respond_conditionally(
+        request, etag, rendered_at,
+        lambda: PrerenderedJSONResponse(content))
+
+
+def schedule_querysets(view, request):
+    """Дані розкладу за період для умовних GET-запитів
+
+    Лише те, що потрапляє у відповідь: записи періоду, їхні послуги,
+    активні бокси (колонки сітки) та імена клієнтів. У auth_user немає
+    updated_at, тож імена входять у валідатор як значення.
+    """
+    try:
+        start_date, end_date = view.get_schedule_range(request)
+    except (ValueError, OverflowError):
+        return None
+    appointments = Appointment.objects.filter(  # pylint: disable=no-member
+        appointment_date__gte=start_date,
+        appointment_date__lte=end_date)
+    customer_names = list(User.objects.filter(
+        id__in=appointments.values('customer__user_id')
+    ).order_by('id').values_list('id', 'first_name', 'last_name'))
+    return [
+        start_date,
+        end_date,
+        customer_names,
+        appointments,
+        Service.objects.filter(  # pylint: disable=no-member
+            id__in=appointments.values('service_id')),
+        Box.objects.filter(is_active=True),  # pylint: disable=no-member
+    ]
+
+
 class ServiceCategoryViewSet(viewsets.ReadOnlyModelViewSet):
     """API для категорій послуг"""
     queryset = ServiceCategory.objects.all().order_by(
         'order', 'name')  # pylint: disable=no-member
     serializer_class = ServiceCategorySerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = NoPagination
 
     def get_serializer_context(self):
         """Додаємо мову в контекст серіалізатора"""
@@ -72,6 +170,10 @@ class ServiceCategoryViewSet(viewsets.ReadOnlyModelViewSet):
         context['language'] = get_language_from_request(self.request)
         return context
 
+    def list(self, request, *args, **kwargs):
+        """Список категорій з кешу готового каталогу"""
+        return catalog_response(request, CATALOG_CATEGORIES)
+
 
 class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
     """API для послуг СТО"""
@@ -92,15 +194,52 @@ class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
         context['language'] = get_language_from_request(self.request)
         return context
 
+    def list(self, request, *args, **kwargs):
+        """Список послуг з кешу готового каталогу"""
+        return catalog_response(request, CATALOG_SERVICES)
+
     @action(detail=False, methods=['get'])
-    def featured(self, _request):
+    def featured(self, request):
         """Отримання рекомендованих послуг для головної сторінки"""
-        featured_services = Service.objects.filter(  # pylint: disable=no-member
-            is_featured=True, is_active=True
-        ).select_related('category').order_by(
-            'category__order', 'category__name', 'name')
-        serializer = self.get_serializer(featured_services, many=True)
-        return Response(serializer.data)
+        return catalog_response(request, CATALOG_FEATURED)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Пошук активних послуг для підказок (параметри q та limit)
+
+        Виконується за індексом у пам'яті процесу без запитів до БД.
+        """
+        try:
+            limit = int(request.query_params.get(
+                'limit', SEARCH_DEFAULT_LIMIT))
+        except ValueError:
+            return Response(
+                {'error': 'limit має бути цілим числом'},
+                status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response(
+                {'error': 'limit має бути додатним'},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        results = ServiceSearch.search(
+            request.query_params.get('q', ''),
+            get_language_from_request(request),
+            min(limit, SEARCH_MAX_LIMIT))
+        return Response(results)
+
+
+class CatalogViewSet(viewsets.ViewSet):
+    """API готового каталогу послуг"""
+    permission_classes = [permissions.AllowAny]
+
+    @action(detail=False, methods=['get'])
+    def tree(self, request):
+        """Категорії з вкладеними активними послугами
+
+        Замінює окремі запити категорій і послуг та їх об'єднання на
+        клієнті.
+        """
+        return catalog_response(request, CATALOG_TREE)
 
 
 class STOInfoViewSet(viewsets.ReadOnlyModelViewSet):
@@ -119,14 +258,23 @@ class STOInfoViewSet(viewsets.ReadOnlyModelViewSet):
         return context
 
     def list(self, request, *args, **kwargs):
-        """Отримання інформації про СТО з підтримкою кешування"""
-        queryset = self.get_queryset()
-        if queryset:
-            serializer = self.get_serializer(queryset[0])
-            return Response(serializer.data)
-        return Response(
-            {'error': 'Інформацію про СТО не знайдено'},
-            status=status.HTTP_404_NOT_FOUND)
+        """Отримання інформації про СТО з підтримкою кешування
+
+        Запис береться з пам'яті процесу, а ETag будується з його версії,
+        тож повторні запити не звертаються до БД.
+        """
+        version, sto_info = STOInfoCache.get_entry()
+        if sto_info is None:
+            return Response(
+                {'error': 'Інформацію про СТО не знайдено'},
+                status=status.HTTP_404_NOT_FOUND)
+
+        etag, _ = compute_validators(
+            [], version, request.get_full_path(),
+            request.META.get('HTTP_ACCEPT_LANGUAGE', ''))
+        return respond_conditionally(
+            request, etag, sto_info.updated_at,
+            lambda: Response(self.get_serializer(sto_info).data))
 
 
 class GuestAppointmentViewSet(viewsets.ModelViewSet):
@@ -585,11 +733,26 @@ class BoxViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Фільтрація боксів за активністю"""
-        return Box.objects.filter(is_active=True)
+        queryset = Box.objects.filter(is_active=True)
+        if self.action == 'list':
+            # Для списку назви та описи лише мовою запиту
+            queryset = with_language(
+                queryset, get_language_from_request(self.request))
+        return queryset
+
+    def get_serializer_context(self):
+        """Додаємо мову в контекст серіалізатора"""
+        context = super().get_serializer_context()
+        context['language'] = get_language_from_request(self.request)
+        return context
 
     @action(detail=False, methods=['get'])
     def available_boxes(self, request):
-        """Отримання доступних боксів на конкретну дату та час"""
+        """Отримання доступних боксів на конкретну дату та час
+
+        Бокс доступний, якщо послуга (service_id, за замовчуванням 60 хв)
+        вміщується в його робочий час і не перекривається з записами.
+        """
         date_str = request.query_params.get('date')
         time_str = request.query_params.get('time')
         if not date_str or not time_str:
@@ -603,17 +766,19 @@ class BoxViewSet(viewsets.ModelViewSet):
             return Response(
                 {'error': 'Неправильний формат дати або часу'},
                 status=status.HTTP_400_BAD_REQUEST)
-        available_boxes = []
-        for box in Box.objects.filter(is_active=True):
-            if box.is_available_at_time(appointment_date, appointment_time):
-                conflicting_appointments = Appointment.objects.filter(
-                    box=box,
-                    appointment_date=appointment_date,
-                    appointment_time=appointment_time,
-                    status__in=['pending', 'confirmed', 'in_progress']
-                )
-                if not conflicting_appointments.exists():
-                    available_boxes.append(box)
+        duration_minutes = Appointment.DEFAULT_DURATION_MINUTES
+        service_id = request.query_params.get('service_id')
+        if service_id:
+            try:
+                duration_minutes = Service.objects.get(  # pylint: disable=no-member
+                    id=service_id).duration_minutes or duration_minutes
+            except Service.DoesNotExist:  # pylint: disable=no-member
+                return Response(
+                    {'error': 'Послуга не знайдена'},
+                    status=status.HTTP_404_NOT_FOUND)
+
+        available_boxes = AvailabilityService.get_available_boxes(
+            appointment_date, appointment_time, duration_minutes)
         serializer = BoxSerializer(available_boxes, many=True)
         return Response(serializer.data)
 
@@ -621,10 +786,8 @@ class BoxViewSet(viewsets.ModelViewSet):
         detail=False, methods=['get'],
         permission_classes=[permissions.AllowAny])
     def available_dates(self, request):
-        """Отримання доступних дат на наступні 30 днів
+        """Отримання доступних дат на наступні N днів (за замовчуванням 30)
         з урахуванням робочих годин боксів та тривалості послуги"""
-        from datetime import timedelta
-
         service_id = request.query_params.get('service_id')
         exclude_appointment_id = request.query_params.get(
             'exclude_appointment_id')
@@ -633,91 +796,149 @@ class BoxViewSet(viewsets.ModelViewSet):
             return Response(
                 {'error': 'Потрібно вказати service_id'}, status=400)
 
+        try:
+            days = int(request.query_params.get('days', DEFAULT_WINDOW_DAYS))
+        except ValueError:
+            return Response(
+                {'error': 'Параметр days має бути числом'}, status=400)
+        if not 1 <= days <= MAX_WINDOW_DAYS:
+            return Response(
+                {'error': f'Параметр days має бути від 1 до {MAX_WINDOW_DAYS}'},
+                status=400)
+
         try:
             service = Service.objects.get(
                 id=service_id)  # pylint: disable=no-member
         except Service.DoesNotExist:  # pylint: disable=no-member
             return Response({'error': 'Послуга не знайдена'}, status=404)
 
-        available_dates = []
-        today = datetime.now().date()
-        service_duration_minutes = service.duration_minutes or 60
-
-        for i in range(30):
-            check_date = today + timedelta(days=i)
-            day_name = check_date.strftime('%A').lower()
-
-            # Перевіряємо чи є хоча б один активний бокс
-            # з вільним часом на цю дату
-            active_boxes = Box.objects.filter(is_active=True)
-            for box in active_boxes:
-                working_hours = box.get_working_hours_for_day(day_name)
-                start = working_hours.get('start')
-                end = working_hours.get('end')
-                if working_hours and start != '00:00' and end != '00:00':
-                    start_time = working_hours.get('start', '09:00')
-                    end_time = working_hours.get('end', '18:00')
-
-                    # Конвертуємо час в хвилини для обчислень
-                    start_minutes = int(start_time.split(
-                        ':')[0]) * 60 + int(start_time.split(':')[1])
-                    end_minutes = int(end_time.split(
-                        ':')[0]) * 60 + int(end_time.split(':')[1])
-
-                    # Перевіряємо чи є хоча б один вільний часовий слот
-                    current_minutes = start_minutes
-                    has_available_slot = False
-
-                    while current_minutes + service_duration_minutes <= end_minutes:
-                        hours = current_minutes // 60
-                        mins = current_minutes % 60
-                        time_slot = f"{hours:02d}:{mins:02d}"
-
-                        # Перевіряємо перекриття з існуючими записами
-                        start_time_obj = datetime.strptime(
-                            time_slot, '%H:%M').time()
-                        slot_start_minutes = start_time_obj.hour * 60 + start_time_obj.minute
-                        slot_end_minutes = slot_start_minutes + service_duration_minutes
-
-                        # Знаходимо всі записи для цього бокса на цю дату
-                        existing_appointments = Appointment.objects.filter(
-                            box=box,
-                            appointment_date=check_date,
-                            status__in=['pending', 'confirmed', 'in_progress']
-                        )
-
-                        # Виключаємо поточний запис при редагуванні
-                        if exclude_appointment_id:
-                            existing_appointments = existing_appointments.exclude(
-                                id=exclude_appointment_id)
-
-                        has_conflict = False
-                        for appointment in existing_appointments:
-                            appointment_start = appointment.appointment_time
-                            appointment_start_minutes = (
-                                appointment_start.hour * 60 +
-                                appointment_start.minute)
-                            appointment_end_minutes = appointment_start_minutes + \
-                                (appointment.service.duration_minutes or 60)
-
-                            # Перевіряємо чи перекриваються часові проміжки
-                            if (slot_start_minutes < appointment_end_minutes and
-                                    slot_end_minutes > appointment_start_minutes):
-                                has_conflict = True
-                                break
-
-                        if not has_conflict:
-                            has_available_slot = True
-                            break
-
-                        current_minutes += 30  # Крок 30 хвилин
-
-                    if has_available_slot:
-                        available_dates.append(check_date.strftime('%Y-%m-%d'))
-                        break
+        available_dates = AvailabilityCache.get_available_dates(
+            datetime.now().date(),
+            days,
+            service.duration_minutes,
+            exclude_appointment_id)
 
         return Response({'available_dates': available_dates})
 
+    @action(
+        detail=False, methods=['get'],
+        permission_classes=[permissions.AllowAny])
+    def availability_matrix(self, request):
+        """Вільні часи для кожної дати діапазону одним запитом
+
+        Параметри: service_id (обов'язковий), from та to (YYYY-MM-DD,
+        за замовчуванням - наступні 30 днів), step (крок слотів у
+        хвилинах), include_boxes (1 - додати бокс, який буде призначено
+        для кожного часу), exclude_appointment_id.
+        """
+        service_id = request.query_params.get('service_id')
+        exclude_appointment_id = request.query_params.get(
+            'exclude_appointment_id')
+        include_boxes = request.query_params.get(
+            'include_boxes', '').lower() in ('1', 'true', 'yes')
+
+        if not service_id:
+            return Response(
+                {'error': 'Потрібно вказати service_id'}, status=400)
+
+        try:
+            date_from_str = request.query_params.get('from')
+            date_to_str = request.query_params.get('to')
+            date_from = (
+                datetime.strptime(date_from_str, '%Y-%m-%d').date()
+                if date_from_str else datetime.now().date())
+            date_to = (
+                datetime.strptime(date_to_str, '%Y-%m-%d').date()
+                if date_to_str
+                else date_from + timedelta(days=DEFAULT_WINDOW_DAYS - 1))
+        except ValueError:
+            return Response({'error': 'Неправильний формат дати'}, status=400)
+
+        days = (date_to - date_from).days + 1
+        if not 1 <= days <= MAX_WINDOW_DAYS:
+            return Response(
+                {'error': (
+                    f'Діапазон має містити від 1 до {MAX_WINDOW_DAYS} днів')},
+                status=400)
+
+        try:
+            step_minutes = int(request.query_params.get(
+                'step', get_slot_step()))
+        except ValueError:
+            return Response(
+                {'error': 'Параметр step має бути числом'}, status=400)
+        if not MIN_SLOT_STEP_MINUTES <= step_minutes <= MAX_SLOT_STEP_MINUTES:
+            return Response(
+                {'error': (
+                    f'Параметр step має бути від {MIN_SLOT_STEP_MINUTES} '
+                    f'до {MAX_SLOT_STEP_MINUTES} хвилин')},
+                status=400)
+
+        try:
+            service = Service.objects.get(
+                id=service_id)  # pylint: disable=no-member
+        except Service.DoesNotExist:  # pylint: disable=no-member
+            return Response({'error': 'Послуга не знайдена'}, status=404)
+
+        matrix = AvailabilityCache.get_availability_matrix(
+            date_from,
+            date_to,
+            service.duration_minutes,
+            step_minutes,
+            include_boxes,
+            exclude_appointment_id)
+
+        return Response({
+            'service_id': service.id,
+            'from': date_from.strftime('%Y-%m-%d'),
+            'to': date_to.strftime('%Y-%m-%d'),
+            'step_minutes': step_minutes,
+            'dates': matrix,
+        })
+
+    @action(
+        detail=False, methods=['get'],
+        permission_classes=[permissions.AllowAny])
+    def next_available(self, request):
+        """Найближчі вільні слоти для послуги починаючи з поточного часу
+
+        Параметри: service_id (обов'язковий), count (кількість слотів,
+        за замовчуванням 1), exclude_appointment_id.
+        """
+        service_id = request.query_params.get('service_id')
+        exclude_appointment_id = request.query_params.get(
+            'exclude_appointment_id')
+
+        if not service_id:
+            return Response(
+                {'error': 'Потрібно вказати service_id'}, status=400)
+
+        try:
+            count = int(request.query_params.get('count', 1))
+        except ValueError:
+            return Response(
+                {'error': 'Параметр count має бути числом'}, status=400)
+        if not 1 <= count <= MAX_NEXT_AVAILABLE_COUNT:
+            return Response(
+                {'error': (
+                    'Параметр count має бути від 1 до '
+                    f'{MAX_NEXT_AVAILABLE_COUNT}')},
+                status=400)
+
+        try:
+            service = Service.objects.get(
+                id=service_id)  # pylint: disable=no-member
+        except Service.DoesNotExist:  # pylint: disable=no-member
+            return Response({'error': 'Послуга не знайдена'}, status=404)
+
+        slots = AvailabilityService.find_next_available(
+            timezone.localtime().replace(tzinfo=None),
+            service.duration_minutes,
+            count,
+            exclude_appointment_id=exclude_appointment_id)
+
+        return Response({'service_id': service.id, 'slots': slots})
+
     @action(
         detail=False, methods=['get'],
         permission_classes=[permissions.AllowAny])
@@ -736,77 +957,10 @@ class BoxViewSet(viewsets.ModelViewSet):
             appointment_date = datetime.strptime(date_str, '%Y-%m-%d').date()
             service = Service.objects.get(id=service_id)
 
-            # Отримуємо день тижня
-            day_name = appointment_date.strftime('%A').lower()
-
-            # Знаходимо активні бокси
-            active_boxes = Box.objects.filter(is_active=True)
-            available_times = []
-
-            for box in active_boxes:
-                working_hours = box.get_working_hours_for_day(day_name)
-                start = working_hours.get('start')
-                end = working_hours.get('end')
-                if working_hours and start != '00:00' and end != '00:00':
-                    start_time = working_hours.get('start', '09:00')
-                    end_time = working_hours.get('end', '18:00')
-
-                    # Конвертуємо час в хвилини для обчислень
-                    start_minutes = int(start_time.split(
-                        ':')[0]) * 60 + int(start_time.split(':')[1])
-                    end_minutes = int(end_time.split(
-                        ':')[0]) * 60 + int(end_time.split(':')[1])
-                    service_duration_minutes = service.duration_minutes or 60
-
-                    # Генеруємо часові слоти з урахуванням тривалості послуги
-                    current_minutes = start_minutes
-                    while current_minutes + service_duration_minutes <= end_minutes:
-                        hours = current_minutes // 60
-                        mins = current_minutes % 60
-                        time_slot = f"{hours:02d}:{mins:02d}"
-
-                        # Перевіряємо перекриття з існуючими записами
-                        start_time_obj = datetime.strptime(
-                            time_slot, '%H:%M').time()
-                        slot_start_minutes = start_time_obj.hour * 60 + start_time_obj.minute
-                        slot_end_minutes = slot_start_minutes + service_duration_minutes
-
-                        # Знаходимо всі записи для цього бокса на цю дату
-                        existing_appointments = Appointment.objects.filter(
-                            box=box,
-                            appointment_date=appointment_date,
-                            status__in=['pending', 'confirmed', 'in_progress']
-                        )
-
-                        # Виключаємо поточний запис при редагуванні
-                        if exclude_appointment_id:
-                            existing_appointments = existing_appointments.exclude(
-                                id=exclude_appointment_id)
-
-                        has_conflict = False
-                        for appointment in existing_appointments:
-                            appointment_start = appointment.appointment_time
-                            appointment_start_minutes = (
-                                appointment_start.hour * 60 +
-                                appointment_start.minute)
-                            appointment_end_minutes = appointment_start_minutes + \
-                                (appointment.service.duration_minutes or 60)
-
-                            # Перевіряємо чи перекриваються часові проміжки
-                            # Новий слот не повинен починатися під час виконання існуючого запису
-                            # і не повинен закінчуватися після початку існуючого запису
-                            if (slot_start_minutes < appointment_end_minutes and
-                                    slot_end_minutes > appointment_start_minutes):
-                                has_conflict = True
-                                break
-
-                        if not has_conflict:
-                            available_times.append(time_slot)
-
-                        current_minutes += 30  # Крок 30 хвилин
-
-            # Видаляємо дублікати та сортуємо
-            available_times = sorted(list(set(available_times)))
+            available_times = AvailabilityCache.get_available_times(
+                appointment_date,
+                service.duration_minutes,
+                exclude_appointment_id)
 
             return Response({'available_times': available_times})
 
@@ -845,56 +999,130 @@ class AdminViewSet(viewsets.ViewSet):
             return {'language': 'uk'}
 
     @action(detail=False, methods=['get'])
-    def statistics(self, _request):
-        """Отримання статистики"""
-        from datetime import timedelta
+    def statistics(self, request):
+        """Отримання статистики
+
+        Повертає кешований знімок; ?fresh=1 перераховує його.
+        """
+        fresh = request.query_params.get('fresh') in ('1', 'true')
+        return Response(StatisticsService.get_dashboard(fresh=fresh))
+
+    @action(detail=False, methods=['get'])
+    def timeseries(self, request):
+        """Часовий ряд доходу або кількості записів для графіків
+
+        Параметри: metric (revenue|appointments), granularity
+        (day|week|month), from, to (YYYY-MM-DD), box_id, service_id.
+        """
+        metric = request.query_params.get('metric', 'revenue')
+        granularity = request.query_params.get('granularity', 'day')
+        if metric not in TIMESERIES_METRICS:
+            return Response(
+                {'error': 'Параметр metric має бути revenue або appointments'},
+                status=status.HTTP_400_BAD_REQUEST)
+        if granularity not in TIMESERIES_GRANULARITIES:
+            return Response(
+                {'error': 'Параметр granularity має бути day, week або month'},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            date_to = request.query_params.get('to')
+            date_to = (
+                datetime.strptime(date_to, '%Y-%m-%d').date() if date_to
+                else timezone.now().date())
+            date_from = request.query_params.get('from')
+            date_from = (
+                datetime.strptime(date_from, '%Y-%m-%d').date() if date_from
+                else date_to - timedelta(days=DEFAULT_TIMESERIES_DAYS - 1))
+            box_id = request.query_params.get('box_id')
+            box_id = int(box_id) if box_id else None
+            service_id = request.query_params.get('service_id')
+            service_id = int(service_id) if service_id else None
+        except ValueError:
+            return Response(
+                {'error': 'Неправильний формат параметрів'},
+                status=status.HTTP_400_BAD_REQUEST)
 
+        if date_from > date_to:
+            return Response(
+                {'error': 'Дата from не може бути пізніше за to'},
+                status=status.HTTP_400_BAD_REQUEST)
+        if (date_to - date_from).days >= MAX_TIMESERIES_DAYS:
+            return Response(
+                {'error': (
+                    'Період не може перевищувати '
+                    f'{MAX_TIMESERIES_DAYS} днів')},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        buckets = StatisticsService.get_timeseries(
+            metric, granularity, date_from, date_to, box_id, service_id)
+        return Response({
+            'metric': metric,
+            'granularity': granularity,
+            'from': date_from.isoformat(),
+            'to': date_to.isoformat(),
+            'buckets': buckets,
+        })
+
+    @staticmethod
+    def get_schedule_range(request):
+        """Період розкладу з параметрів start/end або week_offset"""
+        start_str = request.query_params.get('start')
+        end_str = request.query_params.get('end')
+        if start_str:
+            start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+            end_date = (
+                datetime.strptime(end_str, '%Y-%m-%d').date() if end_str
+                else start_date + timedelta(days=6))
+            return start_date, end_date
+
+        week_offset = int(request.query_params.get('week_offset', 0))
         today = timezone.now().date()
-        month_ago = today - timedelta(days=30)
-
-        stats = {
-            'total_appointments': Appointment.objects.count(),  # pylint: disable=no-member
-            'pending_appointments': Appointment.objects.filter(  # pylint: disable=no-member
-                status='pending').count(),
-            'completed_appointments': Appointment.objects.filter(  # pylint: disable=no-member
-                status='completed').count(),
-            'total_customers': Customer.objects.count(),  # pylint: disable=no-member
-            'blocked_customers': Customer.objects.filter(  # pylint: disable=no-member
-                is_blocked=True).count(),
-            'total_revenue': Appointment.objects.filter(  # pylint: disable=no-member
-                status='completed'
-            ).aggregate(total=Sum('total_price'))['total'] or 0,
-            'monthly_appointments': Appointment.objects.filter(  # pylint: disable=no-member
-                appointment_date__gte=month_ago
-            ).count(),
-            'services_count': Service.objects.filter(  # pylint: disable=no-member
-                is_active=True).count(),
-            'revenue_today': Appointment.objects.filter(  # pylint: disable=no-member
-                appointment_date=today, status='completed'
-            ).aggregate(total=Sum('total_price'))['total'] or 0
-        }
-        return Response(stats)
+        start_date = (
+            today - timedelta(days=today.weekday()) +
+            timedelta(weeks=week_offset))  # Понеділок
+        return start_date, start_date + timedelta(days=6)  # Неділя
 
     @action(detail=False, methods=['get'])
+    @conditional_get(schedule_querysets, private=True)
     def weekly_schedule(self, request):
-        """Отримання розкладу записів на цей тиждень"""
-        from datetime import timedelta
+        """Отримання розкладу записів на тиждень або довільний період
 
+        Параметри: week_offset (зсув від поточного тижня) або start/end
+        (YYYY-MM-DD). Записи періоду завантажуються одним запитом і
+        групуються по днях і боксах за один прохід, тож кількість
+        запитів не залежить від довжини періоду та кількості боксів.
+        """
         # Отримуємо мову з запиту
         language = get_language_from_request(request)
 
-        today = timezone.now().date()
-        start_of_week = today - timedelta(days=today.weekday())  # Понеділок
-        end_of_week = start_of_week + timedelta(days=6)  # Неділя
+        try:
+            start_date, end_date = self.get_schedule_range(request)
+        except (ValueError, OverflowError):
+            return Response(
+                {'error': 'Неправильний формат параметрів періоду'},
+                status=status.HTTP_400_BAD_REQUEST)
 
-        # Отримуємо записи на цей тиждень
-        weekly_appointments = Appointment.objects.filter(
-            appointment_date__gte=start_of_week,
-            appointment_date__lte=end_of_week
-        ).select_related('customer__user', 'service', 'box').order_by('appointment_date', 'appointment_time')
+        if start_date > end_date:
+            return Response(
+                {'error': 'Дата start не може бути пізніше за end'},
+                status=status.HTTP_400_BAD_REQUEST)
+        if (end_date - start_date).days >= MAX_SCHEDULE_DAYS:
+            return Response(
+                {'error': (
+                    'Період не може перевищувати '
+                    f'{MAX_SCHEDULE_DAYS} днів')},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        # Отримуємо записи за період одним запитом
+        appointments = Appointment.objects.filter(  # pylint: disable=no-member
+            appointment_date__gte=start_date,
+            appointment_date__lte=end_date
+        ).select_related('customer__user', 'service').order_by(
+            'appointment_date', 'appointment_time')
 
         # Отримуємо всі активні бокси
-        active_boxes = Box.objects.filter(is_active=True).order_by('name')
+        active_boxes = list(Box.objects.filter(is_active=True).order_by('name'))
 
         # Словник для перекладу статусів
         status_translations = {
@@ -905,81 +1133,67 @@ class AdminViewSet(viewsets.ViewSet):
             'cancelled_by_admin': {'uk': 'Скасовано адміністратором', 'en': 'Cancelled by administrator'}
         }
 
-        # Групуємо записи по днях і боксах
+        # Словник для перекладу днів тижня
+        day_translations = {
+            'Monday': {'uk': 'Понеділок', 'en': 'Monday'},
+            'Tuesday': {'uk': 'Вівторок', 'en': 'Tuesday'},
+            'Wednesday': {'uk': 'Середа', 'en': 'Wednesday'},
+            'Thursday': {'uk': 'Четвер', 'en': 'Thursday'},
+            'Friday': {'uk': 'П\'ятниця', 'en': 'Friday'},
+            'Saturday': {'uk': 'Субота', 'en': 'Saturday'},
+            'Sunday': {'uk': 'Неділя', 'en': 'Sunday'}
+        }
+
+        # Порожня сітка днів і боксів
         schedule = {}
-        for i in range(7):
-            current_date = start_of_week + timedelta(days=i)
+        for i in range((end_date - start_date).days + 1):
+            current_date = start_date + timedelta(days=i)
             day_name = current_date.strftime('%A')
-
-            # Словник для перекладу днів тижня
-            day_translations = {
-                'Monday': {'uk': 'Понеділок', 'en': 'Monday'},
-                'Tuesday': {'uk': 'Вівторок', 'en': 'Tuesday'},
-                'Wednesday': {'uk': 'Середа', 'en': 'Wednesday'},
-                'Thursday': {'uk': 'Четвер', 'en': 'Thursday'},
-                'Friday': {'uk': 'П\'ятниця', 'en': 'Friday'},
-                'Saturday': {'uk': 'Субота', 'en': 'Saturday'},
-                'Sunday': {'uk': 'Неділя', 'en': 'Sunday'}
-            }
-
-            day_name_translated = day_translations.get(
-                day_name, {}).get(language, day_name)
-
-            day_appointments = weekly_appointments.filter(
-                appointment_date=current_date)
-
-            # Групуємо записи по боксах для цього дня
-            boxes_schedule = {}
-            for box in active_boxes:
-                box_appointments = day_appointments.filter(box=box)
-                boxes_schedule[box.id] = {
-                    'box_id': box.id,
-                    'box_name': box.get_name(language),
-                    'appointments': []
+            schedule[current_date.isoformat()] = {
+                'date': current_date.isoformat(),
+                'day_name': day_translations.get(
+                    day_name, {}).get(language, day_name),
+                'day_short': day_name[:3],
+                'boxes_schedule': {
+                    box.id: {
+                        'box_id': box.id,
+                        'box_name': box.get_name(language),
+                        'appointments': []
+                    }
+                    for box in active_boxes
                 }
+            }
 
-                for appointment in box_appointments:
-                    boxes_schedule[box.id]['appointments'].append({
-                        'id': appointment.id,
-                        'time': appointment.appointment_time.strftime('%H:%M'),
-                        'service_name': appointment.service.get_name(language),
-                        'customer_name': appointment.customer.user.get_full_name() if appointment.customer else appointment.guest_name,
-                        'status': appointment.status,
-                        'status_text': status_translations.get(appointment.status, {}).get(language, appointment.status),
-                        'total_price': float(appointment.total_price)
-                    })
-
-            # Додаємо записи без призначеного бокса
-            unassigned_appointments = day_appointments.filter(box__isnull=True)
-            if unassigned_appointments.exists():
-                unassigned_name = 'Не призначено' if language == 'uk' else 'Not assigned'
-                boxes_schedule['unassigned'] = {
+        # Розкладаємо записи по днях і боксах за один прохід
+        unassigned_name = 'Не призначено' if language == 'uk' else 'Not assigned'
+        for appointment in appointments:
+            boxes_schedule = schedule[
+                appointment.appointment_date.isoformat()]['boxes_schedule']
+            if appointment.box_id is None:
+                box_schedule = boxes_schedule.setdefault('unassigned', {
                     'box_id': 'unassigned',
                     'box_name': unassigned_name,
                     'appointments': []
-                }
-
-                for appointment in unassigned_appointments:
-                    boxes_schedule['unassigned']['appointments'].append({
-                        'id': appointment.id,
-                        'time': appointment.appointment_time.strftime('%H:%M'),
-                        'service_name': appointment.service.get_name(language),
-                        'customer_name': appointment.customer.user.get_full_name() if appointment.customer else appointment.guest_name,
-                        'status': appointment.status,
-                        'status_text': status_translations.get(appointment.status, {}).get(language, appointment.status),
-                        'total_price': float(appointment.total_price)
-                    })
-
-            schedule[current_date.isoformat()] = {
-                'date': current_date.isoformat(),
-                'day_name': day_name_translated,
-                'day_short': day_name[:3],
-                'boxes_schedule': boxes_schedule
-            }
+                })
+            elif appointment.box_id in boxes_schedule:
+                box_schedule = boxes_schedule[appointment.box_id]
+            else:
+                # Записи неактивних боксів не показуються
+                continue
+
+            box_schedule['appointments'].append({
+                'id': appointment.id,
+                'time': appointment.appointment_time.strftime('%H:%M'),
+                'service_name': appointment.service.get_name(language),
+                'customer_name': appointment.customer.user.get_full_name() if appointment.customer else appointment.guest_name,
+                'status': appointment.status,
+                'status_text': status_translations.get(appointment.status, {}).get(language, appointment.status),
+                'total_price': float(appointment.total_price)
+            })
 
         return Response({
-            'week_start': start_of_week.isoformat(),
-            'week_end': end_of_week.isoformat(),
+            'week_start': start_date.isoformat(),
+            'week_end': end_date.isoformat(),
             'schedule': schedule,
             'boxes': [{'id': box.id, 'name': box.get_name(language)} for box in active_boxes]
         })
@@ -992,6 +1206,23 @@ class AdminViewSet(viewsets.ViewSet):
         serializer = CustomerSerializer(customers, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'],
+            url_path='customer_management/export',
+            renderer_classes=[JSONRenderer, CSVRenderer, NDJSONRenderer])
+    def customer_management_export(self, request):
+        """Потокове вивантаження клієнтів у CSV або NDJSON"""
+        try:
+            export_format = get_export_format(request)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = customer_rows(
+            Customer.objects.order_by('id'))  # pylint: disable=no-member
+        return streaming_export(
+            rows, export_format,
+            f"customers-{timezone.localdate().strftime('%Y%m%d')}")
+
     @action(detail=True, methods=['post'])
     def block_customer(self, _request, pk=None):
         """Блокування клієнта"""
@@ -1010,10 +1241,11 @@ class AdminViewSet(viewsets.ViewSet):
 
     # Управління послугами
     @action(detail=False, methods=['get'])
-    def services_management(self, _request):
+    def services_management(self, request):
         """Отримання списку всіх послуг для управління"""
-        services = Service.objects.select_related(
-            'category').all()  # pylint: disable=no-member
+        services = with_language(
+            Service.objects.select_related('category'),  # pylint: disable=no-member
+            get_language_from_request(request))
         context = self.get_serializer_context()
         serializer = ServiceListSerializer(
             services, many=True, context=context)
@@ -1054,7 +1286,10 @@ class AdminViewSet(viewsets.ViewSet):
             serializer = ServiceSerializer(
                 service, data=request.data, partial=True, context=context)
             if serializer.is_valid():
-                serializer.save()
+                # Нова тривалість перераховує інтервали записів послуги;
+                # якщо вони перекриваються, зміна відкочується повністю
+                with transaction.atomic():
+                    serializer.save()
                 return Response(serializer.data)
             return Response(
                 serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -1062,6 +1297,11 @@ class AdminViewSet(viewsets.ViewSet):
             return Response(
                 {'error': 'Послугу не знайдено'},
                 status=status.HTTP_404_NOT_FOUND)
+        except IntegrityError:
+            return Response(
+                {'error': 'З новою тривалістю записи послуги перекриваються '
+                          'в боксі'},
+                status=status.HTTP_409_CONFLICT)
 
     @action(detail=True, methods=['delete'])
     def delete_service(self, _request, pk=None):
@@ -1310,9 +1550,12 @@ class AdminViewSet(viewsets.ViewSet):
                 {'error': 'Послугу не знайдено'},
                 status=status.HTTP_404_NOT_FOUND)
 
-    @action(detail=False, methods=['get'])
-    def appointments(self, request):
-        """Отримання списку бронювань з фільтрами для адміністратора"""
+    @staticmethod
+    def filter_appointments(request):
+        """Записи з фільтрами адміністратора з параметрів запиту
+
+        Спільний для списку записів та їх експорту.
+        """
         # Отримуємо параметри фільтрів
         date_from = request.query_params.get('date_from')
         date_to = request.query_params.get('date_to')
@@ -1326,9 +1569,8 @@ class AdminViewSet(viewsets.ViewSet):
         price_max = request.query_params.get('price_max')
 
         # Початковий queryset
-        queryset = Appointment.objects.select_related(
-            'customer__user', 'service', 'box'
-        ).order_by('-appointment_date', '-appointment_time')
+        queryset = Appointment.objects.order_by(  # pylint: disable=no-member
+            '-appointment_date', '-appointment_time')
 
         # Застосовуємо фільтри
         if date_from:
@@ -1346,13 +1588,10 @@ class AdminViewSet(viewsets.ViewSet):
         if appointment_status:
             queryset = queryset.filter(status=appointment_status)
 
-        # Фільтр по імені клієнта
+        # Фільтр по імені клієнта (нормалізоване поле search_name)
         if customer_name:
-            queryset = queryset.filter(
-                Q(customer__user__first_name__icontains=customer_name) |
-                Q(customer__user__last_name__icontains=customer_name) |
-                Q(guest_name__icontains=customer_name)
-            )
+            queryset = AppointmentService.search_by_name(
+                queryset, customer_name)
 
         # Фільтр по часу
         if time_from:
@@ -1368,11 +1607,57 @@ class AdminViewSet(viewsets.ViewSet):
         if price_max:
             queryset = queryset.filter(total_price__lte=price_max)
 
-        # Серіалізуємо результати
-        serializer = AppointmentSerializer(
-            queryset, many=True, context=self.get_serializer_context())
+        return queryset
 
-        return Response(serializer.data)
+    @action(detail=False, methods=['get'])
+    def appointments(self, request):
+        """Отримання списку бронювань з фільтрами для адміністратора
+
+        Повертає сторінку (keyset-пагінація за датою, часом та id) з
+        next_cursor, посиланням next і загальною кількістю. Розмір сторінки
+        задає page_size (за замовчуванням ADMIN_APPOINTMENTS_PAGE_SIZE),
+        параметр count (estimate, exact, none) керує підрахунком. Пошук
+        за customer_name зберігає сортування за релевантністю на всіх
+        сторінках.
+        """
+        queryset = self.filter_appointments(request).select_related(
+            'customer__user', 'service', 'box')
+
+        try:
+            page, meta = AppointmentKeysetPagination().paginate(
+                queryset, request)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = AppointmentSerializer(
+            page, many=True, context=self.get_serializer_context())
+        meta['next'] = (
+            request.build_absolute_uri(replace_query_param(
+                request.get_full_path(), 'cursor', meta['next_cursor']))
+            if meta['next_cursor'] else None)
+        return Response({**meta, 'results': serializer.data})
+
+    @action(detail=False, methods=['get'], url_path='appointments/export',
+            renderer_classes=[JSONRenderer, CSVRenderer, NDJSONRenderer])
+    def appointments_export(self, request):
+        """Потокове вивантаження записів у CSV або NDJSON
+
+        Приймає ті самі фільтри, що й список записів; format - csv (за
+        замовчуванням) або ndjson.
+        """
+        try:
+            export_format = get_export_format(request)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = appointment_rows(
+            self.filter_appointments(request),
+            get_language_from_request(request))
+        return streaming_export(
+            rows, export_format,
+            f"appointments-{timezone.localdate().strftime('%Y%m%d')}")
 
     @action(detail=True, methods=['post'])
     def cancel_appointment(self, _request, pk=None):
@@ -2,8 +2,11 @@
 
 from datetime import datetime
 
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, F, FloatField, Func, Value, When
+from django.db.models.functions import Cast
 from django.utils import timezone
-from ...api.models import Appointment, Box
+from ...api.models import Appointment, Box, normalize_search_text
 from ...api.data_access import DataAccessLayer
 
 
@@ -27,10 +30,10 @@ class AppointmentService:
             appointment_time = datetime.strptime(
                 data['appointment_time'], '%H:%M').time()
 
-            # Знаходимо вільний бокс
-            available_box = AppointmentService._find_available_box(
+            # Знаходимо вільні бокси
+            available_boxes = AppointmentService._find_available_boxes(
                 appointment_date, appointment_time, service)
-            if not available_box:
+            if not available_boxes:
                 return {
                     'success': False,
                     'error': (
@@ -75,18 +78,31 @@ class AppointmentService:
                     f"{original_price}"
                 )
 
-            appointment = DataAccessLayer.create_appointment(
-                customer=user.customer if user else None,
-                guest_name=data.get('guest_name', ''),
-                guest_phone=data.get('guest_phone', ''),
-                guest_email=data.get('guest_email', ''),
-                service=service,
-                box=available_box,
-                appointment_date=appointment_date,
-                appointment_time=appointment_time,
-                notes=data.get('notes', ''),
-                total_price=final_price
-            )
+            def create_in_box(box):
+                return DataAccessLayer.create_appointment(
+                    customer=user.customer if user else None,
+                    guest_name=data.get('guest_name', ''),
+                    guest_phone=data.get('guest_phone', ''),
+                    guest_email=data.get('guest_email', ''),
+                    service=service,
+                    box=box,
+                    appointment_date=appointment_date,
+                    appointment_time=appointment_time,
+                    notes=data.get('notes', ''),
+                    total_price=final_price
+                )
+
+            appointment = AppointmentService._save_in_first_free_box(
+                available_boxes, appointment_date, appointment_time,
+                service, create_in_box)
+            if not appointment:
+                return {
+                    'success': False,
+                    'error': (
+                        'На цей час немає доступних боксів. '
+                        'Спробуйте інший час або дату.'
+                    )
+                }
 
             return {
                 'success': True,
@@ -203,15 +219,36 @@ class AppointmentService:
             )
 
             if date_or_time_changed:
-                # Знаходимо новий вільний бокс
-                available_box = AppointmentService._find_available_box(
+                # Знаходимо нові вільні бокси
+                available_boxes = AppointmentService._find_available_boxes(
                     new_appointment_date,
                     new_appointment_time,
                     service,
                     appointment_id,
                 )
 
-                if not available_box:
+                def move_to_box(box):
+                    return DataAccessLayer.update_appointment_by_id(
+                        appointment_id=appointment_id,
+                        service=service,
+                        box=box,
+                        appointment_date=new_appointment_date,
+                        appointment_time=new_appointment_time,
+                        guest_name=data.get('guest_name', ''),
+                        guest_phone=data.get('guest_phone', ''),
+                        guest_email=data.get('guest_email', ''),
+                        notes=data.get('notes', ''),
+                        total_price=final_price
+                    )
+
+                # Оновлюємо запис з новим боксом
+                updated_appointment = (
+                    AppointmentService._save_in_first_free_box(
+                        available_boxes, new_appointment_date,
+                        new_appointment_time, service, move_to_box,
+                        appointment_id))
+
+                if not updated_appointment:
                     return {
                         'success': False,
                         'error': (
@@ -219,20 +256,6 @@ class AppointmentService:
                             'Спробуйте інший час або дату.'
                         )
                     }
-
-                # Оновлюємо запис з новим боксом
-                updated_appointment = DataAccessLayer.update_appointment_by_id(
-                    appointment_id=appointment_id,
-                    service=service,
-                    box=available_box,
-                    appointment_date=new_appointment_date,
-                    appointment_time=new_appointment_time,
-                    guest_name=data.get('guest_name', ''),
-                    guest_phone=data.get('guest_phone', ''),
-                    guest_email=data.get('guest_email', ''),
-                    notes=data.get('notes', ''),
-                    total_price=final_price
-                )
             else:
                 # Оновлюємо тільки інші поля без зміни бокса
                 updated_appointment = DataAccessLayer.update_appointment_by_id(
@@ -258,65 +281,114 @@ class AppointmentService:
                 'error': str(e)
             }
 
+    @staticmethod
+    def _find_available_boxes(
+            appointment_date, appointment_time, service=None,
+            exclude_appointment_id=None):
+        """Список вільних боксів (у порядку перебору) для заданої дати
+        та часу з урахуванням тривалості послуги"""
+        # Тривалість послуги для перевірки графіку та перекриттів
+        if service:
+            service_duration_minutes = service.duration_minutes
+        else:
+            service_duration_minutes = 60
+
+        # Отримуємо активні бокси, в графік яких вміщується послуга
+        candidate_boxes = [
+            box for box in Box.objects.filter(  # pylint: disable=no-member
+                is_active=True)
+            if box.is_available_at_time(
+                appointment_date, appointment_time, service_duration_minutes)
+        ]
+        if not candidate_boxes:
+            return []
+
+        # Бокси з записами, що перекривають інтервал (один запит по
+        # індексу на часовий інтервал)
+        start_at, end_at = Appointment.compute_time_range(
+            appointment_date, appointment_time, service_duration_minutes)
+        conflicts = Appointment.objects.filter(  # pylint: disable=no-member
+            box__in=candidate_boxes,
+            status__in=Appointment.ACTIVE_STATUSES,
+            start_at__lt=end_at,
+            end_at__gt=start_at
+        )
+
+        # Виключаємо поточний запис при редагуванні
+        if exclude_appointment_id:
+            conflicts = conflicts.exclude(id=exclude_appointment_id)
+
+        busy_box_ids = set(conflicts.values_list('box_id', flat=True))
+        return [box for box in candidate_boxes if box.id not in busy_box_ids]
+
     @staticmethod
     def _find_available_box(
             appointment_date, appointment_time, service=None,
             exclude_appointment_id=None):
         """Знаходження доступного боксу для заданої дати та часу
         з урахуванням тривалості послуги"""
-        # Отримуємо активні бокси
-        active_boxes = Box.objects.filter(
-            is_active=True)  # pylint: disable=no-member
-
-        for box in active_boxes:
-            # Перевіряємо чи бокс працює в цей час
-            if not box.is_available_at_time(
-                    appointment_date, appointment_time):
-                continue
+        available_boxes = AppointmentService._find_available_boxes(
+            appointment_date, appointment_time, service,
+            exclude_appointment_id)
+        return available_boxes[0] if available_boxes else None
 
-            # Перевіряємо перекриття з існуючими записами
-            if service:
-                service_duration_minutes = service.duration_minutes
-            else:
-                service_duration_minutes = 60
-
-            # Конвертуємо час в хвилини
-            start_time_obj = appointment_time
-            slot_start_minutes = (
-                start_time_obj.hour * 60 + start_time_obj.minute)
-            slot_end_minutes = slot_start_minutes + service_duration_minutes
-
-            # Знаходимо всі записи для цього бокса на цю дату
-            existing_appointments = Appointment.objects.filter(  # pylint: disable=no-member
-                box=box,
-                appointment_date=appointment_date,
-                status__in=['pending', 'confirmed', 'in_progress']
-            )
+    @staticmethod
+    def _lock_box_day(box, appointment_date):
+        """Блокування пари (бокс, дата) до кінця поточної транзакції
+
+        У PostgreSQL використовується транзакційний advisory lock, тож
+        записи в інші бокси чи на інші дні не чекають один на одного.
+        На інших СУБД блокується рядок боксу через select_for_update.
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_advisory_xact_lock(%s, %s)',
+                    [box.id, appointment_date.toordinal()])
+        else:
+            list(Box.objects.select_for_update().filter(  # pylint: disable=no-member
+                id=box.id).values_list('id', flat=True))
 
-            # Виключаємо поточний запис при редагуванні
-            if exclude_appointment_id:
-                existing_appointments = existing_appointments.exclude(
-                    id=exclude_appointment_id)
-
-            has_conflict = False
-            for appointment in existing_appointments:
-                appointment_start = appointment.appointment_time
-                appointment_start_minutes = (
-                    appointment_start.hour * 60 +
-                    appointment_start.minute)
-                duration = appointment.service.duration_minutes or 60
-                appointment_end_minutes = (
-                    appointment_start_minutes + duration)
-
-                # Перевіряємо чи перекриваються часові проміжки
-                if (slot_start_minutes < appointment_end_minutes and
-                        slot_end_minutes > appointment_start_minutes):
-                    has_conflict = True
-                    break
-
-            if not has_conflict:
-                return box
+    @staticmethod
+    def _has_conflict(box, start_at, end_at, exclude_appointment_id=None):
+        """Чи є в боксі активний запис, що перекриває інтервал"""
+        conflicts = Appointment.objects.filter(  # pylint: disable=no-member
+            box=box,
+            status__in=Appointment.ACTIVE_STATUSES,
+            start_at__lt=end_at,
+            end_at__gt=start_at
+        )
+        if exclude_appointment_id:
+            conflicts = conflicts.exclude(id=exclude_appointment_id)
+        return conflicts.exists()
 
+    @staticmethod
+    def _save_in_first_free_box(
+            boxes, appointment_date, appointment_time, service, save_func,
+            exclude_appointment_id=None):
+        """Збереження запису в першому вільному боксі
+
+        Кожна спроба виконується в окремій транзакції під блокуванням
+        (бокс, дата): перевірка перекриття повторюється вже під
+        блокуванням, тож одночасні записи на той самий слот
+        серіалізуються, а на різні бокси чи дні йдуть паралельно.
+        Обмеження БД на перекриття лишається останньою лінією захисту:
+        при його порушенні переходимо до наступного боксу.
+        """
+        start_at, end_at = Appointment.compute_time_range(
+            appointment_date, appointment_time,
+            service.duration_minutes if service else None)
+
+        for box in boxes:
+            try:
+                with transaction.atomic():
+                    AppointmentService._lock_box_day(box, appointment_date)
+                    if AppointmentService._has_conflict(
+                            box, start_at, end_at, exclude_appointment_id):
+                        continue
+                    return save_func(box)
+            except IntegrityError:
+                continue
         return None
 
     @staticmethod
@@ -324,6 +396,37 @@ class AppointmentService:
         """Отримання записів користувача"""
         return DataAccessLayer.get_appointments_by_user(user)
 
+    @staticmethod
+    def search_by_name(queryset, term):
+        """Фільтр записів за ім'ям клієнта або гостя з ранжуванням
+
+        Шукає підрядок у нормалізованому полі search_name (у PostgreSQL -
+        по триграмному GIN-індексу) і додає анотацію search_rank: схожість
+        word_similarity з pg_trgm, а на інших СУБД - спрощений ранг (збіг
+        з початку імені або слова). Результат відсортовано за рангом,
+        потім за датою.
+        """
+        term = normalize_search_text(term)
+        if not term:
+            return queryset
+
+        if connection.vendor == 'postgresql':
+            # word_similarity повертає real; приведення до double precision
+            # потрібне, щоб ранг з курсора пагінації порівнювався точно
+            rank = Cast(Func(
+                Value(term), F('search_name'), function='word_similarity',
+                output_field=FloatField()), FloatField())
+        else:
+            rank = Case(
+                When(search_name__startswith=term, then=Value(1.0)),
+                When(search_name__contains=f' {term}', then=Value(0.5)),
+                default=Value(0.0),
+                output_field=FloatField())
+
+        return queryset.filter(search_name__contains=term).annotate(
+            search_rank=rank).order_by(
+                '-search_rank', '-appointment_date', '-appointment_time')
+
     @staticmethod
     def get_appointment_by_id(appointment_id, user=None):
         """Отримання запису за ID"""
@@ -0,0 +1 @@
+# Availability Service package
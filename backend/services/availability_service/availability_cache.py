@@ -0,0 +1,103 @@
+"""Кеш результатів розрахунку доступності."""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ...api.caching import bump_version, get_versions, make_key
+from .availability_service import (
+    AvailabilityService, DEFAULT_DURATION_MINUTES, DEFAULT_WINDOW_DAYS,
+    get_slot_step)
+
+# Версія розкладу: змінюється при зміні боксів або тривалості послуг
+SCHEDULE_VERSION_KEY = 'availability:schedule:version'
+
+
+def bookings_version_key(appointment_date):
+    """Ключ версії записів на дату"""
+    return f'availability:bookings:{appointment_date}:version'
+
+
+class AvailabilityCache:
+    """Кеш доступності з інвалідацією через версії
+
+    Результат для (дата, тривалість) зберігається під ключем, що містить
+    версію розкладу боксів та версію записів на дату. Будь-яка зміна
+    запису збільшує версію його дати, тож наступне читання обчислює
+    результат заново.
+    """
+
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'AVAILABILITY_CACHE_TIMEOUT', 300)
+
+    @staticmethod
+    def bump_bookings_version(appointment_date):
+        """Інвалідація доступності на дату"""
+        bump_version(bookings_version_key(appointment_date))
+
+    @staticmethod
+    def bump_schedule_version():
+        """Інвалідація доступності на всі дати"""
+        bump_version(SCHEDULE_VERSION_KEY)
+
+    @staticmethod
+    def _get_or_compute(prefix, dates, params, compute):
+        """Результат з кешу під ключем з версіями розкладу та дат"""
+        version_keys = [SCHEDULE_VERSION_KEY] + [
+            bookings_version_key(d) for d in dates]
+        versions = get_versions(version_keys)
+        key = make_key(
+            prefix, *params, *[versions[k] for k in version_keys])
+
+        result = cache.get(key)
+        if result is None:
+            result = compute()
+            cache.set(key, result, AvailabilityCache._timeout())
+        return result
+
+    @staticmethod
+    def get_available_times(
+            appointment_date, duration_minutes=None,
+            exclude_appointment_id=None):
+        """Вільні часи на дату з кешу або з розрахунку"""
+        duration_minutes = duration_minutes or DEFAULT_DURATION_MINUTES
+        return AvailabilityCache._get_or_compute(
+            'availability:times',
+            [appointment_date],
+            [appointment_date, duration_minutes, get_slot_step(),
+             exclude_appointment_id or '-'],
+            lambda: AvailabilityService.get_available_times(
+                appointment_date, duration_minutes, exclude_appointment_id))
+
+    @staticmethod
+    def get_available_dates(
+            start_date, days=DEFAULT_WINDOW_DAYS, duration_minutes=None,
+            exclude_appointment_id=None):
+        """Доступні дати у вікні з кешу або з розрахунку"""
+        duration_minutes = duration_minutes or DEFAULT_DURATION_MINUTES
+        return AvailabilityCache._get_or_compute(
+            'availability:dates',
+            [start_date + timedelta(days=i) for i in range(days)],
+            [start_date, days, duration_minutes, get_slot_step(),
+             exclude_appointment_id or '-'],
+            lambda: AvailabilityService.get_available_dates(
+                start_date, days, duration_minutes, exclude_appointment_id))
+
+    @staticmethod
+    def get_availability_matrix(
+            date_from, date_to, duration_minutes=None, step_minutes=None,
+            include_boxes=False, exclude_appointment_id=None):
+        """Матриця доступності за діапазон дат з кешу або з розрахунку"""
+        duration_minutes = duration_minutes or DEFAULT_DURATION_MINUTES
+        step_minutes = step_minutes or get_slot_step()
+        return AvailabilityCache._get_or_compute(
+            'availability:matrix',
+            [date_from + timedelta(days=i)
+             for i in range((date_to - date_from).days + 1)],
+            [date_from, date_to, duration_minutes, step_minutes,
+             int(bool(include_boxes)), exclude_appointment_id or '-'],
+            lambda: AvailabilityService.get_availability_matrix(
+                date_from, date_to, duration_minutes, step_minutes,
+                include_boxes, exclude_appointment_id))
@@ -0,0 +1,557 @@
+"""Сервіс розрахунку доступності боксів для запису."""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+
+from ...api.models import Appointment, Box, BoxOccupancy
+from . import vectorized
+
+# Статуси записів, які займають бокс
+ACTIVE_STATUSES = Appointment.ACTIVE_STATUSES
+# Крок генерації часових слотів за замовчуванням та допустимі межі (хвилини)
+SLOT_STEP_MINUTES = 30
+MIN_SLOT_STEP_MINUTES = 5
+MAX_SLOT_STEP_MINUTES = 240
+# Тривалість послуги за замовчуванням (хвилини)
+DEFAULT_DURATION_MINUTES = Appointment.DEFAULT_DURATION_MINUTES
+# Розмір слоту бітових карт зайнятості (хвилини)
+SLOT_MINUTES = BoxOccupancy.SLOT_MINUTES
+SLOTS_PER_DAY = BoxOccupancy.SLOTS_PER_DAY
+# Довжина вікна пошуку доступних дат за замовчуванням та максимальна (дні)
+DEFAULT_WINDOW_DAYS = 30
+MAX_WINDOW_DAYS = 90
+
+
+def get_slot_step():
+    """Крок часових слотів з налаштувань (AVAILABILITY_SLOT_STEP_MINUTES)"""
+    return getattr(
+        settings, 'AVAILABILITY_SLOT_STEP_MINUTES', SLOT_STEP_MINUTES)
+
+
+def time_to_minutes(value):
+    """Перетворення часу у хвилини від початку доби"""
+    return value.hour * 60 + value.minute
+
+
+def minutes_to_time_str(minutes):
+    """Перетворення хвилин від початку доби у рядок 'HH:MM'"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def intervals_to_mask(intervals):
+    """Бітова маска слотів, що перекриваються інтервалами (хвилини)"""
+    mask = 0
+    for start, end in intervals:
+        first = max(start // SLOT_MINUTES, 0)
+        last = min(-(-end // SLOT_MINUTES), SLOTS_PER_DAY)
+        if first < last:
+            mask |= ((1 << (last - first)) - 1) << first
+    return mask
+
+
+def window_mask(window_start, window_end):
+    """Бітова маска слотів, що повністю лежать у робочому інтервалі"""
+    first = -(-window_start // SLOT_MINUTES)
+    last = window_end // SLOT_MINUTES
+    if first >= last:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def free_run_mask(busy_mask, window_start, window_end, duration_minutes):
+    """Маска початків, з яких вільно duration_minutes хвилин поспіль
+
+    Біт i встановлено, якщо слоти i..i+n-1 вільні та лежать у робочому
+    інтервалі. Для n слотів достатньо O(log n) зсувів.
+    """
+    slots = -(-duration_minutes // SLOT_MINUTES)
+    run = window_mask(window_start, window_end) & ~busy_mask
+    length = 1
+    while length < slots and run:
+        shift = min(length, slots - length)
+        run &= run >> shift
+        length += shift
+    return run
+
+
+def is_slot_aligned(*minutes):
+    """Чи кратні всі значення розміру слоту бітових карт"""
+    return all(value % SLOT_MINUTES == 0 for value in minutes)
+
+
+class AvailabilityService:
+    """Движок розрахунку вільних часових слотів боксів.
+
+    Зайнятість читається одним запитом з бітових карт BoxOccupancy, а
+    вільні слоти обчислюються бітовими операціями. Якщо карти не дають
+    точного результату (виключення запису, некратний крок), записи
+    завантажуються разом з тривалістю послуги і перетворюються на
+    відсортовані інтервали зайнятості.
+    """
+
+    @staticmethod
+    def merge_intervals(intervals):
+        """Сортування та об'єднання інтервалів, що перекриваються"""
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def get_busy_intervals_for_range(
+            box_ids, date_from, date_to, exclude_appointment_id=None):
+        """Інтервали зайнятості боксів за діапазон дат (один запит до БД)
+
+        Повертає словник {(box_id, date): [(start, end), ...]} з
+        відсортованими інтервалами, що не перекриваються.
+        """
+        appointments = Appointment.objects.filter(  # pylint: disable=no-member
+            box_id__in=box_ids,
+            appointment_date__gte=date_from,
+            appointment_date__lte=date_to,
+            status__in=ACTIVE_STATUSES
+        )
+
+        # Виключаємо поточний запис при редагуванні
+        if exclude_appointment_id:
+            appointments = appointments.exclude(id=exclude_appointment_id)
+
+        intervals = defaultdict(list)
+        for box_id, appointment_date, start_time, duration in (
+                appointments.values_list(
+                    'box_id', 'appointment_date', 'appointment_time',
+                    'service__duration_minutes')):
+            start = time_to_minutes(start_time)
+            intervals[(box_id, appointment_date)].append(
+                (start, start + (duration or DEFAULT_DURATION_MINUTES)))
+
+        return {
+            key: AvailabilityService.merge_intervals(box_intervals)
+            for key, box_intervals in intervals.items()
+        }
+
+    @staticmethod
+    def get_busy_intervals(
+            box_ids, appointment_date, exclude_appointment_id=None):
+        """Інтервали зайнятості боксів на дату (один запит до БД)
+
+        Повертає словник {box_id: [(start, end), ...]}.
+        """
+        busy = AvailabilityService.get_busy_intervals_for_range(
+            box_ids, appointment_date, appointment_date,
+            exclude_appointment_id)
+        return {box_id: intervals for (box_id, _), intervals in busy.items()}
+
+    @staticmethod
+    def find_free_starts(
+            window_start, window_end, duration_minutes, busy_intervals,
+            step_minutes=None, limit=None):
+        """Вільні початки слотів у робочому інтервалі
+
+        busy_intervals мають бути відсортовані та не перекриватися,
+        тому достатньо одного проходу вказівником по інтервалах.
+        Якщо задано limit, пошук зупиняється після limit знайдених слотів.
+        """
+        step_minutes = step_minutes or get_slot_step()
+        free_starts = []
+        index = 0
+        current = window_start
+        while current + duration_minutes <= window_end:
+            # Пропускаємо інтервали, що закінчилися до початку слоту
+            while (index < len(busy_intervals) and
+                    busy_intervals[index][1] <= current):
+                index += 1
+
+            if (index == len(busy_intervals) or
+                    busy_intervals[index][0] >= current + duration_minutes):
+                free_starts.append(current)
+                if limit and len(free_starts) >= limit:
+                    break
+
+            current += step_minutes
+        return free_starts
+
+    @staticmethod
+    def find_free_starts_in_mask(
+            window_start, window_end, duration_minutes, busy_mask,
+            step_minutes=None, limit=None):
+        """Вільні початки слотів по бітовій карті зайнятості
+
+        Результат збігається з find_free_starts, якщо початок робочого
+        інтервалу, крок та тривалість кратні SLOT_MINUTES.
+        """
+        step_minutes = step_minutes or get_slot_step()
+        run = free_run_mask(
+            busy_mask, window_start, window_end, duration_minutes)
+        free_starts = []
+        current = window_start
+        while run and current + duration_minutes <= window_end:
+            if run >> (current // SLOT_MINUTES) & 1:
+                free_starts.append(current)
+                if limit and len(free_starts) >= limit:
+                    break
+            current += step_minutes
+        return free_starts
+
+    @staticmethod
+    def get_free_capacity(window_start, window_end, busy_intervals):
+        """Найдовший вільний проміжок у робочому інтервалі (хвилини)
+
+        Дає швидку відповідь, чи може в цей день в принципі вміститися
+        послуга, без перебору слотів.
+        """
+        longest = 0
+        cursor = window_start
+        for start, end in busy_intervals:
+            if end <= cursor:
+                continue
+            if start >= window_end:
+                break
+            longest = max(longest, start - cursor)
+            cursor = end
+        return max(longest, window_end - cursor, 0)
+
+    @staticmethod
+    def get_occupancy_masks(box_ids, date_from, date_to):
+        """Бітові карти {(box_id, date): mask} за діапазон (один запит)
+
+        Відсутній рядок означає день без записів (маска 0).
+        """
+        rows = BoxOccupancy.objects.filter(  # pylint: disable=no-member
+            box_id__in=box_ids,
+            date__gte=date_from,
+            date__lte=date_to
+        ).values_list('box_id', 'date', 'bitmap')
+        return {
+            (box_id, day): BoxOccupancy.bytes_to_mask(bitmap)
+            for box_id, day, bitmap in rows
+        }
+
+    @staticmethod
+    def can_use_occupancy(
+            windows, duration_minutes, step_minutes,
+            exclude_appointment_id=None):
+        """Чи дає розрахунок по бітових картах точний результат
+
+        Карти не можуть виключити окремий запис, а початки слотів і
+        тривалість мають бути кратні SLOT_MINUTES. Векторизований
+        движок працює з хвилинними інтервалами.
+        """
+        if exclude_appointment_id or vectorized.is_enabled() or not getattr(
+                settings, 'AVAILABILITY_USE_OCCUPANCY', True):
+            return False
+        window_starts = [
+            window_start
+            for day_windows in windows.values()
+            for window_start, _ in day_windows.values()
+        ]
+        return is_slot_aligned(
+            duration_minutes, step_minutes, *window_starts)
+
+    @staticmethod
+    def _load_busy(
+            windows, date_from, date_to, duration_minutes, step_minutes,
+            exclude_appointment_id=None):
+        """Зайнятість боксів з бітових карт або з таблиці записів
+
+        Повертає (busy, use_masks): busy - словник {(box_id, date): ...}
+        з масками, якщо use_masks, інакше з інтервалами.
+        """
+        box_ids = {
+            box_id for day_windows in windows.values()
+            for box_id in day_windows
+        }
+        if not box_ids:
+            return {}, False
+
+        if AvailabilityService.can_use_occupancy(
+                windows, duration_minutes, step_minutes,
+                exclude_appointment_id):
+            return AvailabilityService.get_occupancy_masks(
+                box_ids, date_from, date_to), True
+
+        return AvailabilityService.get_busy_intervals_for_range(
+            box_ids, date_from, date_to, exclude_appointment_id), False
+
+    @staticmethod
+    def _free_starts(
+            window, duration_minutes, busy, use_masks, step_minutes,
+            limit=None):
+        """Вільні початки для маски або інтервалів зайнятості"""
+        window_start, window_end = window
+        if use_masks:
+            return AvailabilityService.find_free_starts_in_mask(
+                window_start, window_end, duration_minutes, busy or 0,
+                step_minutes, limit)
+        return AvailabilityService.find_free_starts(
+            window_start, window_end, duration_minutes, busy or [],
+            step_minutes, limit)
+
+    @staticmethod
+    def get_active_box_windows(weekdays):
+        """Робочі інтервали активних боксів по днях тижня
+
+        Повертає словник {weekday: {box_id: (start, end)}}, де weekday -
+        індекс дня тижня (0 - понеділок).
+        """
+        windows = {weekday: {} for weekday in weekdays}
+        for box in Box.objects.filter(is_active=True):  # pylint: disable=no-member
+            for weekday in weekdays:
+                window = box.get_working_window(weekday)
+                if window:
+                    windows[weekday][box.id] = window
+        return windows
+
+    @staticmethod
+    def get_available_boxes(
+            appointment_date, appointment_time, duration_minutes=None):
+        """Активні бокси, вільні на весь час послуги з appointment_time
+
+        Запитаний інтервал використовується як робочий інтервал боксу,
+        тож зайнятість читається через _load_busy: з бітових карт лише
+        якщо це дозволяє AVAILABILITY_USE_OCCUPANCY і час кратний
+        SLOT_MINUTES, інакше з таблиці записів.
+        """
+        duration_minutes = duration_minutes or DEFAULT_DURATION_MINUTES
+        start = time_to_minutes(appointment_time)
+        window = (start, start + duration_minutes)
+        boxes = [
+            box for box in Box.objects.filter(  # pylint: disable=no-member
+                is_active=True)
+            if box.is_available_at_time(
+                appointment_date, appointment_time, duration_minutes)
+        ]
+        windows = {appointment_date.weekday(): {box.id: window for box in boxes}}
+        busy, use_masks = AvailabilityService._load_busy(
+            windows, appointment_date, appointment_date, duration_minutes,
+            SLOT_MINUTES)
+        return [
+            box for box in boxes
+            if AvailabilityService._free_starts(
+                window, duration_minutes, busy.get((box.id, appointment_date)),
+                use_masks, SLOT_MINUTES, limit=1)
+        ]
+
+    @staticmethod
+    def get_available_times(
+            appointment_date, duration_minutes=None,
+            exclude_appointment_id=None, step_minutes=None):
+        """Вільні часи початку на дату по всіх активних боксах"""
+        duration_minutes = duration_minutes or DEFAULT_DURATION_MINUTES
+        step_minutes = step_minutes or get_slot_step()
+        weekday = appointment_date.weekday()
+
+        windows = AvailabilityService.get_active_box_windows([weekday])
+        busy, use_masks = AvailabilityService._load_busy(
+            windows, appointment_date, appointment_date, duration_minutes,
+            step_minutes, exclude_appointment_id)
+
+        available = set()
+        for box_id, window in windows[weekday].items():
+            available.update(AvailabilityService._free_starts(
+                window, duration_minutes,
+                busy.get((box_id, appointment_date)), use_masks,
+                step_minutes))
+
+        return [minutes_to_time_str(minutes) for minutes in sorted(available)]
+
+    @staticmethod
+    def _load_range(
+            dates, duration_minutes, step_minutes,
+            exclude_appointment_id=None):
+        """Робочі інтервали та зайнятість для списку дат
+
+        Два запити незалежно від кількості дат: бокси та зайнятість.
+        Повертає (windows, busy, use_masks) у форматах
+        get_active_box_windows та _load_busy.
+        """
+        windows = AvailabilityService.get_active_box_windows(
+            sorted({d.weekday() for d in dates}))
+        busy, use_masks = AvailabilityService._load_busy(
+            windows, dates[0], dates[-1], duration_minutes, step_minutes,
+            exclude_appointment_id)
+        return windows, busy, use_masks
+
+    @staticmethod
+    def assign_free_starts(
+            dates, windows, busy, use_masks, duration_minutes,
+            step_minutes, engine=None):
+        """Вільні початки з призначеним боксом для кожної дати
+
+        Повертає список словників {start: box_id}; бокс - перший вільний
+        у порядку боксів, як у AppointmentService._find_available_box.
+        engine ('python' або 'numpy') за замовчуванням береться з
+        налаштувань.
+        """
+        if engine is None:
+            engine = (
+                vectorized.ENGINE_NUMPY if vectorized.is_enabled()
+                else vectorized.ENGINE_PYTHON)
+        if engine == vectorized.ENGINE_NUMPY and not use_masks:
+            return vectorized.assign_free_starts(
+                dates, windows, busy, duration_minutes, step_minutes)
+
+        assignments = []
+        for check_date in dates:
+            assigned_boxes = {}
+            for box_id, window in windows[check_date.weekday()].items():
+                for start in AvailabilityService._free_starts(
+                        window, duration_minutes,
+                        busy.get((box_id, check_date)), use_masks,
+                        step_minutes):
+                    assigned_boxes.setdefault(start, box_id)
+            assignments.append(assigned_boxes)
+        return assignments
+
+    @staticmethod
+    def get_available_dates(
+            start_date, days=DEFAULT_WINDOW_DAYS, duration_minutes=None,
+            exclude_appointment_id=None, step_minutes=None):
+        """Дати з хоча б одним вільним слотом у вікні з days днів
+
+        Усі записи вікна завантажуються одним запитом і групуються
+        за (бокс, дата), тому кількість запитів не залежить від
+        довжини вікна.
+        """
+        duration_minutes = duration_minutes or DEFAULT_DURATION_MINUTES
+        step_minutes = step_minutes or get_slot_step()
+        dates = [start_date + timedelta(days=i) for i in range(days)]
+        if not dates:
+            return []
+
+        windows, busy, use_masks = AvailabilityService._load_range(
+            dates, duration_minutes, step_minutes, exclude_appointment_id)
+
+        if vectorized.is_enabled():
+            return [
+                check_date.strftime('%Y-%m-%d')
+                for check_date, has_free in zip(
+                    dates, vectorized.has_free_starts(
+                        dates, windows, busy, duration_minutes,
+                        step_minutes))
+                if has_free
+            ]
+
+        available_dates = []
+        for check_date in dates:
+            day_windows = windows[check_date.weekday()]
+            for box_id, window in day_windows.items():
+                if AvailabilityService._free_starts(
+                        window, duration_minutes,
+                        busy.get((box_id, check_date)), use_masks,
+                        step_minutes, limit=1):
+                    available_dates.append(check_date.strftime('%Y-%m-%d'))
+                    break
+
+        return available_dates
+
+    @staticmethod
+    def get_availability_matrix(
+            date_from, date_to, duration_minutes=None, step_minutes=None,
+            include_boxes=False, exclude_appointment_id=None):
+        """Вільні часи для кожної дати діапазону за один прохід
+
+        Для кожного часу можна отримати бокс, який буде призначено при
+        записі: перший вільний у порядку боксів, як у
+        AppointmentService._find_available_box.
+        """
+        duration_minutes = duration_minutes or DEFAULT_DURATION_MINUTES
+        step_minutes = step_minutes or get_slot_step()
+        dates = [
+            date_from + timedelta(days=i)
+            for i in range((date_to - date_from).days + 1)
+        ]
+        if not dates:
+            return []
+
+        windows, busy, use_masks = AvailabilityService._load_range(
+            dates, duration_minutes, step_minutes, exclude_appointment_id)
+
+        matrix = []
+        for check_date, assigned_boxes in zip(
+                dates, AvailabilityService.assign_free_starts(
+                    dates, windows, busy, use_masks, duration_minutes,
+                    step_minutes)):
+            starts = sorted(assigned_boxes)
+            day = {
+                'date': check_date.strftime('%Y-%m-%d'),
+                'available_times': [
+                    minutes_to_time_str(start) for start in starts],
+            }
+            if include_boxes:
+                day['boxes'] = {
+                    minutes_to_time_str(start): assigned_boxes[start]
+                    for start in starts
+                }
+            matrix.append(day)
+
+        return matrix
+
+    @staticmethod
+    def find_next_available(
+            start_datetime, duration_minutes=None, count=1,
+            horizon_days=MAX_WINDOW_DAYS, exclude_appointment_id=None,
+            step_minutes=None, chunk_days=7):
+        """Найближчі вільні слоти (дата, час, бокс) починаючи з моменту
+
+        Записи завантажуються порціями по chunk_days днів, тож пошук
+        зупиняється після першої порції з потрібною кількістю слотів.
+        Дні, де найдовший вільний проміжок боксу коротший за послугу,
+        пропускаються без перебору слотів (для бітових карт це робить
+        сам free_run_mask).
+        """
+        duration_minutes = duration_minutes or DEFAULT_DURATION_MINUTES
+        step_minutes = step_minutes or get_slot_step()
+        start_date = start_datetime.date()
+        not_before = time_to_minutes(start_datetime)
+
+        windows = AvailabilityService.get_active_box_windows(range(7))
+        if not any(windows.values()):
+            return []
+
+        slots = []
+        for offset in range(0, horizon_days, chunk_days):
+            dates = [
+                start_date + timedelta(days=i)
+                for i in range(offset, min(offset + chunk_days, horizon_days))
+            ]
+            busy, use_masks = AvailabilityService._load_busy(
+                windows, dates[0], dates[-1], duration_minutes,
+                step_minutes, exclude_appointment_id)
+
+            for check_date in dates:
+                assigned_boxes = {}
+                for box_id, (window_start, window_end) in (
+                        windows[check_date.weekday()].items()):
+                    if check_date == start_date and not_before > window_start:
+                        # Сьогодні - лише слоти сітки, що ще не минули
+                        steps = -(-(not_before - window_start) // step_minutes)
+                        window_start += steps * step_minutes
+
+                    box_busy = busy.get((box_id, check_date))
+                    if not use_masks and AvailabilityService.get_free_capacity(
+                            window_start, window_end,
+                            box_busy or []) < duration_minutes:
+                        continue
+
+                    for start in AvailabilityService._free_starts(
+                            (window_start, window_end), duration_minutes,
+                            box_busy, use_masks, step_minutes, limit=count):
+                        assigned_boxes.setdefault(start, box_id)
+
+                for start in sorted(assigned_boxes):
+                    slots.append({
+                        'date': check_date.strftime('%Y-%m-%d'),
+                        'time': minutes_to_time_str(start),
+                        'box_id': assigned_boxes[start],
+                    })
+                    if len(slots) >= count:
+                        return slots
+
+        return slots
@@ -0,0 +1,152 @@
+"""Бітові карти зайнятості боксів по днях."""
+
+from datetime import timedelta
+
+from django.db import transaction
+
+from ...api.models import Appointment, BoxOccupancy
+from .availability_service import (
+    ACTIVE_STATUSES, AvailabilityService, intervals_to_mask)
+
+
+class OccupancyService:
+    """Підтримка бітових карт зайнятості BoxOccupancy
+
+    Карта дня є функцією записів боксу на цю дату, тому після будь-якої
+    зміни запису вона просто перераховується для старої та нової пари
+    (бокс, дата). Для початків і тривалостей, кратних SLOT_MINUTES,
+    перевірка вільного часу по карті збігається з перевіркою по
+    інтервалах записів.
+    """
+
+    @staticmethod
+    def compute_masks(date_from, date_to, box_ids=None):
+        """Маски {(box_id, date): mask} за записами з БД (один запит)"""
+        appointments = Appointment.objects.filter(  # pylint: disable=no-member
+            appointment_date__gte=date_from,
+            appointment_date__lte=date_to,
+            status__in=ACTIVE_STATUSES,
+            box__isnull=False
+        )
+        if box_ids is not None:
+            appointments = appointments.filter(box_id__in=box_ids)
+        else:
+            box_ids = appointments.values_list('box_id', flat=True).distinct()
+
+        busy = AvailabilityService.get_busy_intervals_for_range(
+            list(box_ids), date_from, date_to)
+        masks = {}
+        for key, intervals in busy.items():
+            mask = intervals_to_mask(intervals)
+            if mask:
+                masks[key] = mask
+        return masks
+
+    @staticmethod
+    def recompute(box_id, appointment_date):
+        """Перерахунок карти одного дня боксу"""
+        if box_id is None or appointment_date is None:
+            return
+        mask = OccupancyService.compute_masks(
+            appointment_date, appointment_date, [box_id]).get(
+                (box_id, appointment_date), 0)
+        if mask:
+            BoxOccupancy.objects.update_or_create(  # pylint: disable=no-member
+                box_id=box_id, date=appointment_date,
+                defaults={'bitmap': BoxOccupancy.mask_to_bytes(mask)})
+        else:
+            BoxOccupancy.objects.filter(  # pylint: disable=no-member
+                box_id=box_id, date=appointment_date).delete()
+
+    @staticmethod
+    def recompute_for_service(service_id):
+        """Перерахунок днів з активними записами послуги"""
+        days = Appointment.objects.filter(  # pylint: disable=no-member
+            service_id=service_id,
+            status__in=ACTIVE_STATUSES,
+            box__isnull=False
+        ).values_list('box_id', 'appointment_date').distinct()
+        for box_id, appointment_date in days:
+            OccupancyService.recompute(box_id, appointment_date)
+
+    @staticmethod
+    def _date_bounds(date_from, date_to):
+        """Межі діапазону; відсутні межі беруться з таблиці записів"""
+        if date_from is None or date_to is None:
+            dates = Appointment.objects.order_by(  # pylint: disable=no-member
+                'appointment_date').values_list('appointment_date', flat=True)
+            date_from = date_from or dates.first()
+            date_to = date_to or dates.last()
+        if date_from is None or date_to is None:
+            # Записів немає - діапазон порожній
+            return None, None
+        return date_from, date_to
+
+    @staticmethod
+    def rebuild(date_from=None, date_to=None, batch_days=31):
+        """Масова перебудова карт за діапазон дат
+
+        Обробляє діапазон порціями по batch_days днів, кожну порцію в
+        окремій транзакції. Без меж перебудовує всю таблицю. Повертає
+        кількість збережених рядків.
+        """
+        full_rebuild = date_from is None and date_to is None
+        date_from, date_to = OccupancyService._date_bounds(date_from, date_to)
+        if full_rebuild:
+            # Рядки поза діапазоном записів застаріли
+            stale = BoxOccupancy.objects.all()  # pylint: disable=no-member
+            if date_from is not None:
+                stale = stale.exclude(date__gte=date_from, date__lte=date_to)
+            stale.delete()
+        if date_from is None:
+            return 0
+
+        created = 0
+        chunk_start = date_from
+        while chunk_start <= date_to:
+            chunk_end = min(
+                chunk_start + timedelta(days=batch_days - 1), date_to)
+            masks = OccupancyService.compute_masks(chunk_start, chunk_end)
+            with transaction.atomic():
+                BoxOccupancy.objects.filter(  # pylint: disable=no-member
+                    date__gte=chunk_start, date__lte=chunk_end).delete()
+                BoxOccupancy.objects.bulk_create([  # pylint: disable=no-member
+                    BoxOccupancy(
+                        box_id=box_id, date=day,
+                        bitmap=BoxOccupancy.mask_to_bytes(mask))
+                    for (box_id, day), mask in masks.items()
+                ], batch_size=1000)
+            created += len(masks)
+            chunk_start = chunk_end + timedelta(days=1)
+        return created
+
+    @staticmethod
+    def verify(date_from=None, date_to=None):
+        """Звірка збережених карт із записами
+
+        Повертає відсортований список (box_id, date, stored, expected)
+        для кожної розбіжності; порожній список означає повну
+        відповідність. Без меж перевіряється вся таблиця.
+        """
+        stored_rows = BoxOccupancy.objects.all()  # pylint: disable=no-member
+        if date_from is not None:
+            stored_rows = stored_rows.filter(date__gte=date_from)
+        if date_to is not None:
+            stored_rows = stored_rows.filter(date__lte=date_to)
+        stored = {
+            (box_id, day): BoxOccupancy.bytes_to_mask(bitmap)
+            for box_id, day, bitmap in stored_rows.values_list(
+                'box_id', 'date', 'bitmap')
+        }
+
+        date_from, date_to = OccupancyService._date_bounds(date_from, date_to)
+        expected = {}
+        if date_from is not None:
+            expected = OccupancyService.compute_masks(date_from, date_to)
+
+        mismatches = []
+        for key in set(stored) | set(expected):
+            if stored.get(key, 0) != expected.get(key, 0):
+                mismatches.append(
+                    (*key, stored.get(key, 0), expected.get(key, 0)))
+        return sorted(mismatches)
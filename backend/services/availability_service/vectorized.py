@@ -0,0 +1,158 @@
+"""Векторизований розрахунок вільних слотів на NumPy.
+
+Кожен день кожного боксу подається як булевий масив слотів доби (крок
+сітки - НСД усіх меж, зазвичай 5-30 хвилин): робочий час позначається
+зрізом True, записи - зрізом False. Допустимі початки для тривалості d
+знаходяться одночасно для всіх боксів і днів різницею кумулятивних сум
+(ковзне вікно довжини d).
+
+NumPy є необов'язковою залежністю: без нього is_enabled() повертає
+False і AvailabilityService використовує реалізацію на чистому Python.
+"""
+
+from functools import reduce
+from graphlib import TopologicalSorter
+from math import gcd
+
+from django.conf import settings
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - залежить від оточення
+    np = None
+
+MINUTES_PER_DAY = 24 * 60
+ENGINE_PYTHON = 'python'
+ENGINE_NUMPY = 'numpy'
+
+
+def is_available():
+    """Чи встановлено NumPy"""
+    return np is not None
+
+
+def is_enabled():
+    """Чи увімкнено векторизований движок (AVAILABILITY_ENGINE='numpy')"""
+    return is_available() and getattr(
+        settings, 'AVAILABILITY_ENGINE', ENGINE_PYTHON) == ENGINE_NUMPY
+
+
+def _box_order(windows):
+    """Спільний порядок боксів, узгоджений з порядком кожного дня тижня
+
+    Порядок боксів дня визначає, який бокс буде призначено. Порядки
+    всіх днів - підпослідовності списку боксів, тож топологічне
+    сортування дає одну вісь, на якій argmax знаходить перший вільний
+    бокс для будь-якого дня.
+    """
+    sorter = TopologicalSorter()
+    for day_windows in windows.values():
+        previous = None
+        for box_id in day_windows:
+            sorter.add(box_id, *([previous] if previous is not None else []))
+            previous = box_id
+    return list(sorter.static_order())
+
+
+def _resolution(windows, busy, duration_minutes, step_minutes):
+    """Найбільший крок сітки (хвилини), кратний усім межам
+
+    Робота на сітці з кроком НСД меж інтервалів, кроку та тривалості
+    дає той самий результат, що й похвилинна, але з меншими масивами.
+    """
+    values = [duration_minutes, step_minutes, MINUTES_PER_DAY]
+    for day_windows in windows.values():
+        for window in day_windows.values():
+            values.extend(window)
+    for intervals in busy.values():
+        for interval in intervals:
+            values.extend(interval)
+    return reduce(gcd, values)
+
+
+def feasible_starts(dates, windows, busy, duration_minutes, step_minutes,
+                    box_ids=None):
+    """Булевий масив (дні, бокси, слоти) допустимих початків
+
+    windows - {weekday: {box_id: (start, end)}}, busy - інтервали
+    {(box_id, date): [(start, end), ...]} у хвилинах. Початки слотів
+    беруться з сітки step_minutes від початку робочого дня боксу.
+    Повертає (feasible, resolution): індекс слоту i відповідає
+    i * resolution хвилинам від початку доби.
+    """
+    if box_ids is None:
+        box_ids = _box_order(windows)
+    box_index = {box_id: i for i, box_id in enumerate(box_ids)}
+    unit = _resolution(windows, busy, duration_minutes, step_minutes)
+    slots_per_day = MINUTES_PER_DAY // unit
+    duration = duration_minutes // unit
+    step = step_minutes // unit
+
+    # Робочий час і сітка початків для кожного дня тижня
+    working = np.zeros((7, len(box_ids), slots_per_day), dtype=bool)
+    grid = np.zeros((7, len(box_ids), slots_per_day), dtype=bool)
+    for weekday, day_windows in windows.items():
+        for box_id, (window_start, window_end) in day_windows.items():
+            box = box_index[box_id]
+            first, last = window_start // unit, window_end // unit
+            working[weekday, box, first:last] = True
+            grid[weekday, box, first:last:step] = True
+
+    weekdays = np.array([day.weekday() for day in dates], dtype=np.intp)
+    free = working[weekdays]
+
+    # Записи знімають вільні слоти зрізами
+    date_index = {day: i for i, day in enumerate(dates)}
+    for (box_id, day), intervals in busy.items():
+        box = box_index.get(box_id)
+        i = date_index.get(day)
+        if box is None or i is None:
+            continue
+        for start, end in intervals:
+            free[i, box, start // unit:end // unit] = False
+
+    feasible = np.zeros_like(free)
+    if 0 < duration <= slots_per_day:
+        # Кількість вільних слотів у кожному вікні довжини duration
+        counts = np.zeros(
+            free.shape[:2] + (slots_per_day + 1,), dtype=np.int16)
+        np.cumsum(free, axis=2, dtype=np.int16, out=counts[:, :, 1:])
+        last = slots_per_day - duration + 1
+        feasible[:, :, :last] = (
+            counts[:, :, duration:] - counts[:, :, :last]) == duration
+    feasible &= grid[weekdays]
+    return feasible, unit
+
+
+def has_free_starts(dates, windows, busy, duration_minutes, step_minutes):
+    """Список прапорців: чи є у дати хоча б один вільний слот"""
+    if not dates or not any(windows.values()):
+        return [False] * len(dates)
+    feasible, _ = feasible_starts(
+        dates, windows, busy, duration_minutes, step_minutes)
+    return feasible.any(axis=(1, 2)).tolist()
+
+
+def assign_free_starts(dates, windows, busy, duration_minutes, step_minutes):
+    """Вільні початки з призначеним боксом для кожної дати
+
+    Повертає список словників {start: box_id}, де бокс - перший вільний
+    у порядку боксів дня, як у AvailabilityService.assign_free_starts.
+    """
+    if not dates or not any(windows.values()):
+        return [{} for _ in dates]
+
+    box_ids = _box_order(windows)
+    feasible, unit = feasible_starts(
+        dates, windows, busy, duration_minutes, step_minutes, box_ids)
+
+    # Перший вільний бокс для кожного (дата, слот) одним argmax
+    first_boxes = feasible.argmax(axis=1)
+    day_indexes, slots = np.nonzero(feasible.any(axis=1))
+
+    assignments = [{} for _ in dates]
+    for i, slot, box in zip(
+            day_indexes.tolist(), slots.tolist(),
+            first_boxes[day_indexes, slots].tolist()):
+        assignments[i][slot * unit] = box_ids[box]
+    return assignments
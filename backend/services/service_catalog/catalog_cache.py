@@ -0,0 +1,143 @@
+"""Готовий JSON публічного каталогу послуг у кеші."""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from ...api.caching import make_key
+from ...api.localization import with_language
+from ...api.models import Service, ServiceCategory
+from ...api.serializers import (
+    CatalogTreeSerializer, ServiceCategorySerializer, ServiceSerializer)
+
+# Вказівник на поточну версію відрендереного каталогу
+CATALOG_VERSION_KEY = 'catalog:version'
+CATALOG_LANGUAGES = ('uk', 'en')
+
+CATALOG_SERVICES = 'services'
+CATALOG_FEATURED = 'featured'
+CATALOG_CATEGORIES = 'categories'
+CATALOG_TREE = 'tree'
+
+
+class CatalogCache:
+    """Каталог (послуги, рекомендовані, категорії, дерево) як байти JSON
+
+    Усі розділи для всіх мов рендеряться разом і записуються під новою
+    версією, після чого вказівник CATALOG_VERSION_KEY перемикається на
+    неї. Читач бачить або повністю старий, або повністю новий каталог і
+    не звертається до БД, доки вказівник та записи є в кеші.
+    """
+
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 24 * 3600)
+
+    @staticmethod
+    def _render_sections(language):
+        """Дані розділів каталогу мовою language
+
+        Назви та описи обчислюються в БД лише потрібною мовою.
+        """
+        context = {'language': language}
+        services = Service.objects.filter(  # pylint: disable=no-member
+            is_active=True
+        ).select_related('category').order_by(
+            'category__order', 'category__name', 'name')
+        services = with_language(services, language)
+        # Один prefetch активних послуг для всіх категорій дерева
+        tree_services = Service.objects.filter(  # pylint: disable=no-member
+            is_active=True).order_by('name')
+        categories = ServiceCategory.objects.prefetch_related(  # pylint: disable=no-member
+            Prefetch('services',
+                     queryset=with_language(tree_services, language))
+        ).order_by('order', 'name')
+        categories = with_language(categories, language)
+
+        services_data = ServiceSerializer(
+            services, many=True, context=context).data
+        return {
+            CATALOG_SERVICES: services_data,
+            CATALOG_FEATURED: [
+                item for item, service in zip(services_data, services)
+                if service.is_featured
+            ],
+            CATALOG_CATEGORIES: ServiceCategorySerializer(
+                categories, many=True, context=context).data,
+            # Дерево містить лише категорії, де є активні послуги
+            CATALOG_TREE: CatalogTreeSerializer(
+                [category for category in categories
+                 if category.services.all()],
+                many=True, context=context).data,
+        }
+
+    @staticmethod
+    def render(language):
+        """Розділи каталогу: {section: (content, etag, rendered_at)}"""
+        renderer = JSONRenderer()
+        rendered_at = timezone.now()
+        entry = {}
+        for section, data in CatalogCache._render_sections(language).items():
+            content = renderer.render(data)
+            etag = f'"{hashlib.md5(content).hexdigest()}"'
+            entry[section] = (content, etag, rendered_at)
+        return entry
+
+    @staticmethod
+    def rebuild():
+        """Рендер каталогу для всіх мов і атомарне перемикання версії
+
+        Повертає (version, {language: entry}).
+        """
+        version = time.time_ns()
+        entries = {
+            language: CatalogCache.render(language)
+            for language in CATALOG_LANGUAGES
+        }
+        cache.set_many({
+            make_key('catalog', language, version): entry
+            for language, entry in entries.items()
+        }, CatalogCache._timeout())
+        cache.set(CATALOG_VERSION_KEY, version, CatalogCache._timeout())
+        return version, entries
+
+    @staticmethod
+    def invalidate():
+        """Скидання вказівника: наступне читання перебудує каталог"""
+        cache.delete(CATALOG_VERSION_KEY)
+
+    @staticmethod
+    def get_section(language, section):
+        """Готовий розділ каталогу (content, etag, rendered_at)"""
+        version = cache.get(CATALOG_VERSION_KEY)
+        entry = None
+        if version is not None:
+            entry = cache.get(make_key('catalog', language, version))
+        if entry is None:
+            entry = CatalogCache.rebuild()[1][language]
+        return entry[section]
+
+    @staticmethod
+    def get_version():
+        """Поточна версія каталогу (None, якщо каталог ще не відрендерено)"""
+        return cache.get(CATALOG_VERSION_KEY)
+
+    @staticmethod
+    def get_entries():
+        """Поточна версія та каталог для всіх мов: (version, {language: entry})"""
+        version = cache.get(CATALOG_VERSION_KEY)
+        if version is not None:
+            keys = {
+                language: make_key('catalog', language, version)
+                for language in CATALOG_LANGUAGES
+            }
+            found = cache.get_many(list(keys.values()))
+            if len(found) == len(keys):
+                return version, {
+                    language: found[key] for language, key in keys.items()}
+        return CatalogCache.rebuild()
@@ -0,0 +1,137 @@
+"""Пошук послуг за інвертованим індексом у пам'яті процесу."""
+
+import bisect
+import json
+import re
+
+from ...api.models import normalize_search_text
+from .catalog_cache import CATALOG_LANGUAGES, CATALOG_SERVICES, CatalogCache
+
+# Слова українською та англійською, включно з апострофом усередині слова
+TOKEN_RE = re.compile(r"\w+(?:'\w+)*")
+
+# Вага збігу залежно від поля послуги
+NAME_WEIGHT = 3.0
+CATEGORY_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+# Множник для збігу лише за префіксом слова
+PREFIX_FACTOR = 0.6
+
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+
+
+def tokenize(text):
+    """Нормалізовані слова тексту"""
+    return TOKEN_RE.findall(normalize_search_text(text or ''))
+
+
+class ServiceSearchIndex:
+    """Інвертований індекс активних послуг однієї версії каталогу
+
+    Індексуються назви та описи обома мовами і назви категорій. Слова
+    зберігаються відсортованими, тож усі слова з префіксом знаходяться
+    бінарним пошуком. Документи - готові представлення послуг з
+    каталогу для кожної мови, тому відповідь будується без БД.
+    """
+
+    def __init__(self, version, entries):
+        self.version = version
+        self.documents = {}
+        postings = {}
+        for language, entry in entries.items():
+            services = json.loads(entry[CATALOG_SERVICES][0])
+            self.documents[language] = {
+                service['id']: service for service in services}
+            for service in services:
+                category = service.get('category') or {}
+                self._add(postings, service['id'], NAME_WEIGHT,
+                          service['name'], service.get('name_en'))
+                self._add(postings, service['id'], CATEGORY_WEIGHT,
+                          category.get('name'))
+                self._add(postings, service['id'], DESCRIPTION_WEIGHT,
+                          service.get('description'),
+                          service.get('description_en'))
+        self.postings = postings
+        self.terms = sorted(postings)
+
+    @staticmethod
+    def _add(postings, service_id, weight, *texts):
+        """Додавання слів текстів з вагою поля (зберігається найбільша)"""
+        for text in texts:
+            for token in tokenize(text):
+                scores = postings.setdefault(token, {})
+                if scores.get(service_id, 0) < weight:
+                    scores[service_id] = weight
+
+    def _match(self, token):
+        """Бали послуг для слова запиту: точний збіг або префікс слова"""
+        scores = dict(self.postings.get(token, {}))
+        position = bisect.bisect_left(self.terms, token)
+        for term in self.terms[position:]:
+            if not term.startswith(token):
+                break
+            if term == token:
+                continue
+            for service_id, weight in self.postings[term].items():
+                score = weight * PREFIX_FACTOR
+                if scores.get(service_id, 0) < score:
+                    scores[service_id] = score
+        return scores
+
+    def search(self, query, language, limit=SEARCH_DEFAULT_LIMIT):
+        """Послуги мовою language, що містять усі слова запиту
+
+        Кожне слово запиту шукається як префікс, тож часткове введення
+        теж знаходить послуги. Сортування за сумою балів, далі за назвою.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        totals = None
+        for token in dict.fromkeys(tokens):
+            scores = self._match(token)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {
+                    service_id: total + scores[service_id]
+                    for service_id, total in totals.items()
+                    if service_id in scores
+                }
+            if not totals:
+                return []
+
+        documents = self.documents.get(
+            language, self.documents[CATALOG_LANGUAGES[0]])
+        ranked = sorted(
+            totals.items(),
+            key=lambda item: (-item[1], documents[item[0]]['name']))
+        return [documents[service_id] for service_id, _ in ranked[:limit]]
+
+
+class ServiceSearch:
+    """Індекс пошуку послуг, спільний для запитів процесу
+
+    Індекс будується при першому пошуку і перебудовується, коли
+    змінюється версія каталогу. У стабільному стані пошук звертається
+    лише до кешу за версією і не виконує запитів до БД.
+    """
+
+    _index = None
+
+    @staticmethod
+    def get_index():
+        """Індекс для поточної версії каталогу"""
+        index = ServiceSearch._index
+        version = CatalogCache.get_version()
+        if index is None or version is None or index.version != version:
+            index = ServiceSearchIndex(*CatalogCache.get_entries())
+            ServiceSearch._index = index
+        return index
+
+    @staticmethod
+    def search(query, language, limit=SEARCH_DEFAULT_LIMIT):
+        """Пошук активних послуг за рядком запиту"""
+        return ServiceSearch.get_index().search(query, language, limit)
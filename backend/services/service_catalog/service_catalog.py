@@ -1,6 +1,9 @@
 """Сервіс роботи з каталогом послуг та інформацією про СТО."""
 
+from django.db import transaction
+
 from ...api.data_access import DataAccessLayer
+from .sto_info_cache import STOInfoCache
 
 
 class ServiceCatalog:
@@ -42,7 +45,9 @@ class ServiceCatalog:
         """Оновлення послуги"""
         service = DataAccessLayer.get_service_by_id(service_id)
         if service:
-            DataAccessLayer.update_service(service, **data)
+            # Зміна тривалості перераховує інтервали записів послуги
+            with transaction.atomic():
+                DataAccessLayer.update_service(service, **data)
             return {
                 'success': True,
                 'service': service
@@ -63,8 +68,8 @@ class ServiceCatalog:
 
     @staticmethod
     def get_sto_info():
-        """Отримання інформації про СТО"""
-        return DataAccessLayer.get_sto_info()
+        """Отримання інформації про СТО (з кешу процесу)"""
+        return STOInfoCache.get()
 
     @staticmethod
     def update_sto_info(data):
@@ -0,0 +1,42 @@
+"""Кеш активної інформації про СТО в пам'яті процесу."""
+
+from ...api.caching import bump_version, get_version
+from ...api.data_access import DataAccessLayer
+
+# Версія інформації про СТО у спільному кеші (для всіх процесів)
+STO_INFO_VERSION_KEY = 'sto_info:version'
+
+
+class STOInfoCache:
+    """Активний запис STOInfo, збережений у пам'яті процесу
+
+    Запис читається з БД один раз і далі повертається без запитів, доки
+    версія у спільному кеші не зміниться. Будь-яка зміна STOInfo
+    збільшує версію, тож кожен процес перечитує запис при наступному
+    зверненні. Відсутність запису теж кешується.
+    """
+
+    _entry = None  # (version, sto_info)
+
+    @staticmethod
+    def get_entry():
+        """Поточна версія та активний запис (None, якщо його немає)"""
+        version = get_version(STO_INFO_VERSION_KEY)
+        entry = STOInfoCache._entry
+        if entry is None or entry[0] != version:
+            # Версія читається до запиту в БД: зміна між ними лише
+            # змусить перечитати запис ще раз
+            entry = (version, DataAccessLayer.get_sto_info())
+            STOInfoCache._entry = entry
+        return entry
+
+    @staticmethod
+    def get():
+        """Активний запис STOInfo або None"""
+        return STOInfoCache.get_entry()[1]
+
+    @staticmethod
+    def invalidate():
+        """Інвалідація копій запису в усіх процесах"""
+        STOInfoCache._entry = None
+        bump_version(STO_INFO_VERSION_KEY)
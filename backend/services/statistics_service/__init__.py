@@ -0,0 +1 @@
+# Statistics Service package
@@ -0,0 +1,164 @@
+"""Підтримка денної зведеної статистики DailyStats."""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from ...api.models import Appointment, DailyStats
+
+STATUS_COUNT_FIELDS = DailyStats.STATUS_COUNT_FIELDS
+# Поля запису, від яких залежить його внесок у статистику
+STATS_FIELDS = (
+    'appointment_date', 'box_id', 'service_id', 'status', 'total_price')
+
+
+def total_count_expression():
+    """Вираз суми лічильників усіх статусів рядка"""
+    fields = list(STATUS_COUNT_FIELDS.values())
+    expression = F(fields[0])
+    for field in fields[1:]:
+        expression += F(field)
+    return expression
+
+
+def appointment_contribution(values):
+    """Ключ рядка та внесок запису у статистику
+
+    values - словник зі значеннями полів STATS_FIELDS. Повертає
+    ((date, box_id, service_id), count_field, revenue).
+    """
+    revenue = Decimal('0')
+    if values['status'] == 'completed':
+        revenue = Decimal(str(values['total_price'] or 0))
+    return (
+        (values['appointment_date'], values['box_id'], values['service_id']),
+        STATUS_COUNT_FIELDS[values['status']],
+        revenue,
+    )
+
+
+class DailyStatsService:
+    """Інкрементальне оновлення та перебудова DailyStats
+
+    Зміна запису переносить його внесок зі старого рядка в новий у
+    межах однієї транзакції; масова перебудова обчислює рядки одним
+    GROUP BY по записах.
+    """
+
+    @staticmethod
+    def _add(key, count_field, sign, revenue):
+        """Додавання (sign=1) або віднімання (sign=-1) внеску запису"""
+        stats_date, box_id, service_id = key
+        row, _ = DailyStats.objects.get_or_create(  # pylint: disable=no-member
+            date=stats_date, box_id=box_id, service_id=service_id)
+        DailyStats.objects.filter(pk=row.pk).update(  # pylint: disable=no-member
+            **{count_field: F(count_field) + sign},
+            revenue=F('revenue') + sign * revenue)
+
+    @staticmethod
+    def apply_change(old_values=None, new_values=None):
+        """Перенесення внеску запису зі старих значень у нові
+
+        old_values - значення до зміни (None для нового запису),
+        new_values - після зміни (None для видаленого).
+        """
+        old = old_values and appointment_contribution(old_values)
+        new = new_values and appointment_contribution(new_values)
+        if old == new:
+            return
+
+        with transaction.atomic():
+            if old:
+                key, count_field, revenue = old
+                DailyStatsService._add(key, count_field, -1, revenue)
+            if new:
+                key, count_field, revenue = new
+                DailyStatsService._add(key, count_field, 1, revenue)
+
+    @staticmethod
+    def compute_rows(date_from=None, date_to=None):
+        """Рядки статистики за записами з БД (один запит GROUP BY)"""
+        appointments = Appointment.objects.all()  # pylint: disable=no-member
+        if date_from is not None:
+            appointments = appointments.filter(appointment_date__gte=date_from)
+        if date_to is not None:
+            appointments = appointments.filter(appointment_date__lte=date_to)
+
+        counts = {
+            field: Count('id', filter=Q(status=status))
+            for status, field in STATUS_COUNT_FIELDS.items()
+        }
+        grouped = appointments.order_by().values(
+            'appointment_date', 'box_id', 'service_id'
+        ).annotate(
+            revenue=Sum('total_price', filter=Q(status='completed')),
+            **counts)
+
+        return [
+            DailyStats(
+                date=row['appointment_date'],
+                box_id=row['box_id'],
+                service_id=row['service_id'],
+                revenue=row['revenue'] or 0,
+                **{field: row[field] for field in counts})
+            for row in grouped
+        ]
+
+    @staticmethod
+    def rebuild(date_from=None, date_to=None, batch_days=31):
+        """Масова перебудова статистики за діапазон дат
+
+        Без меж перебудовує всю таблицю одним проходом, інакше - порціями
+        по batch_days днів, кожну в окремій транзакції. Повертає кількість
+        збережених рядків.
+        """
+        if date_from is None or date_to is None:
+            with transaction.atomic():
+                stale = DailyStats.objects.all()  # pylint: disable=no-member
+                if date_from is not None:
+                    stale = stale.filter(date__gte=date_from)
+                if date_to is not None:
+                    stale = stale.filter(date__lte=date_to)
+                stale.delete()
+                rows = DailyStatsService.compute_rows(date_from, date_to)
+                DailyStats.objects.bulk_create(  # pylint: disable=no-member
+                    rows, batch_size=1000)
+            return len(rows)
+
+        created = 0
+        chunk_start = date_from
+        while chunk_start <= date_to:
+            chunk_end = min(
+                chunk_start + timedelta(days=batch_days - 1), date_to)
+            with transaction.atomic():
+                DailyStats.objects.filter(  # pylint: disable=no-member
+                    date__gte=chunk_start, date__lte=chunk_end).delete()
+                rows = DailyStatsService.compute_rows(chunk_start, chunk_end)
+                DailyStats.objects.bulk_create(  # pylint: disable=no-member
+                    rows, batch_size=1000)
+            created += len(rows)
+            chunk_start = chunk_end + timedelta(days=1)
+        return created
+
+    @staticmethod
+    def totals(date_from=None, date_to=None, **filters):
+        """Підсумки за період з рядків статистики
+
+        filters - додаткові умови (наприклад box_id, service_id).
+        Повертає словник з лічильниками статусів, total_count та revenue.
+        """
+        rows = DailyStats.objects.filter(**filters)  # pylint: disable=no-member
+        if date_from is not None:
+            rows = rows.filter(date__gte=date_from)
+        if date_to is not None:
+            rows = rows.filter(date__lte=date_to)
+
+        aggregates = {
+            field: Sum(field) for field in STATUS_COUNT_FIELDS.values()}
+        totals = rows.aggregate(
+            total_count=Sum(total_count_expression()),
+            revenue=Sum('revenue'),
+            **aggregates)
+        return {key: value or 0 for key, value in totals.items()}
@@ -0,0 +1,215 @@
+"""Сервіс статистики для панелі адміністратора."""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from ...api.caching import bump_version, get_version, make_key
+from ...api.models import Customer, DailyStats, Service
+from .daily_stats import STATUS_COUNT_FIELDS, total_count_expression
+
+# Версія статистики: змінюється при зміні записів, клієнтів або послуг
+STATS_VERSION_KEY = 'statistics:version'
+# Версія статистики минулих дат: змінюється лише при зміні записів у минулому
+CLOSED_VERSION_KEY = 'statistics:closed:version'
+# Період для кількості записів за місяць (дні)
+MONTHLY_WINDOW_DAYS = 30
+# Показники та розміри інтервалів часових рядів
+TIMESERIES_METRICS = ('revenue', 'appointments')
+TIMESERIES_GRANULARITIES = ('day', 'week', 'month')
+# Статуси, що враховуються як навантаження (без скасованих)
+LOAD_STATUSES = ('pending', 'confirmed', 'in_progress', 'completed')
+
+
+def bucket_start(value, granularity):
+    """Початок інтервалу (дня, тижня з понеділка, місяця) для дати"""
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    if granularity == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def next_bucket_start(value, granularity):
+    """Початок наступного інтервалу"""
+    if granularity == 'week':
+        return value + timedelta(days=7)
+    if granularity == 'month':
+        return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return value + timedelta(days=1)
+
+
+class StatisticsService:
+    """Статистика панелі адміністратора
+
+    Кожна таблиця агрегується одним запитом з умовними агрегатами
+    (Count/Sum з filter), тож дашборд виконує три запити замість
+    дев'яти. Показники записів читаються з денної статистики DailyStats,
+    а не з усієї історії записів. Результат зберігається у кеші як
+    знімок на короткий час.
+    """
+
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'STATISTICS_CACHE_TIMEOUT', 60)
+
+    @staticmethod
+    def _closed_timeout():
+        return getattr(settings, 'STATISTICS_CLOSED_CACHE_TIMEOUT', 24 * 3600)
+
+    @staticmethod
+    def bump_version():
+        """Інвалідація знімку статистики"""
+        bump_version(STATS_VERSION_KEY)
+
+    @staticmethod
+    def bump_closed_version():
+        """Інвалідація кешованих інтервалів минулих дат"""
+        bump_version(CLOSED_VERSION_KEY)
+
+    @staticmethod
+    def compute_dashboard(today=None):
+        """Статистика дашборду з БД (по одному запиту на таблицю)"""
+        today = today or timezone.now().date()
+        month_ago = today - timedelta(days=MONTHLY_WINDOW_DAYS)
+        total_count = total_count_expression()
+
+        appointments = DailyStats.objects.aggregate(  # pylint: disable=no-member
+            total_appointments=Sum(total_count),
+            pending_appointments=Sum('pending_count'),
+            completed_appointments=Sum('completed_count'),
+            total_revenue=Sum('revenue'),
+            monthly_appointments=Sum(
+                total_count, filter=Q(date__gte=month_ago)),
+            revenue_today=Sum('revenue', filter=Q(date=today)),
+        )
+        customers = Customer.objects.aggregate(  # pylint: disable=no-member
+            total_customers=Count('id'),
+            blocked_customers=Count('id', filter=Q(is_blocked=True)),
+        )
+        services = Service.objects.aggregate(  # pylint: disable=no-member
+            services_count=Count('id', filter=Q(is_active=True)),
+        )
+
+        return {
+            'total_appointments': appointments['total_appointments'] or 0,
+            'pending_appointments': appointments['pending_appointments'] or 0,
+            'completed_appointments': (
+                appointments['completed_appointments'] or 0),
+            'total_customers': customers['total_customers'],
+            'blocked_customers': customers['blocked_customers'],
+            'total_revenue': appointments['total_revenue'] or 0,
+            'monthly_appointments': appointments['monthly_appointments'] or 0,
+            'services_count': services['services_count'],
+            'revenue_today': appointments['revenue_today'] or 0,
+        }
+
+    @staticmethod
+    def get_dashboard(fresh=False):
+        """Знімок статистики з кешу або новий розрахунок
+
+        fresh=True обходить кеш і оновлює знімок. Знімок прив'язаний до
+        поточної дати та версії статистики, тому зміни даних через
+        моделі видно одразу, а решта (наприклад, масові оновлення)
+        - не пізніше ніж через STATISTICS_CACHE_TIMEOUT секунд.
+        """
+        today = timezone.now().date()
+        key = make_key(
+            'statistics:dashboard', today, get_version(STATS_VERSION_KEY))
+
+        snapshot = None if fresh else cache.get(key)
+        if snapshot is None:
+            snapshot = StatisticsService.compute_dashboard(today)
+            snapshot['generated_at'] = timezone.now().isoformat()
+            cache.set(key, snapshot, StatisticsService._timeout())
+        return snapshot
+
+    @staticmethod
+    def _metric_expression(metric):
+        """Агрегат показника по рядках DailyStats"""
+        if metric == 'revenue':
+            return Sum('revenue')
+        load_fields = [STATUS_COUNT_FIELDS[status] for status in LOAD_STATUSES]
+        return Sum(sum(
+            (F(field) for field in load_fields[1:]), F(load_fields[0])))
+
+    @staticmethod
+    def compute_timeseries(metric, granularity, date_from, date_to,
+                           **filters):
+        """Значення показника по інтервалах (один GROUP BY у БД)
+
+        Повертає словник {початок інтервалу: значення} лише для
+        інтервалів, де є дані.
+        """
+        rows = DailyStats.objects.filter(  # pylint: disable=no-member
+            date__gte=date_from, date__lte=date_to, **filters
+        ).annotate(
+            bucket=Trunc('date', granularity, output_field=DateField())
+        ).values('bucket').annotate(
+            value=StatisticsService._metric_expression(metric)
+        ).order_by('bucket')
+        return {row['bucket']: row['value'] or 0 for row in rows}
+
+    @staticmethod
+    def get_timeseries(metric, granularity, date_from, date_to,
+                       box_id=None, service_id=None):
+        """Часовий ряд показника з заповненими порожніми інтервалами
+
+        metric - 'revenue' (дохід завершених записів) або 'appointments'
+        (записи без скасованих). Значення закритих інтервалів (що
+        повністю в минулому) кешуються до зміни записів у минулих
+        датах; поточні та майбутні інтервали рахуються щоразу.
+        """
+        filters = {}
+        if box_id is not None:
+            filters['box_id'] = box_id
+        if service_id is not None:
+            filters['service_id'] = service_id
+
+        today = timezone.now().date()
+        closed_version = get_version(CLOSED_VERSION_KEY)
+
+        # Інтервали з межами, обрізаними до [date_from, date_to]
+        buckets = []
+        start = bucket_start(date_from, granularity)
+        while start <= date_to:
+            end = next_bucket_start(start, granularity) - timedelta(days=1)
+            buckets.append((start, max(start, date_from), min(end, date_to)))
+            start = end + timedelta(days=1)
+
+        keys = {
+            start: make_key(
+                'statistics:timeseries', metric, granularity, first, last,
+                box_id or '-', service_id or '-', closed_version)
+            for start, first, last in buckets if last < today
+        }
+        cached = cache.get_many(list(keys.values()))
+        values = {
+            start: cached[key] for start, key in keys.items() if key in cached
+        }
+
+        missing = [bucket for bucket in buckets if bucket[0] not in values]
+        if missing:
+            computed = StatisticsService.compute_timeseries(
+                metric, granularity, missing[0][1], missing[-1][2],
+                **filters)
+            for start, _, _ in missing:
+                values[start] = computed.get(start, 0)
+            cache.set_many({
+                keys[start]: values[start]
+                for start, _, _ in missing if start in keys
+            }, StatisticsService._closed_timeout())
+
+        return [
+            {
+                'start': start.isoformat(),
+                'value': (
+                    float(values[start]) if metric == 'revenue'
+                    else int(values[start])),
+            }
+            for start, _, _ in buckets
+        ]
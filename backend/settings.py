@@ -71,6 +71,56 @@ DATABASES = {
     }
 }
 
+# Cache
+# За замовчуванням локальна пам'ять процесу. Для кількох воркерів слід
+# налаштувати спільний бекенд (Redis/Memcached), щоб інвалідація кешу
+# доступності та каталогу була видна всім процесам.
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='sto-cache'),
+    }
+}
+
+# Час життя кешу доступності боксів (секунди)
+AVAILABILITY_CACHE_TIMEOUT = config(
+    'AVAILABILITY_CACHE_TIMEOUT', default=300, cast=int)
+
+# Крок часових слотів при розрахунку доступності (хвилини)
+AVAILABILITY_SLOT_STEP_MINUTES = config(
+    'AVAILABILITY_SLOT_STEP_MINUTES', default=30, cast=int)
+
+# Розрахунок доступності по бітових картах зайнятості BoxOccupancy
+AVAILABILITY_USE_OCCUPANCY = config(
+    'AVAILABILITY_USE_OCCUPANCY', default=True, cast=bool)
+
+# Час життя знімку статистики панелі адміністратора (секунди)
+STATISTICS_CACHE_TIMEOUT = config(
+    'STATISTICS_CACHE_TIMEOUT', default=60, cast=int)
+
+# Час життя кешу закритих (минулих) інтервалів часових рядів (секунди)
+STATISTICS_CLOSED_CACHE_TIMEOUT = config(
+    'STATISTICS_CLOSED_CACHE_TIMEOUT', default=86400, cast=int)
+
+# Розмір сторінки списку записів адміністратора (cursor-пагінація)
+ADMIN_APPOINTMENTS_PAGE_SIZE = config(
+    'ADMIN_APPOINTMENTS_PAGE_SIZE', default=50, cast=int)
+ADMIN_APPOINTMENTS_MAX_PAGE_SIZE = config(
+    'ADMIN_APPOINTMENTS_MAX_PAGE_SIZE', default=500, cast=int)
+
+# Поріг, до якого оцінка кількості записів рахується точно
+ADMIN_APPOINTMENTS_COUNT_LIMIT = config(
+    'ADMIN_APPOINTMENTS_COUNT_LIMIT', default=1000, cast=int)
+
+# Час життя відрендереного публічного каталогу послуг (секунди)
+CATALOG_CACHE_TIMEOUT = config(
+    'CATALOG_CACHE_TIMEOUT', default=86400, cast=int)
+
+# Движок розрахунку доступності: 'python' або 'numpy' (потребує NumPy)
+AVAILABILITY_ENGINE = config('AVAILABILITY_ENGINE', default='python')
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -8,6 +8,8 @@ import './AdminAppointments.css';
 const AdminAppointments = () => {
   const { language } = useLanguage();
   const [appointments, setAppointments] = useState([]);
+  // Посилання на наступну сторінку бронювань (keyset-пагінація)
+  const [nextPage, setNextPage] = useState(null);
   const [loading, setLoading] = useState(true);
   const [boxes, setBoxes] = useState([]);
   const [services, setServices] = useState([]);
@@ -56,7 +58,8 @@ const AdminAppointments = () => {
       if (filters.price_max) params.append('price_max', filters.price_max);
 
       const appointmentsResponse = await api.get(`/api/admin/appointments/?${params.toString()}`);
-      setAppointments(appointmentsResponse.data);
+      setAppointments(appointmentsResponse.data.results);
+      setNextPage(appointmentsResponse.data.next);
     } catch (error) {
       console.error('Помилка завантаження даних:', error);
       toast.error('Помилка завантаження даних');
@@ -65,6 +68,18 @@ const AdminAppointments = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextPage) return;
+    try {
+      const response = await api.get(nextPage);
+      setAppointments(prev => [...prev, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (error) {
+      console.error('Помилка завантаження бронювань:', error);
+      toast.error('Помилка завантаження бронювань');
+    }
+  };
+
   const handleFilterChange = (name, value) => {
     setFilters(prev => ({
       ...prev,
@@ -434,6 +449,17 @@ const AdminAppointments = () => {
             </table>
           </div>
         )}
+
+        {nextPage && (
+          <div className="list-actions">
+            <button
+              className="btn btn-sm btn-outline-primary"
+              onClick={loadMore}
+            >
+              Завантажити ще
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Модальне вікно з деталями */}
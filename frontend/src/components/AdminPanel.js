@@ -10,6 +10,8 @@ const AdminPanel = () => {
   const [weeklySchedule, setWeeklySchedule] = useState(null);
   const [customers, setCustomers] = useState([]);
   const [appointments, setAppointments] = useState([]);
+  // Посилання на наступну сторінку записів (keyset-пагінація)
+  const [appointmentsNext, setAppointmentsNext] = useState(null);
   const [services, setServices] = useState([]);
   const [categories, setCategories] = useState([]);
   const [boxes, setBoxes] = useState([]);
@@ -142,7 +144,8 @@ const AdminPanel = () => {
 
       api.get(`/api/admin/appointments/?${params.toString()}&language=${language}`)
         .then(response => {
-          setAppointments(response.data || []);
+          setAppointments(response.data.results || []);
+          setAppointmentsNext(response.data.next);
         })
         .catch(error => {
           console.error('Помилка завантаження записів:', error);
@@ -153,6 +156,18 @@ const AdminPanel = () => {
     return () => clearTimeout(timeoutId);
   }, [appointmentFilters, language, activeTab, t]); // eslint-disable-line react-hooks/exhaustive-deps
 
+  const loadMoreAppointments = async () => {
+    if (!appointmentsNext) return;
+    try {
+      const response = await api.get(appointmentsNext);
+      setAppointments(prev => [...prev, ...response.data.results]);
+      setAppointmentsNext(response.data.next);
+    } catch (error) {
+      console.error('Помилка завантаження записів:', error);
+      toast.error(t('load_appointments_error'));
+    }
+  };
+
   const fetchWeeklySchedule = useCallback(async () => {
     try {
       const response = await api.get(`/api/admin/weekly_schedule/?language=${language}`);
@@ -1140,6 +1155,13 @@ const AdminPanel = () => {
                 </tbody>
               </table>
             )}
+            {appointmentsNext && (
+              <div className="text-center p-3">
+                <button className="btn btn-secondary" onClick={loadMoreAppointments}>
+                  {t('load_more')}
+                </button>
+              </div>
+            )}
           </div>
         </div>
       )}
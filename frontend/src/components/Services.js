@@ -6,8 +6,7 @@ import Modal from './Modal';
 
 const Services = () => {
   const { language, t } = useLanguage();
-  const [categories, setCategories] = useState([]);
-  const [services, setServices] = useState([]);
+  const [catalogTree, setCatalogTree] = useState([]);
   const [loading, setLoading] = useState(true);
   const [modalOpen, setModalOpen] = useState(false);
   const [modalData, setModalData] = useState(null);
@@ -17,26 +16,17 @@ const Services = () => {
     const fetchData = async () => {
       try {
         // Примусово очищаємо дані перед завантаженням нових
-        setCategories([]);
-        setServices([]);
+        setCatalogTree([]);
         setLoading(true);
-        
-        const timestamp = new Date().getTime();
-        const [categoriesResponse, servicesResponse] = await Promise.all([
-          api.get(`/api/service-categories/?language=${language}&t=${timestamp}`),
-          api.get(`/api/services/?language=${language}&t=${timestamp}`)
-        ]);
-        
-        const categoriesData = categoriesResponse.data.results || categoriesResponse.data || [];
-        const servicesData = servicesResponse.data || [];
-        
+
+        // Категорії з уже вкладеними активними послугами
+        const response = await api.get(`/api/catalog/tree/?language=${language}`);
+
         // Оновлюємо дані тільки після успішного отримання
-        setCategories(categoriesData);
-        setServices(servicesData);
+        setCatalogTree(Array.isArray(response.data) ? response.data : []);
       } catch (error) {
         console.error('Помилка завантаження даних:', error);
-        setCategories([]);
-        setServices([]);
+        setCatalogTree([]);
       } finally {
         setLoading(false);
       }
@@ -45,17 +35,15 @@ const Services = () => {
     fetchData();
   }, [language]); // Тільки залежність від мови
 
-  // Групуємо послуги за категоріями
-  const servicesByCategory = Array.isArray(categories) ? categories.reduce((acc, category) => {
-    const categoryServices = services.filter(service => service.category?.id === category.id);
-    if (categoryServices.length > 0) {
-      acc[category.name] = {
-        category: category,
-        services: categoryServices
-      };
-    }
+  // Послуги за категоріями (сервер повертає лише непорожні категорії);
+  // категорія додається до послуги для модального вікна
+  const servicesByCategory = catalogTree.reduce((acc, category) => {
+    acc[category.name] = {
+      category: category,
+      services: category.services.map(service => ({ ...service, category }))
+    };
     return acc;
-  }, {}) : {};
+  }, {});
 
 
 
@@ -922,6 +922,10 @@ export const translations = {
         uk: 'Записів не знайдено',
         en: 'No appointments found'
     },
+    'load_more': {
+        uk: 'Завантажити ще',
+        en: 'Load more'
+    },
     'date': {
         uk: 'Дата',
         en: 'Date'